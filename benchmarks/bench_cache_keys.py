@@ -0,0 +1,61 @@
+"""
+Measures the per-call overhead of a cache hit in `cache_results` next to
+`functools.lru_cache`, for positional calls, keyword calls and list arguments.
+
+Run from the repository root:
+    python benchmarks/bench_cache_keys.py [calls]
+"""
+from pathlib import Path
+from functools import lru_cache
+import sys
+import time
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from project.decorators.cache_decorator import cache_results
+
+
+def pair(x, y=0):
+    return x, y
+
+
+def per_call(func, calls, *args, **kwargs):
+    """Returns the mean seconds per call of `func(*args, **kwargs)` after a warm-up."""
+    func(*args, **kwargs)
+    start = time.perf_counter()
+    for _ in range(calls):
+        func(*args, **kwargs)
+    return (time.perf_counter() - start) / calls
+
+
+def main():
+    calls = int(sys.argv[1]) if len(sys.argv) > 1 else 500_000
+    functools_cached = lru_cache(maxsize=None)(pair)
+    lru_cached = lru_cache(maxsize=128)(pair)
+    cached = cache_results()(pair)
+    lru_policy = cache_results(128, "lru")(pair)
+    thread_safe = cache_results(thread_safe=True)(pair)
+
+    rows = [
+        ("lru_cache(maxsize=None)", functools_cached),
+        ("lru_cache(maxsize=128)", lru_cached),
+        ("cache_results()", cached),
+        ("cache_results(128, 'lru')", lru_policy),
+        ("cache_results(thread_safe)", thread_safe),
+    ]
+    print(f"mean time of a cache hit over {calls} calls, in microseconds")
+    print(f"{'':<28} {'f(1, 2)':>9} {'f(1, y=2)':>10} {'f([1, 2])':>10}")
+    for name, func in rows:
+        positional = per_call(func, calls, 1, 2)
+        keyword = per_call(func, calls, 1, y=2)
+        if name.startswith("lru_cache"):
+            unhashable = "-"
+        else:
+            unhashable = f"{per_call(func, calls // 10, [1, 2]) * 1e6:.3f}"
+        print(
+            f"{name:<28} {positional * 1e6:>9.3f} {keyword * 1e6:>10.3f} {unhashable:>10}"
+        )
+
+
+if __name__ == "__main__":
+    main()
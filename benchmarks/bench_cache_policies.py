@@ -0,0 +1,60 @@
+"""
+Replays a Zipfian trace through `cache_results` with every eviction policy and
+reports the hit ratio and the time per call.
+
+Run from the repository root:
+    python benchmarks/bench_cache_policies.py [calls] [keys] [cache size] [skew]
+"""
+from pathlib import Path
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from project.decorators.cache_decorator import cache_results
+
+
+def zipf_trace(calls, keys, skew, seed=0):
+    """Returns `calls` keys from 0..keys-1 with P(k) proportional to 1 / (k + 1) ** skew."""
+    rng = np.random.default_rng(seed)
+    weights = 1.0 / np.arange(1, keys + 1) ** skew
+    trace = rng.choice(keys, size=calls, p=weights / weights.sum())
+    # Shuffle the ranks so that hot keys are not simply the small numbers
+    return rng.permutation(keys)[trace].tolist()
+
+
+def main():
+    calls = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    keys = int(sys.argv[2]) if len(sys.argv) > 2 else 20_000
+    size = int(sys.argv[3]) if len(sys.argv) > 3 else 1_000
+    skew = float(sys.argv[4]) if len(sys.argv) > 4 else 0.9
+    trace = zipf_trace(calls, keys, skew)
+
+    def identity(x):
+        return x
+
+    start = time.perf_counter()
+    for key in trace:
+        identity(key)
+    baseline = (time.perf_counter() - start) / calls
+
+    print(f"{calls} calls over {keys} keys (skew {skew}), cache size {size}")
+    print(f"uncached call: {baseline * 1e6:.2f} us")
+    print(f"{'policy':<8} {'hit ratio':>10} {'per call':>10}")
+    policies = [("fifo", {}), ("lru", {}), ("lfu", {}), ("arc", {})]
+    policies.append(("ttl", {"ttl": 3600}))
+    policies.append(("weight", {"weigher": lambda value: 1}))
+    for policy, options in policies:
+        cached = cache_results(size, policy, **options)(identity)
+        start = time.perf_counter()
+        for key in trace:
+            cached(key)
+        elapsed = (time.perf_counter() - start) / calls
+        hit_ratio = 1 - cached.calls / calls
+        print(f"{policy:<8} {hit_ratio:>10.3f} {elapsed * 1e6:>8.2f}us")
+
+
+if __name__ == "__main__":
+    main()
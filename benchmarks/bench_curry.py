@@ -0,0 +1,69 @@
+"""
+Compares `curry_explicit` with the previous closure-chain implementation for
+deep arities, applying one argument per step and all of them in one step.
+
+Run from the repository root:
+    python benchmarks/bench_curry.py [repeats]
+"""
+from pathlib import Path
+import sys
+import time
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from project.decorators.curry import curry_explicit
+
+
+def closure_chain_curry(function, arity):
+    """The previous implementation: one lambda and one closure per argument."""
+    if arity == 0:
+        return lambda: function()
+
+    def curried(arg):
+        if curried.remaining_arity == 1:
+            return function(arg)
+        return closure_chain_curry(
+            lambda *args: function(arg, *args), curried.remaining_arity - 1
+        )
+
+    curried.remaining_arity = arity
+    return curried
+
+
+def one_by_one(curried, arity):
+    step = curried
+    for i in range(arity):
+        step = step(i)
+    return step
+
+
+def per_application(func, repeats):
+    """Returns the mean seconds of one call of `func()`."""
+    start = time.perf_counter()
+    for _ in range(repeats):
+        func()
+    return (time.perf_counter() - start) / repeats
+
+
+def target(*args):
+    return len(args)
+
+
+def main():
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    print(f"mean time of a full application over {repeats} repeats, in microseconds")
+    print(f"{'arity':>5} {'closure chain':>14} {'one by one':>11} {'all at once':>12}")
+    for arity in (2, 5, 10, 20, 50):
+        old = closure_chain_curry(target, arity)
+        new = curry_explicit(target, arity)
+        args = tuple(range(arity))
+        chain = per_application(lambda: one_by_one(old, arity), repeats)
+        steps = per_application(lambda: one_by_one(new, arity), repeats)
+        at_once = per_application(lambda: new(*args), repeats)
+        print(
+            f"{arity:>5} {chain * 1e6:>14.2f} {steps * 1e6:>11.2f} {at_once * 1e6:>12.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
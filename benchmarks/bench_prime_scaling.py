@@ -0,0 +1,42 @@
+"""
+Measures how `count_primes` and `primes_in_range` scale with the number of
+worker processes.
+
+Run from the repository root:
+    python benchmarks/bench_prime_scaling.py [hi]
+"""
+from pathlib import Path
+import os
+import sys
+import time
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from project.generators.primes import count_primes, primes_in_range
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+def main():
+    hi = int(float(sys.argv[1])) if len(sys.argv) > 1 else 10**9
+    print(f"primes below {hi} on {os.cpu_count()} CPUs")
+    print(f"{'workers':>7} {'count':>10} {'speedup':>8} {'range':>10} {'speedup':>8}")
+    base_count = base_range = None
+    for workers in (1, 2, 4, 8):
+        count, count_time = timed(lambda: count_primes(0, hi, workers=workers))
+        primes, range_time = timed(lambda: primes_in_range(0, hi, workers=workers))
+        assert len(primes) == count
+        base_count = base_count or count_time
+        base_range = base_range or range_time
+        print(
+            f"{workers:>7} {count_time:>9.2f}s {base_count / count_time:>7.2f}x"
+            f" {range_time:>9.2f}s {base_range / range_time:>7.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Measures how fast the segmented sieve produces the first primes, through
+`prime_generator` and through `primes_below`, next to trial division, and
+how fast `prime_decorator` answers k-th prime queries in random order.
+
+Run from the repository root:
+    python benchmarks/bench_primes.py [count]
+"""
+from pathlib import Path
+import itertools
+import math
+import random
+import sys
+import time
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from project.generators.primes import (
+    nth_prime_bound,
+    prime_decorator,
+    prime_generator,
+    primes_below,
+)
+
+
+def trial_division():
+    """The previous generator: trial division by every integer up to sqrt(n)."""
+    num = 2
+    while True:
+        if all(num % i for i in range(2, math.isqrt(num) + 1)):
+            yield num
+        num += 1
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000_000
+    print(f"time to produce the first {count} primes")
+    last, elapsed = timed(lambda: list(itertools.islice(prime_generator(), count))[-1])
+    print(f"prime_generator   {elapsed:8.2f}s  (last prime {last})")
+    primes, elapsed = timed(lambda: primes_below(nth_prime_bound(count))[:count])
+    print(f"primes_below      {elapsed:8.2f}s  (last prime {primes[-1]})")
+    sample = min(count, 50_000)
+    _, elapsed = timed(lambda: list(itertools.islice(trial_division(), sample)))
+    print(f"trial division    {elapsed:8.2f}s  (first {sample} primes only)")
+
+    kth = prime_decorator(lambda prime: prime)
+    queries = random.Random(0).choices(range(1, count + 1), k=100_000)
+    _, elapsed = timed(lambda: [kth(k) for k in queries])
+    print(f"{len(queries)} random k-th prime queries, k <= {count}")
+    print(f"first pass        {elapsed:8.2f}s  (table of {len(kth.table)} primes)")
+    _, elapsed = timed(lambda: [kth(k) for k in queries])
+    print(f"second pass       {elapsed:8.2f}s")
+
+
+if __name__ == "__main__":
+    main()
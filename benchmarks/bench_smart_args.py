@@ -0,0 +1,77 @@
+"""
+Measures the per-call overhead of `smart_args` for functions without special
+defaults, with an `Evaluated` default and with an `Isolated` argument.
+
+Run from the repository root:
+    python benchmarks/bench_smart_args.py [calls]
+"""
+from pathlib import Path
+import sys
+import time
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from project.decorators.smart_args import Evaluated, Isolated, smart_args
+
+
+def per_call(func, calls, *args, **kwargs):
+    """Returns the mean seconds per call of `func(*args, **kwargs)`."""
+    start = time.perf_counter()
+    for _ in range(calls):
+        func(*args, **kwargs)
+    return (time.perf_counter() - start) / calls
+
+
+def plain(*, a=1, b=2, c=3):
+    return a
+
+
+def evaluated(*, a=1, b=2, c=Evaluated(int)):
+    return c
+
+
+def isolated(*, a=1, b=2, c=Isolated()):
+    return c
+
+
+def positional(a, b=2, c=Evaluated(int)):
+    return a
+
+
+def main():
+    calls = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    # name, function, wrapper, positional arguments, keyword arguments of the
+    # wrapper call and of the equivalent direct call
+    cases = [
+        ("no special defaults", plain, smart_args()(plain), (), {"a": 5}, {"a": 5}),
+        (
+            "Evaluated default",
+            evaluated,
+            smart_args()(evaluated),
+            (),
+            {"a": 5},
+            {"a": 5, "c": 0},
+        ),
+        ("Isolated argument", isolated, smart_args()(isolated), (), {"c": 7}, {"c": 7}),
+        (
+            "positional + Evaluated",
+            positional,
+            smart_args(allow_positional=True)(positional),
+            (5,),
+            {},
+            {"c": 0},
+        ),
+    ]
+    print(f"mean time per call over {calls} calls, in microseconds")
+    print(f"{'case':<24} {'direct':>8} {'smart_args':>11} {'overhead':>9}")
+    for name, direct, wrapped, args, kwargs, direct_kwargs in cases:
+        base = per_call(direct, calls, *args, **direct_kwargs)
+        smart = per_call(wrapped, calls, *args, **kwargs)
+        print(
+            f"{name:<24} {base * 1e6:>8.3f} {smart * 1e6:>11.3f} "
+            f"{(smart - base) * 1e6:>9.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Compares the batch operations of Treap with per-key Python loops.
+
+Run from the repository root:
+    python benchmarks/bench_treap_batch.py [size] [batch]
+"""
+from pathlib import Path
+import gc
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from project.cartesian_tree.treap import Treap
+
+
+def measure(func):
+    """Returns the wall time of a single call of `func` with GC off, as timeit does."""
+    gc.collect()
+    gc.disable()
+    try:
+        start = time.perf_counter()
+        func()
+        return time.perf_counter() - start
+    finally:
+        gc.enable()
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    batch = int(sys.argv[2]) if len(sys.argv) > 2 else 50_000
+    rng = np.random.default_rng(0)
+    base = Treap.from_sorted((i, i) for i in range(0, 2 * size, 2))
+    keys = rng.integers(0, 2 * size, batch)
+    existing = keys - keys % 2
+    values = rng.integers(0, 1000, batch)
+
+    def get_loop():
+        for key in existing.tolist():
+            base[key]
+
+    def set_loop(treap):
+        for key, value in zip(keys.tolist(), values.tolist()):
+            treap[key] = value
+
+    def delete_loop(treap):
+        for key in set(existing.tolist()):
+            del treap[key]
+
+    results = [
+        ("get", measure(get_loop), measure(lambda: base.get_many(existing))),
+    ]
+    first, second = base.copy(), base.copy()
+    results.append(
+        (
+            "set",
+            measure(lambda: set_loop(first)),
+            measure(lambda: second.set_many(np.column_stack([keys, values]))),
+        )
+    )
+    first, second = base.copy(), base.copy()
+    results.append(
+        (
+            "delete",
+            measure(lambda: delete_loop(first)),
+            measure(lambda: second.delete_many(existing)),
+        )
+    )
+
+    print(f"Treap of {size} keys, batch of {batch} keys")
+    print(f"{'operation':<10} {'per key':>10} {'batch':>10} {'speedup':>8}")
+    for name, loop, batched in results:
+        print(f"{name:<10} {loop:>9.3f}s {batched:>9.3f}s {loop / batched:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
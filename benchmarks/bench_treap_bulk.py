@@ -0,0 +1,63 @@
+"""
+Compares bulk loading of a Treap against repeated `__setitem__` calls.
+
+Run from the repository root:
+    python benchmarks/bench_treap_bulk.py [size]
+"""
+from pathlib import Path
+import random
+import sys
+import time
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from project.cartesian_tree.treap import Treap
+
+
+def bench_setitem(items):
+    """Fills a Treap with one `__setitem__` call per item."""
+    treap = Treap()
+    for key, value in items:
+        treap[key] = value
+    return treap
+
+
+def bench_from_sorted(items):
+    """Builds a Treap from already sorted items."""
+    return Treap.from_sorted(items)
+
+
+def bench_update_bulk(items):
+    """Sorts shuffled items and builds a Treap from them."""
+    treap = Treap()
+    treap.update_bulk(items)
+    return treap
+
+
+def measure(func, items):
+    """Returns the wall time of a single call of `func`."""
+    start = time.perf_counter()
+    func(items)
+    return time.perf_counter() - start
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    sorted_items = [(i, i) for i in range(size)]
+    shuffled_items = sorted_items[:]
+    random.shuffle(shuffled_items)
+
+    results = [
+        ("__setitem__ (shuffled)", measure(bench_setitem, shuffled_items)),
+        ("from_sorted", measure(bench_from_sorted, sorted_items)),
+        ("update_bulk (shuffled)", measure(bench_update_bulk, shuffled_items)),
+    ]
+
+    baseline = results[0][1]
+    print(f"Loading {size} keys")
+    for name, seconds in results:
+        print(f"{name:<24} {seconds:8.3f} s  x{baseline / seconds:6.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Stress benchmark for ConcurrentTreap under mixed read/write load.
+
+The load is run through the project's ThreadPool, once with the
+reader-writer lock of ConcurrentTreap and once with a Treap behind a
+single mutex, and the throughput is reported for a growing number of threads.
+
+Run from the repository root:
+    python benchmarks/bench_treap_concurrent.py [operations] [write_ratio]
+"""
+from pathlib import Path
+import random
+import sys
+import threading
+import time
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from project.cartesian_tree.concurrent_treap import ConcurrentTreap
+from project.cartesian_tree.treap import Treap
+from project.thread_pool.thread_pool import ThreadPool
+
+KEY_SPACE = 100_000
+
+
+class MutexTreap:
+    """A Treap where every operation takes the same mutex."""
+
+    def __init__(self):
+        self.treap = Treap()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            return self.treap.get(key)
+
+    def __setitem__(self, key, value):
+        with self.lock:
+            self.treap[key] = value
+
+
+def worker(mapping, operations, write_ratio, seed):
+    """Runs a mix of lookups and writes on random keys."""
+    rng = random.Random(seed)
+    for _ in range(operations):
+        key = rng.randrange(KEY_SPACE)
+        if rng.random() < write_ratio:
+            mapping[key] = key
+        else:
+            mapping.get(key)
+
+
+def run(factory, threads, operations, write_ratio):
+    """Returns the throughput in operations per second."""
+    mapping = factory()
+    for key in range(0, KEY_SPACE, 2):
+        mapping[key] = key
+
+    pool = ThreadPool(threads)
+    start = time.perf_counter()
+    for seed in range(threads):
+        pool.enqueue(worker, mapping, operations // threads, write_ratio, seed)
+    pool.dispose()
+    return operations / (time.perf_counter() - start)
+
+
+def main():
+    operations = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    write_ratio = float(sys.argv[2]) if len(sys.argv) > 2 else 0.1
+
+    print(f"{operations} operations, {write_ratio:.0%} writes")
+    print(f"{'threads':>7} {'ConcurrentTreap':>16} {'single mutex':>14}")
+    for threads in (1, 2, 4, 8):
+        concurrent = run(ConcurrentTreap, threads, operations, write_ratio)
+        mutex = run(MutexTreap, threads, operations, write_ratio)
+        print(f"{threads:>7} {concurrent:>12.0f} op/s {mutex:>10.0f} op/s")
+
+
+if __name__ == "__main__":
+    main()
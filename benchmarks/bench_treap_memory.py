@@ -0,0 +1,48 @@
+"""
+Compares the memory used by object-mode and compact Treaps with integer keys.
+
+Run from the repository root:
+    python benchmarks/bench_treap_memory.py [size]
+"""
+from pathlib import Path
+import sys
+import tracemalloc
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from project.cartesian_tree.compact_treap import CompactTreap
+from project.cartesian_tree.treap import Treap
+
+
+def allocated_bytes(factory, size):
+    """Returns the bytes allocated while filling a map with `size` integer items."""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    treap = factory()
+    for key in range(10**9, 10**9 + size):
+        treap[key] = key
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del treap
+    return used
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    results = [
+        ("Treap", allocated_bytes(Treap, size)),
+        ("CompactTreap", allocated_bytes(CompactTreap, size)),
+        (
+            "CompactTreap (typed values)",
+            allocated_bytes(lambda: CompactTreap(value_typecode="q"), size),
+        ),
+    ]
+
+    baseline = results[0][1]
+    print(f"Storing {size} integer items")
+    for name, used in results:
+        print(f"{name:<28} {used / size:7.1f} B/item  x{baseline / used:5.1f} smaller")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,381 @@
+import random
+from array import array
+from typing import Optional, Iterator, Tuple, Any, List, Union
+from collections.abc import MutableMapping
+
+# Index used instead of a missing child
+NIL = -1
+
+
+class CompactTreap(MutableMapping):
+    """
+    A Treap that keeps its nodes in parallel typed arrays instead of objects.
+
+    Node `i` is described by `keys[i]`, `values[i]`, `priorities[i]`,
+    `left[i]`, `right[i]` and `sizes[i]`; children are referenced by index and
+    `NIL` marks a missing child. Freed slots are chained through the `left`
+    array and reused by later insertions.
+
+    With integer keys a node takes a few dozen bytes instead of several
+    Python objects, while the MutableMapping API stays the same as in `Treap`.
+    """
+
+    def __init__(self, key_typecode: str = "q", value_typecode: Optional[str] = None):
+        """
+        Initializes an empty compact Treap.
+
+        Args:
+            key_typecode: The `array` typecode used to store keys.
+            value_typecode: The `array` typecode used to store values, or None
+                            to keep arbitrary Python objects in a list.
+        """
+        self._keys: array = array(key_typecode)
+        self._values: Union[array, List[Any]] = (
+            array(value_typecode) if value_typecode is not None else []
+        )
+        self._priorities: array = array("i")
+        self._left: array = array("i")
+        self._right: array = array("i")
+        self._sizes: array = array("i")
+        self._root: int = NIL
+        self._free: int = NIL
+
+    def _new_node(self, key: Any, value: Any) -> int:
+        """
+        Allocates a node, reusing a freed slot if there is one.
+
+        Args:
+            key: The key of the node.
+            value: The value associated with the key.
+
+        Returns:
+            The index of the new node.
+
+        Raises:
+            TypeError, OverflowError: If the typed arrays cannot store the
+                                      key or the value; nothing is changed.
+        """
+        # Convert into scratch arrays first, so that a rejected key or value
+        # can neither leave the arrays of different lengths nor lose a slot
+        array(self._keys.typecode, [key])
+        if isinstance(self._values, array):
+            array(self._values.typecode, [value])
+        priority = random.randint(1, 2**31 - 1)
+        index = self._free
+        if index != NIL:
+            self._free = self._left[index]
+            self._keys[index] = key
+            self._values[index] = value
+            self._priorities[index] = priority
+            self._left[index] = NIL
+            self._right[index] = NIL
+            self._sizes[index] = 1
+            return index
+
+        self._keys.append(key)
+        self._values.append(value)
+        self._priorities.append(priority)
+        self._left.append(NIL)
+        self._right.append(NIL)
+        self._sizes.append(1)
+        return len(self._keys) - 1
+
+    def _free_node(self, index: int) -> None:
+        """
+        Returns a slot to the free list.
+
+        Args:
+            index: The index of the node to free.
+        """
+        if isinstance(self._values, list):
+            self._values[index] = None  # Drop the reference to the value
+        self._left[index] = self._free
+        self._free = index
+
+    def _size(self, index: int) -> int:
+        """
+        Returns the size of the subtree rooted at `index`.
+        """
+        return self._sizes[index] if index != NIL else 0
+
+    def _update(self, index: int) -> None:
+        """
+        Recomputes the subtree size of the node from its children.
+        """
+        self._sizes[index] = (
+            1 + self._size(self._left[index]) + self._size(self._right[index])
+        )
+
+    def _split(self, index: int, key: Any, strict: bool = False) -> Tuple[int, int]:
+        """
+        Splits a subtree into keys less than or equal to `key` and keys greater than it.
+
+        Args:
+            index: The root of the subtree.
+            key: The key at which to split.
+            strict: If True, a node equal to `key` goes to the right part.
+
+        Returns:
+            The roots of the two parts.
+        """
+        keys, left, right = self._keys, self._left, self._right
+        left_root = right_root = left_tail = right_tail = NIL
+        path: List[int] = []
+
+        while index != NIL:
+            path.append(index)
+            node_key = keys[index]
+            if key < node_key or (strict and key == node_key):
+                if right_tail == NIL:
+                    right_root = index
+                else:
+                    left[right_tail] = index
+                right_tail = index
+                index = left[index]
+            else:
+                if left_tail == NIL:
+                    left_root = index
+                else:
+                    right[left_tail] = index
+                left_tail = index
+                index = right[index]
+
+        if left_tail != NIL:
+            right[left_tail] = NIL
+        if right_tail != NIL:
+            left[right_tail] = NIL
+        for node in reversed(path):
+            self._update(node)
+        return left_root, right_root
+
+    def _merge(self, left_index: int, right_index: int) -> int:
+        """
+        Merges two subtrees where every key of the first is smaller than the keys of the second.
+
+        Args:
+            left_index: The root of the left subtree.
+            right_index: The root of the right subtree.
+
+        Returns:
+            The root of the merged subtree.
+        """
+        priorities, left, right = self._priorities, self._left, self._right
+        root = parent = NIL
+        attach_right = False
+        path: List[int] = []
+
+        while left_index != NIL and right_index != NIL:
+            if priorities[left_index] > priorities[right_index]:
+                child = left_index
+                left_index = right[left_index]
+                next_attach_right = True
+            else:
+                child = right_index
+                right_index = left[right_index]
+                next_attach_right = False
+
+            if parent == NIL:
+                root = child
+            elif attach_right:
+                right[parent] = child
+            else:
+                left[parent] = child
+            path.append(child)
+            parent, attach_right = child, next_attach_right
+
+        rest = left_index if left_index != NIL else right_index
+        if parent == NIL:
+            return rest
+        if attach_right:
+            right[parent] = rest
+        else:
+            left[parent] = rest
+        for node in reversed(path):
+            self._update(node)
+        return root
+
+    def _find(self, key: Any) -> int:
+        """
+        Searches for the node holding the key.
+
+        Args:
+            key: The key to search for.
+
+        Returns:
+            The index of the node, or NIL if the key is not found.
+        """
+        keys, left, right = self._keys, self._left, self._right
+        index = self._root
+        while index != NIL:
+            node_key = keys[index]
+            if key == node_key:
+                return index
+            index = left[index] if key < node_key else right[index]
+        return NIL
+
+    def __len__(self) -> int:
+        """
+        Returns the number of elements in the Treap.
+        """
+        return self._size(self._root)
+
+    def __contains__(self, key: Any) -> bool:
+        """
+        Checks if the key exists in the Treap.
+        """
+        return self._find(key) != NIL
+
+    def __getitem__(self, key: Any) -> Any:
+        """
+        Retrieves the value associated with the given key.
+
+        Raises:
+            KeyError: If the key is not found in the Treap.
+        """
+        index = self._find(key)
+        if index == NIL:
+            raise KeyError(f"Key {key} not found")
+        return self._values[index]
+
+    def __setitem__(self, key: Any, value: Any) -> None:
+        """
+        Sets the value for the given key in the Treap.
+        """
+        index = self._find(key)
+        if index != NIL:
+            self._values[index] = value
+            return
+
+        new_index = self._new_node(key, value)
+        priority = self._priorities[new_index]
+        keys, left, right = self._keys, self._left, self._right
+        parent = NIL
+        current = self._root
+        while current != NIL and self._priorities[current] > priority:
+            self._sizes[current] += 1
+            parent = current
+            current = left[current] if key < keys[current] else right[current]
+
+        left[new_index], right[new_index] = self._split(current, key)
+        self._update(new_index)
+
+        if parent == NIL:
+            self._root = new_index
+        elif key < keys[parent]:
+            left[parent] = new_index
+        else:
+            right[parent] = new_index
+
+    def __delitem__(self, key: Any) -> None:
+        """
+        Deletes the key-value pair from the Treap.
+
+        Raises:
+            KeyError: If the key is not found.
+        """
+        keys, left, right = self._keys, self._left, self._right
+        path: List[int] = []
+        index = self._root
+        while index != NIL and key != keys[index]:
+            path.append(index)
+            index = left[index] if key < keys[index] else right[index]
+        if index == NIL:
+            raise KeyError(f"Key {key} not found")
+
+        for ancestor in path:
+            self._sizes[ancestor] -= 1
+
+        replacement = self._merge(left[index], right[index])
+        if not path:
+            self._root = replacement
+        elif left[path[-1]] == index:
+            left[path[-1]] = replacement
+        else:
+            right[path[-1]] = replacement
+        self._free_node(index)
+
+    def clear(self) -> None:
+        """
+        Removes all items and releases the buffers.
+        """
+        for buffer in (self._keys, self._priorities, self._left, self._right):
+            del buffer[:]
+        del self._sizes[:]
+        del self._values[:]
+        self._root = NIL
+        self._free = NIL
+
+    def __iter__(self) -> Iterator:
+        """
+        Returns an iterator over the keys in ascending order.
+        """
+        return self._walk(self._left, self._right)
+
+    def __reversed__(self) -> Iterator:
+        """
+        Returns an iterator over the keys in descending order.
+        """
+        return self._walk(self._right, self._left)
+
+    def _walk(self, first: array, second: array) -> Iterator:
+        """
+        Iterative in-order traversal parametrized by the child arrays.
+
+        Args:
+            first: The child array visited before the node.
+            second: The child array visited after the node.
+
+        Yields:
+            The keys in traversal order.
+        """
+        keys = self._keys
+        stack: List[int] = []
+        index = self._root
+        while stack or index != NIL:
+            while index != NIL:
+                stack.append(index)
+                index = first[index]
+            index = stack.pop()
+            yield keys[index]
+            index = second[index]
+
+    def select(self, k: int) -> Any:
+        """
+        Returns the key with the given zero-based position in sorted order.
+
+        Args:
+            k: The position of the key. Negative values count from the end.
+
+        Raises:
+            IndexError: If `k` is out of range.
+        """
+        size = len(self)
+        if k < 0:
+            k += size
+        if not 0 <= k < size:
+            raise IndexError("Treap index out of range")
+
+        index = self._root
+        while True:
+            left_size = self._size(self._left[index])
+            if k < left_size:
+                index = self._left[index]
+            elif k == left_size:
+                return self._keys[index]
+            else:
+                k -= left_size + 1
+                index = self._right[index]
+
+    def rank(self, key: Any) -> int:
+        """
+        Returns the number of keys strictly less than the given key.
+        """
+        result = 0
+        index = self._root
+        while index != NIL:
+            if key <= self._keys[index]:
+                index = self._left[index]
+            else:
+                result += self._size(self._left[index]) + 1
+                index = self._right[index]
+        return result
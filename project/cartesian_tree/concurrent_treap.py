@@ -0,0 +1,262 @@
+import threading
+from contextlib import contextmanager
+from typing import Optional, Iterator, Tuple, Any, Iterable, Union
+from collections.abc import ItemsView, Mapping, MutableMapping, ValuesView
+
+from project.cartesian_tree.treap import Treap
+
+_MISSING = object()
+
+
+class ReadWriteLock:
+    """
+    A writer-preferring reader-writer lock.
+
+    Any number of readers may hold the lock at the same time, while a writer
+    holds it alone. Once a writer is waiting, new readers wait as well, so a
+    steady stream of readers cannot starve the writers.
+
+    Attributes:
+        condition (threading.Condition): The condition variable guarding the counters.
+        readers (int): The number of threads currently reading.
+        writer (bool): True while a thread holds the lock for writing.
+        waiting_writers (int): The number of writers waiting for the lock.
+    """
+
+    def __init__(self) -> None:
+        self.condition: threading.Condition = threading.Condition(threading.Lock())
+        self.readers: int = 0
+        self.writer: bool = False
+        self.waiting_writers: int = 0
+
+    def acquire_read(self) -> None:
+        """
+        Blocks until no writer holds or waits for the lock, then registers a reader.
+        """
+        with self.condition:
+            while self.writer or self.waiting_writers:
+                self.condition.wait()
+            self.readers += 1
+
+    def release_read(self) -> None:
+        """
+        Unregisters a reader and wakes up the writers if it was the last one.
+        """
+        with self.condition:
+            self.readers -= 1
+            if self.readers == 0:
+                self.condition.notify_all()
+
+    def acquire_write(self) -> None:
+        """
+        Blocks until there are no readers and no writer, then takes the lock.
+        """
+        with self.condition:
+            self.waiting_writers += 1
+            while self.writer or self.readers:
+                self.condition.wait()
+            self.waiting_writers -= 1
+            self.writer = True
+
+    def release_write(self) -> None:
+        """
+        Releases the lock taken for writing and wakes up all waiting threads.
+        """
+        with self.condition:
+            self.writer = False
+            self.condition.notify_all()
+
+    @contextmanager
+    def read(self) -> Iterator[None]:
+        """
+        Holds the lock for reading inside a `with` block.
+        """
+        self.acquire_read()
+        try:
+            yield
+        finally:
+            self.release_read()
+
+    @contextmanager
+    def write(self) -> Iterator[None]:
+        """
+        Holds the lock for writing inside a `with` block.
+        """
+        self.acquire_write()
+        try:
+            yield
+        finally:
+            self.release_write()
+
+
+class ConcurrentTreap(MutableMapping):
+    """
+    A thread-safe wrapper around a `Treap` guarded by a reader-writer lock.
+
+    Lookups, order statistics and iteration take the lock for reading and run
+    concurrently; writes take it for writing and are serialized. Iteration
+    copies the keys under the read lock and then yields them without holding
+    it, so a slow consumer never blocks the writers.
+
+    Several writes can be applied under a single lock acquisition with
+    `update()` or the `write_batch()` context manager. `pop`, `popitem`,
+    `setdefault` and `clear` are atomic as well, and `items`, `values`, `get`
+    and `==` read a consistent state under one acquisition of the read lock.
+    """
+
+    def __init__(self, treap: Optional[Treap] = None):
+        """
+        Args:
+            treap: The Treap to wrap. It must not be used directly afterwards.
+        """
+        self._treap: Treap = treap if treap is not None else Treap()
+        self._lock: ReadWriteLock = ReadWriteLock()
+
+    def __getitem__(self, key: Any) -> Any:
+        with self._lock.read():
+            return self._treap[key]
+
+    def __contains__(self, key: Any) -> bool:
+        with self._lock.read():
+            return key in self._treap
+
+    def __len__(self) -> int:
+        with self._lock.read():
+            return len(self._treap)
+
+    def __iter__(self) -> Iterator:
+        with self._lock.read():
+            keys = list(self._treap)
+        return iter(keys)
+
+    def __reversed__(self) -> Iterator:
+        with self._lock.read():
+            keys = list(reversed(self._treap))
+        return iter(keys)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Mapping):
+            return NotImplemented
+        with self._lock.read():
+            items = dict(self._treap.items_range())
+        return items == dict(other.items())
+
+    def get(self, key: Any, default: Any = None) -> Any:
+        with self._lock.read():
+            return self._treap.get(key, default)
+
+    def items(self) -> ItemsView:
+        """
+        Returns a view of a consistent copy of the items, in key order.
+        """
+        with self._lock.read():
+            items = dict(self._treap.items_range())
+        return items.items()
+
+    def values(self) -> ValuesView:
+        """
+        Returns a view of a consistent copy of the values, in key order.
+        """
+        with self._lock.read():
+            items = dict(self._treap.items_range())
+        return items.values()
+
+    def __setitem__(self, key: Any, value: Any) -> None:
+        with self._lock.write():
+            self._treap[key] = value
+
+    def __delitem__(self, key: Any) -> None:
+        with self._lock.write():
+            del self._treap[key]
+
+    def pop(self, key: Any, default: Any = _MISSING) -> Any:
+        """
+        Removes a key and returns its value, or `default` if it is missing.
+
+        Raises:
+            KeyError: If the key is missing and no default is given.
+        """
+        with self._lock.write():
+            if key in self._treap:
+                value = self._treap[key]
+                del self._treap[key]
+                return value
+        if default is _MISSING:
+            raise KeyError(key)
+        return default
+
+    def popitem(self) -> Tuple[Any, Any]:
+        """
+        Removes and returns the item with the smallest key.
+
+        Raises:
+            KeyError: If the Treap is empty.
+        """
+        with self._lock.write():
+            if not len(self._treap):
+                raise KeyError("popitem(): treap is empty")
+            key = self._treap.select(0)
+            value = self._treap[key]
+            del self._treap[key]
+            return key, value
+
+    def setdefault(self, key: Any, default: Any = None) -> Any:
+        """
+        Returns the value of a key, inserting `default` first if it is missing.
+        """
+        with self._lock.write():
+            if key not in self._treap:
+                self._treap[key] = default
+            return self._treap[key]
+
+    def clear(self) -> None:
+        """
+        Removes all items at once.
+        """
+        with self._lock.write():
+            self._treap.root = None
+
+    def select(self, k: int) -> Any:
+        with self._lock.read():
+            return self._treap.select(k)
+
+    def rank(self, key: Any) -> int:
+        with self._lock.read():
+            return self._treap.rank(key)
+
+    def count_range(self, lo: Any = None, hi: Any = None) -> int:
+        with self._lock.read():
+            return self._treap.count_range(lo, hi)
+
+    def items_range(
+        self, lo: Any = None, hi: Any = None, reverse: bool = False
+    ) -> Iterator[Tuple[Any, Any]]:
+        """
+        Returns an iterator over a consistent copy of the items in [lo, hi).
+        """
+        with self._lock.read():
+            items = list(self._treap.items_range(lo, hi, reverse))
+        return iter(items)
+
+    def update(  # type: ignore[override]
+        self, items: Union[Mapping, Iterable[Tuple[Any, Any]]] = (), **kwargs: Any
+    ) -> None:
+        """
+        Inserts or updates several items under one acquisition of the write lock.
+        """
+        pairs = list(items.items() if isinstance(items, Mapping) else items)
+        pairs.extend(kwargs.items())
+        with self._lock.write():
+            for key, value in pairs:
+                self._treap[key] = value
+
+    @contextmanager
+    def write_batch(self) -> Iterator[Treap]:
+        """
+        Holds the write lock and gives direct access to the wrapped Treap.
+
+        Yields:
+            The wrapped Treap, which may be read and modified freely inside the block.
+        """
+        with self._lock.write():
+            yield self._treap
@@ -0,0 +1,417 @@
+import random
+from typing import Optional, Iterator, Tuple, Any, List, Iterable, Union
+from collections.abc import MutableSequence
+
+
+class ImplicitTreapNode:
+    """
+    Represents a node of an implicit-key Treap.
+
+    The position of a node is not stored: it is the number of nodes to its
+    left, computed from the subtree sizes on the way down.
+
+    Attributes:
+        value: The element stored in the node.
+        priority: The priority of the node (used for balancing the Treap).
+        left: Left child node.
+        right: Right child node.
+        size: The number of nodes in the subtree rooted at this node.
+        reversed: A lazy flag meaning the subtree has to be mirrored.
+    """
+
+    __slots__ = ("value", "priority", "left", "right", "size", "reversed")
+
+    def __init__(self, value: Any, priority: Optional[int] = None):
+        self.value: Any = value
+        self.priority: int = (
+            priority if priority is not None else random.randint(1, 2**31 - 1)
+        )
+        self.left: Optional[ImplicitTreapNode] = None
+        self.right: Optional[ImplicitTreapNode] = None
+        self.size: int = 1
+        self.reversed: bool = False
+
+
+class ImplicitTreap(MutableSequence):
+    """
+    A sequence stored in a Treap keyed by position (also known as a rope).
+
+    Indexing, `insert(i, x)`, `del seq[i:j]`, contiguous slicing,
+    concatenation and `reverse(i, j)` cost O(log n) (plus O(k) to copy k
+    elements out of a slice), since they are built on split by position and
+    merge by priority. Reversal is applied lazily and pushed down to the
+    children only when a node is visited.
+
+    Implements MutableSequence, so it supports list-like operations.
+    """
+
+    def __init__(self, iterable: Iterable = ()):
+        """
+        Initializes the sequence with the elements of `iterable` in O(n).
+        """
+        self.root: Optional[ImplicitTreapNode] = self._build(iterable)
+
+    def _size(self, node: Optional[ImplicitTreapNode]) -> int:
+        """
+        Returns the size of the subtree stored in `node`.
+        """
+        return node.size if node is not None else 0
+
+    def _update(self, node: ImplicitTreapNode) -> None:
+        """
+        Recomputes the subtree size of `node` from its children.
+        """
+        node.size = 1 + self._size(node.left) + self._size(node.right)
+
+    def _push(self, node: ImplicitTreapNode) -> None:
+        """
+        Applies a pending reversal of `node` and passes it on to the children.
+        """
+        if node.reversed:
+            node.left, node.right = node.right, node.left
+            if node.left is not None:
+                node.left.reversed = not node.left.reversed
+            if node.right is not None:
+                node.right.reversed = not node.right.reversed
+            node.reversed = False
+
+    def _build(self, values: Iterable) -> Optional[ImplicitTreapNode]:
+        """
+        Builds a tree over `values` in O(n) with a stack of the right spine.
+
+        Args:
+            values: The elements in sequence order.
+
+        Returns:
+            The root node of the built tree.
+        """
+        stack: List[ImplicitTreapNode] = []
+        root: Optional[ImplicitTreapNode] = None
+        for value in values:
+            node = ImplicitTreapNode(value)
+            last: Optional[ImplicitTreapNode] = None
+            while stack and stack[-1].priority < node.priority:
+                last = stack.pop()
+                self._update(last)
+            node.left = last
+            if stack:
+                stack[-1].right = node
+            else:
+                root = node
+            stack.append(node)
+        for node in reversed(stack):
+            self._update(node)
+        return root
+
+    def split(
+        self, node: Optional[ImplicitTreapNode], count: int
+    ) -> Tuple[Optional[ImplicitTreapNode], Optional[ImplicitTreapNode]]:
+        """
+        Splits a subtree into its first `count` elements and the rest.
+
+        Args:
+            node: The root node of the subtree to split.
+            count: The number of elements that go to the left part.
+
+        Returns:
+            A tuple containing the two resulting sub-trees.
+        """
+        left_root: Optional[ImplicitTreapNode] = None
+        right_root: Optional[ImplicitTreapNode] = None
+        left_tail: Optional[ImplicitTreapNode] = None
+        right_tail: Optional[ImplicitTreapNode] = None
+        path: List[ImplicitTreapNode] = []
+
+        while node is not None:
+            self._push(node)
+            path.append(node)
+            left_size = self._size(node.left)
+            if count <= left_size:
+                if right_tail is None:
+                    right_root = node
+                else:
+                    right_tail.left = node
+                right_tail = node
+                node = node.left
+            else:
+                count -= left_size + 1
+                if left_tail is None:
+                    left_root = node
+                else:
+                    left_tail.right = node
+                left_tail = node
+                node = node.right
+
+        if left_tail is not None:
+            left_tail.right = None
+        if right_tail is not None:
+            right_tail.left = None
+        for node in reversed(path):
+            self._update(node)
+        return left_root, right_root
+
+    def merge(
+        self,
+        left_node: Optional[ImplicitTreapNode],
+        right_node: Optional[ImplicitTreapNode],
+    ) -> Optional[ImplicitTreapNode]:
+        """
+        Concatenates two subtrees, maintaining the heap property of priorities.
+
+        Args:
+            left_node: The root node of the first sub-tree.
+            right_node: The root node of the second sub-tree.
+
+        Returns:
+            The root node of the merged Treap.
+        """
+        root: Optional[ImplicitTreapNode] = None
+        parent: Optional[ImplicitTreapNode] = None
+        attach_right = False
+        path: List[ImplicitTreapNode] = []
+
+        while left_node is not None and right_node is not None:
+            if left_node.priority > right_node.priority:
+                child = left_node
+                self._push(child)
+                left_node = child.right
+                next_attach_right = True
+            else:
+                child = right_node
+                self._push(child)
+                right_node = child.left
+                next_attach_right = False
+
+            if parent is None:
+                root = child
+            elif attach_right:
+                parent.right = child
+            else:
+                parent.left = child
+            path.append(child)
+            parent, attach_right = child, next_attach_right
+
+        rest = left_node if left_node is not None else right_node
+        if parent is None:
+            return rest
+        if attach_right:
+            parent.right = rest
+        else:
+            parent.left = rest
+        for node in reversed(path):
+            self._update(node)
+        return root
+
+    def __len__(self) -> int:
+        """
+        Returns the number of elements in the sequence.
+        """
+        return self._size(self.root)
+
+    def _index(self, index: int) -> int:
+        """
+        Turns a possibly negative index into a position in the sequence.
+
+        Raises:
+            IndexError: If the index is out of range.
+        """
+        size = len(self)
+        if index < 0:
+            index += size
+        if not 0 <= index < size:
+            raise IndexError("ImplicitTreap index out of range")
+        return index
+
+    def _node_at(self, index: int) -> ImplicitTreapNode:
+        """
+        Descends to the node at a valid position, pushing reversals on the way.
+        """
+        node = self.root
+        while node is not None:
+            self._push(node)
+            left_size = self._size(node.left)
+            if index < left_size:
+                node = node.left
+            elif index == left_size:
+                return node
+            else:
+                index -= left_size + 1
+                node = node.right
+        raise IndexError("ImplicitTreap index out of range")
+
+    def _cut(
+        self, start: int, stop: int
+    ) -> Tuple[
+        Optional[ImplicitTreapNode],
+        Optional[ImplicitTreapNode],
+        Optional[ImplicitTreapNode],
+    ]:
+        """
+        Splits the sequence into [0, start), [start, stop) and [stop, len).
+        """
+        left, rest = self.split(self.root, start)
+        middle, right = self.split(rest, stop - start)
+        return left, middle, right
+
+    def __getitem__(self, index: Union[int, slice]) -> Any:
+        """
+        Returns the element at `index`, or a new ImplicitTreap for a slice.
+
+        Raises:
+            IndexError: If the index is out of range.
+        """
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step != 1:
+                values = list(self)
+                return type(self)(values[index])
+            if start >= stop:
+                return type(self)()
+            left, middle, right = self._cut(start, stop)
+            values = list(self._values(middle))
+            self.root = self.merge(self.merge(left, middle), right)
+            return type(self)(values)
+        return self._node_at(self._index(index)).value
+
+    def __setitem__(self, index: Union[int, slice], value: Any) -> None:
+        """
+        Replaces the element at `index`, or the elements of a slice.
+
+        Raises:
+            IndexError: If the index is out of range.
+            ValueError: If an extended slice gets a sequence of another length.
+        """
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step != 1:
+                positions = range(start, stop, step)
+                values = list(value)
+                if len(values) != len(positions):
+                    raise ValueError(
+                        f"attempt to assign sequence of size {len(values)} "
+                        f"to extended slice of size {len(positions)}"
+                    )
+                for position, item in zip(positions, values):
+                    self._node_at(position).value = item
+                return
+            # Build first: the value may fail to iterate or iterate over self
+            replacement = self._build(list(value))
+            stop = max(start, stop)
+            left, _, right = self._cut(start, stop)
+            self.root = self.merge(self.merge(left, replacement), right)
+            return
+        self._node_at(self._index(index)).value = value
+
+    def __delitem__(self, index: Union[int, slice]) -> None:
+        """
+        Removes the element at `index`, or the elements of a slice.
+
+        Raises:
+            IndexError: If the index is out of range.
+        """
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step == 1:
+                if start < stop:
+                    left, _, right = self._cut(start, stop)
+                    self.root = self.merge(left, right)
+                return
+            for position in sorted(range(start, stop, step), reverse=True):
+                del self[position]
+            return
+        position = self._index(index)
+        left, _, right = self._cut(position, position + 1)
+        self.root = self.merge(left, right)
+
+    def insert(self, index: int, value: Any) -> None:
+        """
+        Inserts `value` before position `index`, like `list.insert`.
+        """
+        size = len(self)
+        if index < 0:
+            index = max(index + size, 0)
+        index = min(index, size)
+        left, right = self.split(self.root, index)
+        self.root = self.merge(self.merge(left, ImplicitTreapNode(value)), right)
+
+    def extend(self, values: Iterable) -> None:
+        """
+        Appends the elements of `values`, building them into a tree in O(m)
+        and concatenating it in O(log n).
+        """
+        if values is self:
+            values = list(values)
+        self.root = self.merge(self.root, self._build(values))
+
+    def concat(self, other: "ImplicitTreap") -> None:
+        """
+        Moves the elements of `other` to the end of this sequence in O(log n).
+        `other` is left empty.
+        """
+        if other is self:
+            raise ValueError("Cannot concatenate a sequence with itself")
+        self.root = self.merge(self.root, other.root)
+        other.root = None
+
+    def __add__(self, other: Iterable) -> "ImplicitTreap":
+        """
+        Returns a new sequence with the elements of both operands.
+        """
+        result = type(self)(self)
+        result.extend(other)
+        return result
+
+    def __iadd__(self, other: Iterable) -> "ImplicitTreap":
+        self.extend(other)
+        return self
+
+    def reverse(self, start: int = 0, stop: Optional[int] = None) -> None:
+        """
+        Reverses the elements in [start, stop) in O(log n) with a lazy flag.
+
+        Args:
+            start: The first position of the reversed range.
+            stop: The position after the reversed range, or None for the end.
+        """
+        start, stop, _ = slice(start, stop).indices(len(self))
+        if stop - start < 2:
+            return
+        left, middle, right = self._cut(start, stop)
+        if middle is not None:
+            middle.reversed = not middle.reversed
+        self.root = self.merge(self.merge(left, middle), right)
+
+    def clear(self) -> None:
+        """
+        Removes all elements.
+        """
+        self.root = None
+
+    def __iter__(self) -> Iterator:
+        """
+        Returns an iterator over the elements in sequence order.
+        """
+        return self._values(self.root)
+
+    def _values(self, node: Optional[ImplicitTreapNode]) -> Iterator:
+        """
+        Iterative in-order traversal of a subtree.
+
+        Args:
+            node: The root of the subtree.
+
+        Yields:
+            The elements of the subtree in sequence order.
+        """
+        stack: List[ImplicitTreapNode] = []
+        while stack or node is not None:
+            while node is not None:
+                self._push(node)
+                stack.append(node)
+                node = node.left
+            node = stack.pop()
+            yield node.value
+            node = node.right
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({list(self)!r})"
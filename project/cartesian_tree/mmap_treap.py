@@ -0,0 +1,229 @@
+import mmap
+from array import array
+import pickle
+import struct
+from bisect import bisect_left, bisect_right
+from typing import Optional, Iterator, Tuple, Any, List
+from collections.abc import Mapping
+
+# File layout (native byte order, every section aligned to 8 bytes):
+#   header:     magic, byte-order check, item count, size of the value section
+#   keys:       int64[count], ascending
+#   priorities: int64[count]
+#   offsets:    uint64[count + 1], offsets of the pickled values in the value section
+#   values:     the pickled values one after another
+MAGIC = b"TREAP\x00v1"
+BYTE_ORDER_CHECK = 0x0102030405060708
+HEADER = struct.Struct("=8sQQQ")
+
+
+def write_treap_file(
+    path: str, keys: List[int], values: List[Any], priorities: List[int]
+) -> None:
+    """
+    Writes sorted Treap items to a flat binary file.
+
+    Args:
+        path: The path of the file to write.
+        keys: The keys in ascending order.
+        values: The values in the order of the keys.
+        priorities: The priorities in the order of the keys.
+
+    Raises:
+        TypeError: If a key is not an integer.
+    """
+    for key in keys:
+        if not isinstance(key, int):
+            raise TypeError(f"Only integer keys can be dumped, got {key!r}")
+
+    blobs = [pickle.dumps(value, pickle.HIGHEST_PROTOCOL) for value in values]
+    offsets = [0]
+    for blob in blobs:
+        offsets.append(offsets[-1] + len(blob))
+
+    count = len(keys)
+    with open(path, "wb") as file:
+        file.write(HEADER.pack(MAGIC, BYTE_ORDER_CHECK, count, offsets[-1]))
+        file.write(array("q", keys).tobytes())
+        file.write(array("q", priorities).tobytes())
+        file.write(array("Q", offsets).tobytes())
+        file.writelines(blobs)
+
+
+class MmapTreap(Mapping):
+    """
+    A read-only Treap served straight from a file written by `Treap.dump`.
+
+    The file is memory-mapped and its sections are exposed as typed
+    memoryviews, so opening does not parse anything and lookups only touch
+    the pages they need. Since the keys are stored in sorted order, a lookup
+    is a binary search, `select` is O(1) and range queries cost O(log n + k).
+
+    Values are unpickled on access, so only files from trusted sources
+    should be opened.
+    """
+
+    def __init__(self, path: str):
+        """
+        Maps the file into memory.
+
+        Args:
+            path: The path of a file written by `Treap.dump`.
+
+        Raises:
+            ValueError: If the file is not a Treap dump or has another byte order.
+        """
+        self._file = open(path, "rb")
+        try:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # An empty file cannot be mapped
+            self._file.close()
+            raise ValueError(f"{path} is not a Treap dump")
+
+        if len(self._mmap) < HEADER.size:
+            self.close()
+            raise ValueError(f"{path} is not a Treap dump")
+        magic, check, count, _ = HEADER.unpack_from(self._mmap)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not a Treap dump")
+        if check != BYTE_ORDER_CHECK:
+            self.close()
+            raise ValueError(f"{path} was written with another byte order")
+
+        self._count: int = count
+        view = memoryview(self._mmap)
+        start = HEADER.size
+        self._keys = view[start : start + 8 * count].cast("q")
+        start += 8 * count
+        self._priorities = view[start : start + 8 * count].cast("q")
+        start += 8 * count
+        self._offsets = view[start : start + 8 * (count + 1)].cast("Q")
+        start += 8 * (count + 1)
+        self._values = view[start:]
+        self._view: Optional[memoryview] = view
+
+    def close(self) -> None:
+        """
+        Releases the memory map and closes the file.
+        """
+        if getattr(self, "_view", None) is not None:
+            for buffer in (self._keys, self._priorities, self._offsets, self._values):
+                buffer.release()
+            self._view.release()  # type: ignore[union-attr]
+            self._view = None
+        self._mmap.close()
+        self._file.close()
+
+    def __enter__(self) -> "MmapTreap":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def _value(self, index: int) -> Any:
+        """
+        Unpickles the value stored at the given position.
+        """
+        return pickle.loads(
+            self._values[self._offsets[index] : self._offsets[index + 1]]
+        )
+
+    def _index(self, key: Any) -> int:
+        """
+        Returns the position of `key`, or -1 if it is not stored.
+        """
+        index = bisect_left(self._keys, key)
+        if index < self._count and self._keys[index] == key:
+            return index
+        return -1
+
+    def __getitem__(self, key: Any) -> Any:
+        """
+        Retrieves the value associated with the given key.
+
+        Raises:
+            KeyError: If the key is not found.
+        """
+        index = self._index(key)
+        if index < 0:
+            raise KeyError(f"Key {key} not found")
+        return self._value(index)
+
+    def __contains__(self, key: Any) -> bool:
+        return self._index(key) >= 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __iter__(self) -> Iterator:
+        return iter(self._keys)
+
+    def __reversed__(self) -> Iterator:
+        return reversed(self._keys)
+
+    def priorities(self) -> Iterator[int]:
+        """
+        Returns an iterator over the stored priorities in key order.
+        """
+        return iter(self._priorities)
+
+    def select(self, k: int) -> Any:
+        """
+        Returns the key with the given zero-based position in sorted order.
+
+        Raises:
+            IndexError: If `k` is out of range.
+        """
+        try:
+            return self._keys[k]
+        except IndexError:
+            raise IndexError("Treap index out of range") from None
+
+    def rank(self, key: Any) -> int:
+        """
+        Returns the number of keys strictly less than the given key.
+        """
+        return bisect_left(self._keys, key)
+
+    def bisect_left(self, key: Any) -> int:
+        return bisect_left(self._keys, key)
+
+    def bisect_right(self, key: Any) -> int:
+        return bisect_right(self._keys, key)
+
+    def _bounds(self, lo: Any, hi: Any) -> Tuple[int, int]:
+        """
+        Returns the positions of the first key in [lo, hi) and of the first key after it.
+        """
+        start = 0 if lo is None else bisect_left(self._keys, lo)
+        stop = self._count if hi is None else bisect_left(self._keys, hi)
+        return start, max(start, stop)
+
+    def irange(self, lo: Any = None, hi: Any = None, reverse: bool = False) -> Iterator:
+        """
+        Lazily iterates over the keys in the half-open range [lo, hi).
+        """
+        start, stop = self._bounds(lo, hi)
+        positions = range(start, stop)
+        for index in reversed(positions) if reverse else positions:
+            yield self._keys[index]
+
+    def items_range(
+        self, lo: Any = None, hi: Any = None, reverse: bool = False
+    ) -> Iterator[Tuple[Any, Any]]:
+        """
+        Lazily iterates over the key-value pairs with keys in [lo, hi).
+        """
+        start, stop = self._bounds(lo, hi)
+        positions = range(start, stop)
+        for index in reversed(positions) if reverse else positions:
+            yield self._keys[index], self._value(index)
+
+    def count_range(self, lo: Any = None, hi: Any = None) -> int:
+        """
+        Counts the keys in the range [lo, hi) in O(log n).
+        """
+        start, stop = self._bounds(lo, hi)
+        return stop - start
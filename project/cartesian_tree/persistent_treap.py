@@ -0,0 +1,315 @@
+from typing import Optional, Iterator, Tuple, Any, List, Callable, Iterable, Union
+from collections.abc import Mapping
+
+from project.cartesian_tree.treap import Monoid, Treap, TreapNode
+
+
+class PersistentTreap(Treap):
+    """
+    A copy-on-write Treap whose versions share structure.
+
+    `split`, `merge`, `insert` and `_delete` copy every node on the path they
+    change instead of modifying it, so a published node is never mutated again.
+    A write allocates O(log n) new nodes, and `snapshot()` is O(1): it just
+    captures the current root. For the same reason `copy()` is O(1) and the
+    set operations (`union`, `intersection`, ...) share the untouched
+    subtrees of their operands.
+
+    This makes it safe for readers to iterate a snapshot while a single writer
+    keeps modifying the Treap.
+    """
+
+    _shares_nodes = True
+
+    def snapshot(self) -> "TreapSnapshot":
+        """
+        Returns a frozen read-only view of the current version in O(1).
+        """
+        return TreapSnapshot(self.root, self.monoid)
+
+    def copy(self) -> "PersistentTreap":
+        """
+        Returns a copy of the Treap in O(1); both copies share all nodes.
+        """
+        return type(self)(self.root, self.monoid)
+
+    def _writable(self, node: TreapNode) -> TreapNode:
+        """
+        Copies a node before the set operations change it.
+        """
+        return node.copy()
+
+    def set_many(self, items: Union[Mapping, Iterable[Tuple[Any, Any]]]) -> None:
+        """
+        Inserts or updates many items, uniting this Treap with a Treap built
+        from the batch so that only the changed paths are copied.
+
+        Args:
+            items: A mapping, an iterable of key-value pairs or a NumPy array
+                   with two columns. For repeated keys the last value wins.
+        """
+        batch = self._build_sorted(self._sorted_pairs(items))
+        self.root = self._union(self.root, batch, self._resolver("right"))
+
+    def split(
+        self, node: Optional[TreapNode], key: int, strict: bool = False
+    ) -> Tuple[Optional[TreapNode], Optional[TreapNode]]:
+        """
+        Splits a subtree like `Treap.split`, copying the nodes on the split path.
+
+        Args:
+            node: The root node of the subtree to split.
+            key: The key at which to split the tree.
+            strict: If True, a node equal to `key` goes to the right sub-treap.
+
+        Returns:
+            A tuple containing the two resulting sub-trees.
+        """
+        left_root: Optional[TreapNode] = None
+        right_root: Optional[TreapNode] = None
+        left_tail: Optional[TreapNode] = None
+        right_tail: Optional[TreapNode] = None
+        path: List[TreapNode] = []
+
+        while node is not None:
+            node = node.copy()
+            path.append(node)
+            if key < node.key or (strict and key == node.key):
+                if right_tail is None:
+                    right_root = node
+                else:
+                    right_tail.left = node
+                right_tail = node
+                node = node.left
+            else:
+                if left_tail is None:
+                    left_root = node
+                else:
+                    left_tail.right = node
+                left_tail = node
+                node = node.right
+
+        if left_tail is not None:
+            left_tail.right = None
+        if right_tail is not None:
+            right_tail.left = None
+
+        self._update_path(path)
+        return left_root, right_root
+
+    def merge(
+        self, left_node: Optional[TreapNode], right_node: Optional[TreapNode]
+    ) -> Optional[TreapNode]:
+        """
+        Merges two subtrees like `Treap.merge`, copying the nodes on the merge path.
+
+        Args:
+            left_node: The root node of the first sub-tree.
+            right_node: The root node of the second sub-tree.
+
+        Returns:
+            The root node of the merged Treap.
+        """
+        root: Optional[TreapNode] = None
+        parent: Optional[TreapNode] = None
+        attach_right = False
+        path: List[TreapNode] = []
+
+        while left_node is not None and right_node is not None:
+            if left_node.priority > right_node.priority:
+                child = left_node.copy()
+                left_node = child.right
+                next_attach_right = True
+            else:
+                child = right_node.copy()
+                right_node = child.left
+                next_attach_right = False
+
+            if parent is None:
+                root = child
+            elif attach_right:
+                parent.right = child
+            else:
+                parent.left = child
+            path.append(child)
+            parent, attach_right = child, next_attach_right
+
+        rest = left_node if left_node is not None else right_node
+        if parent is None:
+            return rest
+        if attach_right:
+            parent.right = rest
+        else:
+            parent.left = rest
+
+        self._update_path(path)
+        return root
+
+    def insert(self, node: Optional[TreapNode], key: int, value: Any) -> TreapNode:
+        """
+        Inserts or updates a key, copying the path from the root to the change.
+
+        Args:
+            node: The current root node.
+            key: The key of the node to insert.
+            value: The value associated with the key.
+
+        Returns:
+            The root node of the new version.
+        """
+        target = self._find_node(node, key)
+        if target is not None:
+            path, _ = self._copy_path(node, key, lambda n: n is target)
+            updated = target.copy()
+            updated.value = value
+            self._update(updated)
+            self._attach(path, key, updated)
+            return path[0] if path else updated
+
+        return self._insert_new(node, TreapNode(key, value))
+
+    def _insert_new(self, node: Optional[TreapNode], new_node: TreapNode) -> TreapNode:
+        """
+        Inserts a node with an absent key, copying the path above its place.
+
+        Args:
+            node: The root node of the current version.
+            new_node: The node to insert.
+
+        Returns:
+            The root node of the new version.
+        """
+        key = new_node.key
+        path, current = self._copy_path(
+            node, key, lambda n: n.priority <= new_node.priority
+        )
+        new_node.left, new_node.right = self.split(current, key)
+        self._update(new_node)
+        self._attach(path, key, new_node)
+        return path[0] if path else new_node
+
+    def _delete(self, node: Optional[TreapNode], key: int) -> Optional[TreapNode]:
+        """
+        Deletes a key, copying the path from the root to the removed node.
+
+        Args:
+            node: The current root node.
+            key: The key to delete.
+
+        Returns:
+            The root node of the new version.
+
+        Raises:
+            KeyError: If the key is not found.
+        """
+        target = self._find_node(node, key)
+        if target is None:
+            raise KeyError(f"Key {key} not found")
+
+        path, _ = self._copy_path(node, key, lambda n: n is target)
+        return self._attach(path, key, self.merge(target.left, target.right))
+
+    def _copy_path(
+        self,
+        node: Optional[TreapNode],
+        key: Any,
+        stop: Callable[[TreapNode], bool],
+    ) -> Tuple[List[TreapNode], Optional[TreapNode]]:
+        """
+        Copies the search path for `key` until `stop` accepts a node.
+
+        Args:
+            node: The root node of the current version.
+            key: The key that defines the search path.
+            stop: A predicate that tells at which original node to stop.
+
+        Returns:
+            The copied nodes in top-down order and the original node where
+            the descent stopped (None if it fell off the tree).
+        """
+        path: List[TreapNode] = []
+        while node is not None and not stop(node):
+            copy = node.copy()
+            if path:
+                if key < path[-1].key:
+                    path[-1].left = copy
+                else:
+                    path[-1].right = copy
+            path.append(copy)
+            node = copy.left if key < copy.key else copy.right
+        return path, node
+
+    def _attach(
+        self, path: List[TreapNode], key: Any, child: Optional[TreapNode]
+    ) -> Optional[TreapNode]:
+        """
+        Hangs `child` under the end of a copied path and refreshes the copies.
+
+        Args:
+            path: The copied nodes in top-down order.
+            key: The key that defines the path.
+            child: The new subtree that replaces the node where the path stopped.
+
+        Returns:
+            The root of the new version.
+        """
+        if not path:
+            return child
+        parent = path[-1]
+        if key < parent.key:
+            parent.left = child
+        else:
+            parent.right = child
+        self._update_path(path)
+        return path[0]
+
+
+class TreapSnapshot(Mapping):
+    """
+    A frozen read-only view of one version of a `PersistentTreap`.
+
+    Besides the Mapping API it offers the read-only queries of `Treap`:
+    reverse iteration, order statistics, range queries, aggregates and
+    the item with the highest priority.
+    """
+
+    def __init__(self, root: Optional[TreapNode], monoid: Optional[Monoid] = None):
+        self._treap = Treap(root, monoid)
+
+    def __getitem__(self, key: Any) -> Any:
+        return self._treap[key]
+
+    def __contains__(self, key: Any) -> bool:
+        return key in self._treap
+
+    def __iter__(self) -> Iterator:
+        return iter(self._treap)
+
+    def __reversed__(self) -> Iterator:
+        return reversed(self._treap)
+
+    def __len__(self) -> int:
+        return len(self._treap)
+
+    def select(self, k: int) -> Any:
+        return self._treap.select(k)
+
+    def rank(self, key: Any) -> int:
+        return self._treap.rank(key)
+
+    def irange(self, lo: Any = None, hi: Any = None, reverse: bool = False) -> Iterator:
+        return self._treap.irange(lo, hi, reverse)
+
+    def items_range(
+        self, lo: Any = None, hi: Any = None, reverse: bool = False
+    ) -> Iterator[Tuple[Any, Any]]:
+        return self._treap.items_range(lo, hi, reverse)
+
+    def count_range(self, lo: Any = None, hi: Any = None) -> int:
+        return self._treap.count_range(lo, hi)
+
+    def aggregate(self, lo: Any = None, hi: Any = None) -> Any:
+        return self._treap.aggregate(lo, hi)
+
+    def peek_max_priority(self) -> Tuple[Any, Any, int]:
+        return self._treap.peek_max_priority()
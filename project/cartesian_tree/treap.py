@@ -1,6 +1,59 @@
+import heapq
 import random
-from typing import Optional, Iterator, Tuple, Any
-from collections.abc import MutableMapping
+from bisect import bisect_left, bisect_right
+from operator import itemgetter
+from typing import (
+    TYPE_CHECKING,
+    Optional,
+    Iterator,
+    Tuple,
+    Any,
+    List,
+    Iterable,
+    Union,
+    Callable,
+)
+from collections.abc import Mapping, MutableMapping
+
+if TYPE_CHECKING:
+    from project.cartesian_tree.mmap_treap import MmapTreap
+
+# How to combine the values of a key present in both operands of a set operation:
+# "left" keeps the value of this Treap, "right" takes the value of the other one,
+# a callable receives (key, left_value, right_value) and returns the result.
+ConflictPolicy = Union[str, Callable[[Any, Any, Any], Any]]
+
+# Marks a missing default in the batch lookups
+_MISSING = object()
+
+
+class Monoid:
+    """
+    An associative operation with an identity element used to aggregate ranges of a Treap.
+
+    Attributes:
+        combine: An associative function of two aggregates.
+        identity: The aggregate of an empty range.
+        measure: A function of (key, value) that gives the aggregate of a single item.
+                 By default the value itself is used.
+    """
+
+    def __init__(
+        self,
+        combine: Callable[[Any, Any], Any],
+        identity: Any,
+        measure: Optional[Callable[[Any, Any], Any]] = None,
+    ):
+        self.combine: Callable[[Any, Any], Any] = combine
+        self.identity: Any = identity
+        self.measure: Callable[[Any, Any], Any] = (
+            measure if measure is not None else lambda key, value: value
+        )
+
+
+SUM = Monoid(lambda a, b: a + b, 0)
+MIN = Monoid(min, float("inf"))
+MAX = Monoid(max, float("-inf"))
 
 
 class TreapNode:
@@ -13,8 +66,12 @@ class TreapNode:
         priority: The priority of the node (used for balancing the Treap).
         left: Left child node.
         right: Right child node.
+        size: The number of nodes in the subtree rooted at this node.
+        aggregate: The aggregate of the subtree when the Treap has a monoid.
     """
 
+    __slots__ = ("key", "value", "priority", "left", "right", "size", "aggregate")
+
     def __init__(self, key: int, value: Any, priority: Optional[int] = None):
         self.key: int = key
         self.value: Any = value
@@ -23,6 +80,22 @@ class TreapNode:
         )
         self.left: Optional[TreapNode] = None
         self.right: Optional[TreapNode] = None
+        self.size: int = 1
+        self.aggregate: Any = None
+
+    def copy(self) -> "TreapNode":
+        """
+        Returns a shallow copy of the node that shares its children.
+        """
+        node = TreapNode.__new__(TreapNode)
+        node.key = self.key
+        node.value = self.value
+        node.priority = self.priority
+        node.left = self.left
+        node.right = self.right
+        node.size = self.size
+        node.aggregate = self.aggregate
+        return node
 
 
 class Treap(MutableMapping):
@@ -30,40 +103,495 @@ class Treap(MutableMapping):
     A Treap (also known as Cartesian Tree) is a data structure that combines binary search tree and heap properties.
     It supports efficient insertion, deletion, and searching.
 
+    Every node stores the size of its subtree, so `len()` and the order
+    statistics (`select`, `rank`, `kth_smallest`, `kth_largest`) run in O(log n).
+    No operation recurses: the walks use loops and the set algebra and
+    `delete_many` use an explicit stack. So even a tree that degenerates into
+    a chain, for example under monotone priorities from `set_with_priority`,
+    never hits the recursion limit.
+
+    With a `Monoid` every node also keeps the aggregate of its subtree, which
+    lets `aggregate(lo, hi)` answer range queries in O(log n).
+
     Implements MutableMapping, so it supports dictionary-like operations.
     """
 
-    def __init__(self, root: Optional[TreapNode] = None):
+    def __init__(
+        self, root: Optional[TreapNode] = None, monoid: Optional[Monoid] = None
+    ):
+        """
+        Args:
+            root: The root node of an existing tree.
+            monoid: The aggregate kept on every node, or None for no aggregates.
+                    The aggregates of the nodes under `root` must already be up to date.
+        """
         self.root: Optional[TreapNode] = root
+        self.monoid: Optional[Monoid] = monoid
+
+    # True for Treaps whose nodes may be shared with other versions
+    _shares_nodes = False
+
+    @classmethod
+    def from_sorted(
+        cls, items: Iterable[Tuple[Any, Any]], monoid: Optional[Monoid] = None
+    ) -> "Treap":
+        """
+        Builds a Treap from key-value pairs sorted by key in O(n).
+
+        Equal keys are allowed; the last value wins, as with `dict`.
+
+        Args:
+            items: Key-value pairs in ascending key order.
+            monoid: The aggregate kept on every node, or None for no aggregates.
+
+        Returns:
+            A new Treap holding the given items.
+
+        Raises:
+            ValueError: If the keys are not sorted in ascending order.
+        """
+        treap = cls(monoid=monoid)
+        treap.root = treap._build_sorted(items)
+        return treap
+
+    def update_bulk(self, items: Union[Mapping, Iterable[Tuple[Any, Any]]]) -> None:
+        """
+        Inserts or updates many items at once.
+
+        The items are sorted, merged with the current contents and the tree is
+        rebuilt in linear time, so the whole call costs O(n + m log m) instead
+        of m separate insertions. Existing keys keep their priorities; only new
+        keys get random ones.
+
+        Args:
+            items: A mapping or an iterable of key-value pairs in any order.
+                   For repeated keys the last value wins.
+        """
+        pairs = items.items() if isinstance(items, Mapping) else items
+        new_items = sorted(
+            ((key, value, None) for key, value in pairs), key=itemgetter(0)
+        )
+        if not new_items:
+            return
+        current = (
+            (node.key, node.value, node.priority)
+            for node in self._inorder_nodes(self.root)
+        )
+        # heapq.merge is stable, so new values come after the old ones and win,
+        # while the node built from the old item keeps its priority
+        merged = list(heapq.merge(current, new_items, key=itemgetter(0)))
+        self.root = self._build_sorted(
+            ((key, value) for key, value, _ in merged),
+            (priority for _, _, priority in merged),
+        )
+
+    def dump(self, path: str) -> None:
+        """
+        Writes the Treap to a compact binary file.
+
+        The file holds the sorted keys, the priorities, the offsets of the
+        pickled values and the values themselves as flat arrays, so
+        `Treap.open_mmap` can serve it without parsing. Keys must be integers
+        that fit into 64 bits.
+
+        Args:
+            path: The path of the file to write.
+
+        Raises:
+            TypeError: If a key is not an integer.
+        """
+        from project.cartesian_tree.mmap_treap import write_treap_file
+
+        nodes = list(self._inorder_nodes(self.root))
+        write_treap_file(
+            path,
+            [node.key for node in nodes],
+            [node.value for node in nodes],
+            [node.priority for node in nodes],
+        )
+
+    @classmethod
+    def load(cls, path: str, monoid: Optional[Monoid] = None) -> "Treap":
+        """
+        Reads a file written by `dump` into a Treap with the same shape in O(n).
+
+        Args:
+            path: The path of the file to read.
+            monoid: The aggregate kept on every node, or None for no aggregates.
+
+        Returns:
+            A new Treap with the stored items and priorities.
+        """
+        with cls.open_mmap(path) as stored:
+            treap = cls(monoid=monoid)
+            treap.root = treap._build_sorted(stored.items_range(), stored.priorities())
+        return treap
+
+    @staticmethod
+    def open_mmap(path: str) -> "MmapTreap":
+        """
+        Opens a file written by `dump` as a read-only memory-mapped Treap.
+
+        Opening costs O(1) regardless of the size of the file: lookups, range
+        iteration and order statistics read the mapped arrays directly.
+
+        Args:
+            path: The path of the file to open.
+
+        Returns:
+            A read-only mapping backed by the file.
+        """
+        from project.cartesian_tree.mmap_treap import MmapTreap
+
+        return MmapTreap(path)
+
+    def get_many(self, keys: Iterable, default: Any = _MISSING) -> List[Any]:
+        """
+        Looks up many keys with one merged traversal of the tree.
+
+        The batch is sorted and pushed down the tree, so a node shared by the
+        search paths of several keys is visited once.
+
+        Args:
+            keys: An iterable or a NumPy array of keys.
+            default: The value returned for missing keys. If it is not given,
+                     a missing key raises KeyError.
+
+        Returns:
+            The values in the order of `keys`.
+
+        Raises:
+            KeyError: If a key is missing and no default is given.
+        """
+        batch = self._as_list(keys)
+        if hasattr(keys, "argsort"):
+            order = keys.argsort(kind="stable").tolist()
+        else:
+            order = sorted(range(len(batch)), key=batch.__getitem__)
+        nodes = self._locate_many([batch[i] for i in order])
+
+        result = [default] * len(batch)
+        for position, node in zip(order, nodes):
+            if node is not None:
+                result[position] = node.value
+            elif default is _MISSING:
+                raise KeyError(f"Key {batch[position]} not found")
+        return result
+
+    def set_many(self, items: Union[Mapping, Iterable[Tuple[Any, Any]]]) -> None:
+        """
+        Inserts or updates many items at once.
+
+        The batch is sorted and the existing keys are found and updated with
+        one merged traversal; only the new keys are then inserted one by one,
+        without repeating the search.
+
+        Args:
+            items: A mapping, an iterable of key-value pairs or a NumPy array
+                   with two columns. For repeated keys the last value wins.
+        """
+        pairs = self._sorted_pairs(items)
+        visited: List[TreapNode] = []
+        nodes = self._locate_many([key for key, _ in pairs], visited)
+
+        root = self.root
+        for (key, value), node in zip(pairs, nodes):
+            if node is not None:
+                node.value = value
+        if self.monoid is not None:
+            # The pre-order of the traversal reversed updates children first
+            self._update_path(visited)
+        for (key, value), node in zip(pairs, nodes):
+            if node is None:
+                root = self._insert_new(root, TreapNode(key, value))
+        self.root = root
+
+    def delete_many(self, keys: Iterable, missing_ok: bool = False) -> int:
+        """
+        Deletes many keys with one merged traversal of the tree.
+
+        Args:
+            keys: An iterable or a NumPy array of keys.
+            missing_ok: If False, a missing key raises KeyError before anything
+                        is deleted. If True, missing keys are ignored.
+
+        Returns:
+            The number of deleted keys.
+
+        Raises:
+            KeyError: If a key is missing and `missing_ok` is False.
+        """
+        batch = sorted(set(self._as_list(keys)))
+        nodes = self._locate_many(batch)
+        found = []
+        for key, node in zip(batch, nodes):
+            if node is not None:
+                found.append(key)
+            elif not missing_ok:
+                raise KeyError(f"Key {key} not found")
+
+        self.root = self._delete_sorted(self.root, found, 0, len(found))
+        return len(found)
+
+    def _as_list(self, items: Iterable) -> List[Any]:
+        """
+        Turns a batch into a list, converting NumPy arrays to Python scalars.
+        """
+        if hasattr(items, "tolist"):
+            return items.tolist()
+        return list(items)
+
+    def _sorted_pairs(
+        self, items: Union[Mapping, Iterable[Tuple[Any, Any]]]
+    ) -> List[Tuple[Any, Any]]:
+        """
+        Sorts a batch of items by key, keeping only the last value of a repeated key.
+        """
+        pairs: Iterable[Tuple[Any, Any]]
+        if isinstance(items, Mapping):
+            pairs = sorted(items.items(), key=itemgetter(0))
+        elif getattr(items, "ndim", None) == 2:
+            # Sort a two-column NumPy array in C and convert the columns at once
+            ordered = items[items[:, 0].argsort(kind="stable")]  # type: ignore[index]
+            pairs = zip(ordered[:, 0].tolist(), ordered[:, 1].tolist())
+        else:
+            pairs = sorted(items, key=itemgetter(0))
+
+        result: List[Tuple[Any, Any]] = []
+        for key, value in pairs:
+            if result and result[-1][0] == key:
+                result[-1] = (key, value)
+            else:
+                result.append((key, value))
+        return result
+
+    def _locate_many(
+        self, keys: List[Any], visited: Optional[List[TreapNode]] = None
+    ) -> List[Optional[TreapNode]]:
+        """
+        Finds the nodes of sorted keys by pushing the whole batch down the tree.
+
+        Args:
+            keys: The keys in ascending order.
+            visited: If given, the visited nodes are appended to it in pre-order.
+
+        Returns:
+            The node of every key, or None for a missing key.
+        """
+        nodes: List[Optional[TreapNode]] = [None] * len(keys)
+        stack = [(self.root, 0, len(keys))] if keys else []
+        while stack:
+            node, lo, hi = stack.pop()
+            if hi - lo == 1:
+                # A single key left: a plain descent is cheaper than bisecting
+                key = keys[lo]
+                while node is not None:
+                    if visited is not None:
+                        visited.append(node)
+                    if key == node.key:
+                        nodes[lo] = node
+                        break
+                    node = node.left if key < node.key else node.right
+                continue
+            if node is None:
+                continue
+            if visited is not None:
+                visited.append(node)
+            first = bisect_left(keys, node.key, lo, hi)
+            last = bisect_right(keys, node.key, first, hi)
+            for position in range(first, last):
+                nodes[position] = node
+            if lo < first:
+                stack.append((node.left, lo, first))
+            if last < hi:
+                stack.append((node.right, last, hi))
+        return nodes
+
+    def _delete_sorted(
+        self, node: Optional[TreapNode], keys: List[Any], lo: int, hi: int
+    ) -> Optional[TreapNode]:
+        """
+        Deletes the sorted keys `keys[lo:hi]`, all present in the subtree.
+
+        Returns:
+            The root of the subtree after the deletion.
+        """
+
+        def expand(node, lo, hi):
+            if node is None or lo >= hi:
+                return node, None, None
+            if hi - lo == 1:
+                return self._delete(node, keys[lo]), None, None
+            first = bisect_left(keys, node.key, lo, hi)
+            last = bisect_right(keys, node.key, first, hi)
+            node = self._writable(node)
+            return (
+                (node, first < last),
+                (node.left, lo, first),
+                (node.right, last, hi),
+            )
+
+        def combine(context, left, right):
+            node, deleted = context
+            node.left, node.right = left, right
+            if deleted:
+                return self.merge(left, right)
+            self._update(node)
+            return node
+
+        return self._bottom_up((node, lo, hi), expand, combine)
+
+    def _bottom_up(
+        self,
+        task: Tuple,
+        expand: Callable[..., Tuple[Any, Optional[Tuple], Optional[Tuple]]],
+        combine: Callable[[Any, Any, Any], Any],
+    ) -> Any:
+        """
+        Evaluates a divide and conquer over two subtrees with an explicit stack.
+
+        The batch deletion and the set operations follow the shape of the tree,
+        whose depth is only logarithmic for random priorities; with priorities
+        chosen by the caller it can be linear, so they must not recurse.
+
+        Args:
+            task: The arguments of the first call of `expand`.
+            expand: Takes the arguments of a task and returns a triple. If the
+                    second item is None, the first is the result of the task.
+                    Otherwise it returns a context and the left and right subtasks.
+            combine: Takes the context and the results of the two subtasks and
+                     returns the result of the task.
+
+        Returns:
+            The result of the first task.
+        """
+        pending: List[Tuple[bool, Any]] = [(False, task)]
+        results: List[Any] = []
+        while pending:
+            is_combine, item = pending.pop()
+            if is_combine:
+                right = results.pop()
+                left = results.pop()
+                results.append(combine(item, left, right))
+                continue
+            context, left_task, right_task = expand(*item)
+            if left_task is None:
+                results.append(context)
+                continue
+            # The left subtask runs to completion first, as in the recursion
+            pending.append((True, context))
+            pending.append((False, right_task))
+            pending.append((False, left_task))
+        return results[0]
+
+    def _build_sorted(
+        self,
+        items: Iterable[Tuple[Any, Any]],
+        priorities: Optional[Iterable[Optional[int]]] = None,
+    ) -> Optional[TreapNode]:
+        """
+        Builds a Cartesian tree over sorted items with a stack of the right spine.
+
+        Every node is pushed and popped at most once, so the construction is linear.
+
+        Args:
+            items: Key-value pairs in ascending key order.
+            priorities: The priorities of the items, or None for random ones.
+                        A None entry gives that item a random priority. A
+                        repeated key keeps the priority of its first item.
+
+        Returns:
+            The root node of the built tree.
+
+        Raises:
+            ValueError: If the keys are not sorted in ascending order.
+        """
+        stack: List[TreapNode] = []
+        root: Optional[TreapNode] = None
+        previous: Optional[TreapNode] = None
+        priority_iter = iter(priorities) if priorities is not None else None
+
+        for key, value in items:
+            # Advance the priorities in step with the items, repeated keys included
+            priority = next(priority_iter) if priority_iter is not None else None
+            if previous is not None and not previous.key < key:
+                if key == previous.key:
+                    previous.value = value
+                    continue
+                raise ValueError("Keys must be sorted in ascending order")
+
+            node = TreapNode(key, value, priority)
+            last: Optional[TreapNode] = None
+            while stack and stack[-1].priority < node.priority:
+                last = stack.pop()
+                # The popped node will not receive new children any more
+                self._update(last)
+            node.left = last
+            if stack:
+                stack[-1].right = node
+            else:
+                root = node
+            stack.append(node)
+            previous = node
+
+        self._update_path(stack)
+        return root
 
     def split(
-        self, node: Optional[TreapNode], key: int
+        self, node: Optional[TreapNode], key: int, strict: bool = False
     ) -> Tuple[Optional[TreapNode], Optional[TreapNode]]:
         """
-        Splits the Treap into two sub-treaps: one with keys smaller than the given key,
-        and the other with keys greater or equal to the given key.
+        Splits the Treap into two sub-treaps: one with keys less than or equal to the given key,
+        and the other with keys greater than the given key.
 
         Args:
             node: The current root node to start splitting.
             key: The key at which to split the tree.
+            strict: If True, a node equal to `key` goes to the right sub-treap,
+                    so the left one holds only keys strictly less than `key`.
 
         Returns:
             A tuple containing the two resulting sub-trees.
         """
-        if node is None:
-            return None, None
-        elif key < node.key:
-            left, node.left = self.split(node.left, key)
-            return left, node
-        else:
-            node.right, right = self.split(node.right, key)
-            return node, right
+        left_root: Optional[TreapNode] = None
+        right_root: Optional[TreapNode] = None
+        left_tail: Optional[TreapNode] = None
+        right_tail: Optional[TreapNode] = None
+        path: List[TreapNode] = []
+
+        while node is not None:
+            path.append(node)
+            if key < node.key or (strict and key == node.key):
+                # The node and its right subtree go to the right part
+                if right_tail is None:
+                    right_root = node
+                else:
+                    right_tail.left = node
+                right_tail = node
+                node = node.left
+            else:
+                # The node and its left subtree go to the left part
+                if left_tail is None:
+                    left_root = node
+                else:
+                    left_tail.right = node
+                left_tail = node
+                node = node.right
+
+        if left_tail is not None:
+            left_tail.right = None
+        if right_tail is not None:
+            right_tail.left = None
+
+        self._update_path(path)
+        return left_root, right_root
 
     def merge(
         self, left_node: Optional[TreapNode], right_node: Optional[TreapNode]
     ) -> Optional[TreapNode]:
         """
         Merges two Treaps into one, maintaining the Treap properties.
+        All keys of `left_node` must be smaller than the keys of `right_node`.
 
         Args:
             left_node: The root node of the first sub-tree.
@@ -72,21 +600,49 @@ class Treap(MutableMapping):
         Returns:
             The root node of the merged Treap.
         """
-        if right_node is None:
-            return left_node
-        if left_node is None:
-            return right_node
-        elif left_node.priority > right_node.priority:
-            left_node.right = self.merge(left_node.right, right_node)
-            return left_node
+        root: Optional[TreapNode] = None
+        parent: Optional[TreapNode] = None
+        attach_right = False
+        path: List[TreapNode] = []
+
+        while left_node is not None and right_node is not None:
+            if left_node.priority > right_node.priority:
+                child = left_node
+                left_node = left_node.right
+                next_attach_right = True
+            else:
+                child = right_node
+                right_node = right_node.left
+                next_attach_right = False
+
+            if parent is None:
+                root = child
+            elif attach_right:
+                parent.right = child
+            else:
+                parent.left = child
+            path.append(child)
+            parent, attach_right = child, next_attach_right
+
+        rest = left_node if left_node is not None else right_node
+        if parent is None:
+            return rest
+        if attach_right:
+            parent.right = rest
         else:
-            right_node.left = self.merge(left_node, right_node.left)
-            return right_node
+            parent.left = rest
+
+        self._update_path(path)
+        return root
 
     def insert(self, node: Optional[TreapNode], key: int, value: Any) -> TreapNode:
         """
         Inserts a new node into the Treap or updates the value of an existing node.
 
+        The new node is placed by descending while the existing priorities are
+        higher and then splitting the remaining subtree around the key, which
+        avoids rotations and recursion.
+
         Args:
             node: The current root node.
             key: The key of the node to insert.
@@ -95,19 +651,48 @@ class Treap(MutableMapping):
         Returns:
             The updated root node of the Treap.
         """
-        if not node:
-            return TreapNode(key, value)
-        if key == node.key:
-            node.value = value
-        elif key < node.key:
-            node.left = self.insert(node.left, key, value)
-            if node.left.priority > node.priority:
-                node = self._rotate_right(node)
+        if node is not None:
+            existing = self._find_node(node, key)
+            if existing is not None:
+                existing.value = value
+                if self.monoid is not None:
+                    self._update_path(self._search_path(node, key))
+                return node
+        return self._insert_new(node, TreapNode(key, value))
+
+    def _insert_new(self, node: Optional[TreapNode], new_node: TreapNode) -> TreapNode:
+        """
+        Inserts a node whose key is known to be absent from the subtree.
+
+        Args:
+            node: The root node of the subtree.
+            new_node: The node to insert.
+
+        Returns:
+            The updated root node of the subtree.
+        """
+        key = new_node.key
+        root = node
+        path: List[TreapNode] = []
+        current = node
+        while current is not None and current.priority > new_node.priority:
+            current.size += 1
+            path.append(current)
+            current = current.left if key < current.key else current.right
+
+        new_node.left, new_node.right = self.split(current, key)
+        self._update(new_node)
+
+        if root is None or not path:
+            return new_node
+        parent = path[-1]
+        if key < parent.key:
+            parent.left = new_node
         else:
-            node.right = self.insert(node.right, key, value)
-            if node.right.priority > node.priority:
-                node = self._rotate_left(node)
-        return node
+            parent.right = new_node
+        if self.monoid is not None:
+            self._update_path(path)
+        return root
 
     def __len__(self) -> int:
         """
@@ -117,17 +702,43 @@ class Treap(MutableMapping):
 
     def _size(self, node: Optional[TreapNode]) -> int:
         """
-        Calculates the size (number of nodes) in the Treap.
+        Returns the size (number of nodes) of the subtree stored in `node`.
 
         Args:
-            node: The node to start counting from.
+            node: The root of the subtree.
 
         Returns:
             The number of nodes in the subtree rooted at `node`.
         """
-        if node is None:
-            return 0
-        return 1 + self._size(node.left) + self._size(node.right)
+        return node.size if node is not None else 0
+
+    def _update(self, node: TreapNode) -> None:
+        """
+        Recomputes the cached fields (size and aggregate) of `node` from its children.
+
+        Args:
+            node: The node to update.
+        """
+        left, right = node.left, node.right
+        node.size = 1 + self._size(left) + self._size(right)
+        monoid = self.monoid
+        if monoid is not None:
+            aggregate = monoid.measure(node.key, node.value)
+            if left is not None:
+                aggregate = monoid.combine(left.aggregate, aggregate)
+            if right is not None:
+                aggregate = monoid.combine(aggregate, right.aggregate)
+            node.aggregate = aggregate
+
+    def _update_path(self, path: List[TreapNode]) -> None:
+        """
+        Updates the nodes of a root-to-leaf path bottom-up.
+
+        Args:
+            path: The nodes in top-down order.
+        """
+        for node in reversed(path):
+            self._update(node)
 
     def __contains__(self, key: Any) -> bool:
         """
@@ -139,7 +750,7 @@ class Treap(MutableMapping):
         Returns:
             True if the key exists, False otherwise.
         """
-        return self._find(self.root, key) is not None
+        return self._find_node(self.root, key) is not None
 
     def __setitem__(self, key: int, value: Any) -> None:
         """
@@ -164,10 +775,10 @@ class Treap(MutableMapping):
         Raises:
             KeyError: If the key is not found in the Treap.
         """
-        value = self._find(self.root, key)
-        if value is None:
+        node = self._find_node(self.root, key)
+        if node is None:
             raise KeyError(f"Key {key} not found")
-        return value
+        return node.value
 
     def __delitem__(self, key: int) -> None:
         """
@@ -181,6 +792,35 @@ class Treap(MutableMapping):
         """
         self.root = self._delete(self.root, key)
 
+    def _find_node(self, node: Optional[TreapNode], key: int) -> Optional[TreapNode]:
+        """
+        Searches for the node holding the key.
+
+        Args:
+            node: The node to start the search from.
+            key: The key to search for.
+
+        Returns:
+            The node with the given key, or None if the key is not found.
+        """
+        while node is not None:
+            if key == node.key:
+                return node
+            node = node.left if key < node.key else node.right
+        return None
+
+    def _search_path(self, node: Optional[TreapNode], key: Any) -> List[TreapNode]:
+        """
+        Returns the nodes visited while searching for `key`, from `node` down.
+        """
+        path: List[TreapNode] = []
+        while node is not None:
+            path.append(node)
+            if key == node.key:
+                break
+            node = node.left if key < node.key else node.right
+        return path
+
     def _find(self, node: Optional[TreapNode], key: int) -> Any:
         """
         Searches for the key in the Treap and returns its associated value.
@@ -192,14 +832,8 @@ class Treap(MutableMapping):
         Returns:
             The value associated with the key, or None if the key is not found.
         """
-        if node is None:
-            return None
-        if key == node.key:
-            return node.value
-        elif key < node.key:
-            return self._find(node.left, key)
-        else:
-            return self._find(node.right, key)
+        found = self._find_node(node, key)
+        return found.value if found is not None else None
 
     def _delete(self, node: Optional[TreapNode], key: int) -> Optional[TreapNode]:
         """
@@ -215,15 +849,28 @@ class Treap(MutableMapping):
         Raises:
             KeyError: If the key is not found.
         """
+        root = node
+        path: List[TreapNode] = []
+        while node is not None and key != node.key:
+            path.append(node)
+            node = node.left if key < node.key else node.right
         if node is None:
             raise KeyError(f"Key {key} not found")
-        if key < node.key:
-            node.left = self._delete(node.left, key)
-        elif key > node.key:
-            node.right = self._delete(node.right, key)
+
+        for ancestor in path:
+            ancestor.size -= 1
+
+        replacement = self.merge(node.left, node.right)
+        if not path:
+            return replacement
+        parent = path[-1]
+        if parent.left is node:
+            parent.left = replacement
         else:
-            node = self.merge(node.left, node.right)
-        return node
+            parent.right = replacement
+        if self.monoid is not None:
+            self._update_path(path)
+        return root
 
     def __iter__(self) -> Iterator:
         """
@@ -241,10 +888,27 @@ class Treap(MutableMapping):
         Yields:
             The keys of the Treap in ascending order.
         """
-        if node:
-            yield from self._inorder_iter(node.left)
-            yield node.key
-            yield from self._inorder_iter(node.right)
+        for current in self._inorder_nodes(node):
+            yield current.key
+
+    def _inorder_nodes(self, node: Optional[TreapNode]) -> Iterator[TreapNode]:
+        """
+        Iterates over the nodes of a subtree in ascending key order.
+
+        Args:
+            node: The root of the subtree.
+
+        Yields:
+            The nodes of the subtree in ascending key order.
+        """
+        stack: List[TreapNode] = []
+        while stack or node is not None:
+            while node is not None:
+                stack.append(node)
+                node = node.left
+            node = stack.pop()
+            yield node
+            node = node.right
 
     def __reversed__(self) -> Iterator:
         """
@@ -262,10 +926,745 @@ class Treap(MutableMapping):
         Yields:
             The keys of the Treap in descending order.
         """
-        if node:
-            yield from self._reverse_inorder_iter(node.right)
+        stack: List[TreapNode] = []
+        while stack or node is not None:
+            while node is not None:
+                stack.append(node)
+                node = node.right
+            node = stack.pop()
+            yield node.key
+            node = node.left
+
+    def irange(self, lo: Any = None, hi: Any = None, reverse: bool = False) -> Iterator:
+        """
+        Lazily iterates over the keys in the half-open range [lo, hi).
+
+        Only the O(log n) nodes on the boundary paths are visited besides the
+        keys in the range.
+
+        Args:
+            lo: The inclusive lower bound, or None for no lower bound.
+            hi: The exclusive upper bound, or None for no upper bound.
+            reverse: If True, the keys are yielded in descending order.
+
+        Yields:
+            The keys in the range.
+        """
+        for node in self._range_nodes(lo, hi, reverse):
             yield node.key
-            yield from self._reverse_inorder_iter(node.left)
+
+    def items_range(
+        self, lo: Any = None, hi: Any = None, reverse: bool = False
+    ) -> Iterator[Tuple[Any, Any]]:
+        """
+        Lazily iterates over the key-value pairs with keys in [lo, hi).
+
+        Args:
+            lo: The inclusive lower bound, or None for no lower bound.
+            hi: The exclusive upper bound, or None for no upper bound.
+            reverse: If True, the pairs are yielded in descending key order.
+
+        Yields:
+            The key-value pairs in the range.
+        """
+        for node in self._range_nodes(lo, hi, reverse):
+            yield node.key, node.value
+
+    def count_range(self, lo: Any = None, hi: Any = None) -> int:
+        """
+        Counts the keys in the range [lo, hi) in O(log n).
+
+        Args:
+            lo: The inclusive lower bound, or None for no lower bound.
+            hi: The exclusive upper bound, or None for no upper bound.
+
+        Returns:
+            The number of keys in the range.
+        """
+        upper = len(self) if hi is None else self.bisect_left(hi)
+        lower = 0 if lo is None else self.bisect_left(lo)
+        return max(upper - lower, 0)
+
+    def pop_range(self, lo: Any = None, hi: Any = None) -> List[Tuple[Any, Any]]:
+        """
+        Removes the keys in the range [lo, hi) with two splits and one merge.
+
+        Args:
+            lo: The inclusive lower bound, or None for no lower bound.
+            hi: The exclusive upper bound, or None for no upper bound.
+
+        Returns:
+            The removed key-value pairs in ascending key order.
+        """
+        if lo is not None and hi is not None and not lo < hi:
+            return []
+        left: Optional[TreapNode] = None
+        right: Optional[TreapNode] = None
+        middle = self.root
+        if lo is not None:
+            left, middle = self.split(middle, lo, strict=True)
+        if hi is not None:
+            middle, right = self.split(middle, hi, strict=True)
+        self.root = self.merge(left, right)
+        return [(node.key, node.value) for node in self._inorder_nodes(middle)]
+
+    def bisect_left(self, key: Any) -> int:
+        """
+        Returns the number of keys strictly less than `key`.
+
+        Args:
+            key: The key to look up.
+
+        Returns:
+            The leftmost position where `key` could be inserted in sorted order.
+        """
+        return self.rank(key)
+
+    def bisect_right(self, key: Any) -> int:
+        """
+        Returns the number of keys less than or equal to `key`.
+
+        Args:
+            key: The key to look up.
+
+        Returns:
+            The rightmost position where `key` could be inserted in sorted order.
+        """
+        result = 0
+        node = self.root
+        while node is not None:
+            if key < node.key:
+                node = node.left
+            else:
+                result += self._size(node.left) + 1
+                node = node.right
+        return result
+
+    def _range_nodes(self, lo: Any, hi: Any, reverse: bool) -> Iterator[TreapNode]:
+        """
+        Iterates over the nodes with keys in [lo, hi) using bounded descent.
+
+        Args:
+            lo: The inclusive lower bound, or None for no lower bound.
+            hi: The exclusive upper bound, or None for no upper bound.
+            reverse: If True, the nodes are yielded in descending key order.
+
+        Yields:
+            The nodes in the range.
+        """
+        stack: List[TreapNode] = []
+        node = self.root
+
+        if not reverse:
+            # Push the path to the first key that is not less than lo
+            while node is not None:
+                if lo is not None and node.key < lo:
+                    node = node.right
+                else:
+                    stack.append(node)
+                    node = node.left
+            while stack:
+                node = stack.pop()
+                if hi is not None and not node.key < hi:
+                    return
+                yield node
+                node = node.right
+                while node is not None:
+                    stack.append(node)
+                    node = node.left
+        else:
+            # Push the path to the last key that is less than hi
+            while node is not None:
+                if hi is not None and not node.key < hi:
+                    node = node.left
+                else:
+                    stack.append(node)
+                    node = node.right
+            while stack:
+                node = stack.pop()
+                if lo is not None and node.key < lo:
+                    return
+                yield node
+                node = node.left
+                while node is not None:
+                    stack.append(node)
+                    node = node.right
+
+    def aggregate(self, lo: Any = None, hi: Any = None) -> Any:
+        """
+        Combines the measures of the items with keys in [lo, hi) in O(log n).
+
+        Args:
+            lo: The inclusive lower bound, or None for no lower bound.
+            hi: The exclusive upper bound, or None for no upper bound.
+
+        Returns:
+            The aggregate of the range, or the identity for an empty range.
+
+        Raises:
+            ValueError: If the Treap has no monoid.
+        """
+        monoid = self.monoid
+        if monoid is None:
+            raise ValueError("The Treap has no monoid to aggregate with")
+        combine = monoid.combine
+
+        # Find the highest node inside the range: the paths to lo and hi fork there
+        fork = self.root
+        while fork is not None:
+            if lo is not None and fork.key < lo:
+                fork = fork.right
+            elif hi is not None and not fork.key < hi:
+                fork = fork.left
+            else:
+                break
+        if fork is None:
+            return monoid.identity
+
+        # Items of the left subtree that are not less than lo, in order
+        left_part = monoid.identity
+        node = fork.left
+        while node is not None:
+            if lo is None or not node.key < lo:
+                suffix = monoid.measure(node.key, node.value)
+                if node.right is not None:
+                    suffix = combine(suffix, node.right.aggregate)
+                left_part = combine(suffix, left_part)
+                if lo is None:
+                    if node.left is not None:
+                        left_part = combine(node.left.aggregate, left_part)
+                    break
+                node = node.left
+            else:
+                node = node.right
+
+        # Items of the right subtree that are less than hi, in order
+        right_part = monoid.identity
+        node = fork.right
+        while node is not None:
+            if hi is None or node.key < hi:
+                prefix = monoid.measure(node.key, node.value)
+                if node.left is not None:
+                    prefix = combine(node.left.aggregate, prefix)
+                right_part = combine(right_part, prefix)
+                if hi is None:
+                    if node.right is not None:
+                        right_part = combine(right_part, node.right.aggregate)
+                    break
+                node = node.right
+            else:
+                node = node.left
+
+        middle = monoid.measure(fork.key, fork.value)
+        return combine(combine(left_part, middle), right_part)
+
+    def select(self, k: int) -> Any:
+        """
+        Returns the key with the given zero-based position in sorted order.
+
+        Args:
+            k: The position of the key. Negative values count from the end.
+
+        Returns:
+            The key at position `k`.
+
+        Raises:
+            IndexError: If `k` is out of range.
+        """
+        size = len(self)
+        if k < 0:
+            k += size
+        if not 0 <= k < size:
+            raise IndexError("Treap index out of range")
+
+        node = self.root
+        while node is not None:
+            left_size = self._size(node.left)
+            if k < left_size:
+                node = node.left
+            elif k == left_size:
+                return node.key
+            else:
+                k -= left_size + 1
+                node = node.right
+        raise IndexError("Treap index out of range")
+
+    def rank(self, key: Any) -> int:
+        """
+        Returns the number of keys strictly less than the given key.
+
+        Args:
+            key: The key to rank. It does not have to be present in the Treap.
+
+        Returns:
+            The zero-based position the key has (or would have) in sorted order.
+        """
+        result = 0
+        node = self.root
+        while node is not None:
+            if key <= node.key:
+                node = node.left
+            else:
+                result += self._size(node.left) + 1
+                node = node.right
+        return result
+
+    def kth_smallest(self, k: int) -> Any:
+        """
+        Returns the k-th smallest key.
+
+        Args:
+            k: The one-based order of the key.
+
+        Returns:
+            The k-th smallest key.
+
+        Raises:
+            IndexError: If `k` is not in the range [1, len(self)].
+        """
+        if not 1 <= k <= len(self):
+            raise IndexError("k must be between 1 and the size of the Treap")
+        return self.select(k - 1)
+
+    def kth_largest(self, k: int) -> Any:
+        """
+        Returns the k-th largest key.
+
+        Args:
+            k: The one-based order of the key.
+
+        Returns:
+            The k-th largest key.
+
+        Raises:
+            IndexError: If `k` is not in the range [1, len(self)].
+        """
+        if not 1 <= k <= len(self):
+            raise IndexError("k must be between 1 and the size of the Treap")
+        return self.select(len(self) - k)
+
+    def set_with_priority(self, key: Any, value: Any, priority: int) -> None:
+        """
+        Inserts or replaces a key with an explicitly chosen priority.
+
+        The Treap keeps the node with the highest priority at the root, so
+        with caller-supplied priorities it doubles as an addressable max-heap.
+        Note that the depth of the tree is only logarithmic on average when
+        the priorities look random.
+
+        Args:
+            key: The key to insert or update.
+            value: The value to associate with the key.
+            priority: The priority of the node.
+        """
+        if self._find_node(self.root, key) is not None:
+            self.root = self._delete(self.root, key)
+        self.root = self._insert_new(self.root, TreapNode(key, value, priority))
+
+    def priority_of(self, key: Any) -> int:
+        """
+        Returns the priority of the node with the given key.
+
+        Raises:
+            KeyError: If the key is not found.
+        """
+        node = self._find_node(self.root, key)
+        if node is None:
+            raise KeyError(f"Key {key} not found")
+        return node.priority
+
+    def peek_max_priority(self) -> Tuple[Any, Any, int]:
+        """
+        Returns the item with the highest priority in O(1).
+
+        Returns:
+            A (key, value, priority) tuple.
+
+        Raises:
+            IndexError: If the Treap is empty.
+        """
+        if self.root is None:
+            raise IndexError("peek from an empty Treap")
+        return self.root.key, self.root.value, self.root.priority
+
+    def pop_max_priority(self) -> Tuple[Any, Any, int]:
+        """
+        Removes and returns the item with the highest priority in O(log n).
+
+        Returns:
+            A (key, value, priority) tuple.
+
+        Raises:
+            IndexError: If the Treap is empty.
+        """
+        item = self.peek_max_priority()
+        root = self.root
+        assert root is not None
+        self.root = self.merge(root.left, root.right)
+        return item
+
+    def update_priority(self, key: Any, priority: int) -> None:
+        """
+        Changes the priority of a key in O(log n) by moving its node to the
+        place that matches the new priority.
+
+        Raises:
+            KeyError: If the key is not found.
+        """
+        node = self._find_node(self.root, key)
+        if node is None:
+            raise KeyError(f"Key {key} not found")
+        self.root = self._delete(self.root, key)
+        self.root = self._insert_new(self.root, TreapNode(key, node.value, priority))
+
+    def increase_priority(self, key: Any, priority: int) -> None:
+        """
+        Raises the priority of a key to the given value.
+
+        Raises:
+            KeyError: If the key is not found.
+            ValueError: If the new priority is lower than the current one.
+        """
+        if priority < self.priority_of(key):
+            raise ValueError("New priority is lower than the current one")
+        self.update_priority(key, priority)
+
+    def decrease_priority(self, key: Any, priority: int) -> None:
+        """
+        Lowers the priority of a key to the given value.
+
+        Raises:
+            KeyError: If the key is not found.
+            ValueError: If the new priority is higher than the current one.
+        """
+        if priority > self.priority_of(key):
+            raise ValueError("New priority is higher than the current one")
+        self.update_priority(key, priority)
+
+    def merge_heaps(self, other: "Treap", conflict: ConflictPolicy = "right") -> None:
+        """
+        Moves all items of `other` into this Treap, keeping their priorities.
+
+        This is `union_update`: it runs in O(m log(n/m + 1)) and leaves
+        `other` empty. For a key present in both, the node that survives keeps
+        its own priority and gets the value chosen by `conflict`.
+        """
+        self.union_update(other, conflict)
+
+    def copy(self) -> "Treap":
+        """
+        Returns a copy of the Treap with the same shape and priorities.
+        """
+        clone = type(self)(monoid=self.monoid)
+        if self.root is None:
+            return clone
+        clone.root = self.root.copy()
+        stack = [clone.root]
+        while stack:
+            node = stack.pop()
+            if node.left is not None:
+                node.left = node.left.copy()
+                stack.append(node.left)
+            if node.right is not None:
+                node.right = node.right.copy()
+                stack.append(node.right)
+        return clone
+
+    def union(self, other: "Treap", conflict: ConflictPolicy = "right") -> "Treap":
+        """
+        Returns a new Treap with the keys of both Treaps.
+
+        Args:
+            other: The second operand.
+            conflict: The policy for keys present in both Treaps
+                      ("left", "right" or a callable).
+
+        Returns:
+            The union of the two Treaps.
+        """
+        result = self.copy()
+        result.union_update(other.copy(), conflict)
+        return result
+
+    def intersection(
+        self, other: "Treap", conflict: ConflictPolicy = "right"
+    ) -> "Treap":
+        """
+        Returns a new Treap with the keys present in both Treaps.
+
+        Args:
+            other: The second operand.
+            conflict: The policy that chooses the value of every common key.
+
+        Returns:
+            The intersection of the two Treaps.
+        """
+        result = self.copy()
+        result.intersection_update(other.copy(), conflict)
+        return result
+
+    def difference(self, other: "Treap") -> "Treap":
+        """
+        Returns a new Treap with the keys of this Treap that are not in `other`.
+        The values of the remaining keys always come from this Treap.
+        """
+        result = self.copy()
+        result.difference_update(other.copy())
+        return result
+
+    def symmetric_difference(self, other: "Treap") -> "Treap":
+        """
+        Returns a new Treap with the keys present in exactly one of the Treaps.
+        Every remaining key keeps the value from the Treap it came from.
+        """
+        result = self.copy()
+        result.symmetric_difference_update(other.copy())
+        return result
+
+    def union_update(self, other: "Treap", conflict: ConflictPolicy = "right") -> None:
+        """
+        Adds the keys of `other` to this Treap in O(m log(n/m + 1)).
+
+        The nodes of `other` are moved into this Treap, so `other` is left empty.
+
+        Args:
+            other: The Treap to merge in.
+            conflict: The policy for keys present in both Treaps.
+        """
+        self.root = self._union(
+            self.root, self._take_root(other), self._resolver(conflict)
+        )
+
+    def intersection_update(
+        self, other: "Treap", conflict: ConflictPolicy = "right"
+    ) -> None:
+        """
+        Keeps only the keys that are also in `other`, reusing the nodes of this Treap.
+
+        `other` is consumed by the operation and left empty.
+
+        Args:
+            other: The second operand.
+            conflict: The policy that chooses the value of every common key.
+        """
+        self.root = self._intersection(
+            self.root, self._take_root(other), self._resolver(conflict)
+        )
+
+    def difference_update(self, other: "Treap") -> None:
+        """
+        Removes the keys of `other` from this Treap. `other` is left empty.
+        """
+        self.root = self._difference(self.root, self._take_root(other))
+
+    def symmetric_difference_update(self, other: "Treap") -> None:
+        """
+        Keeps the keys present in exactly one of the Treaps, moving the nodes
+        of `other` into this Treap. `other` is left empty.
+        """
+        self.root = self._symmetric_difference(self.root, self._take_root(other))
+
+    def _writable(self, node: TreapNode) -> TreapNode:
+        """
+        Returns a node whose fields the set operations may change.
+        """
+        return node
+
+    def _take_root(self, other: "Treap") -> Optional[TreapNode]:
+        """
+        Empties `other` and returns its root for a set operation that moves
+        its nodes into this Treap.
+
+        The nodes of a copy-on-write operand may be shared with its snapshots,
+        so they are copied first unless this Treap never changes nodes itself.
+        """
+        root = other.root
+        if other._shares_nodes and not self._shares_nodes:
+            root = Treap.copy(other).root
+        other.root = None
+        return root
+
+    def _resolver(self, conflict: ConflictPolicy) -> Callable[[Any, Any, Any], Any]:
+        """
+        Turns a conflict policy into a function of (key, left_value, right_value).
+
+        Raises:
+            ValueError: If the policy is not "left", "right" or a callable.
+        """
+        if callable(conflict):
+            return conflict
+        if conflict == "left":
+            return lambda key, left, right: left
+        if conflict == "right":
+            return lambda key, left, right: right
+        raise ValueError(f"Unknown conflict policy: {conflict!r}")
+
+    def _split_out(
+        self, node: Optional[TreapNode], key: Any
+    ) -> Tuple[Optional[TreapNode], Optional[TreapNode], Optional[TreapNode]]:
+        """
+        Splits a subtree into keys less than, equal to and greater than `key`.
+
+        Returns:
+            The left part, the node with `key` (or None) and the right part.
+        """
+        left, rest = self.split(node, key, strict=True)
+        equal, right = self.split(rest, key)
+        return left, equal, right
+
+    def _union(
+        self,
+        first: Optional[TreapNode],
+        second: Optional[TreapNode],
+        resolve: Callable[[Any, Any, Any], Any],
+        swapped: bool = False,
+    ) -> Optional[TreapNode]:
+        """
+        Unites two subtrees, splitting the lower one by the higher root.
+
+        Args:
+            first: A subtree of the left operand (of the right one if `swapped`).
+            second: A subtree of the other operand.
+            resolve: The resolved conflict policy.
+            swapped: True if `first` comes from the right operand.
+
+        Returns:
+            The root of the united subtree.
+        """
+
+        def expand(first, second, swapped):
+            if first is None:
+                return second, None, None
+            if second is None:
+                return first, None, None
+            if first.priority < second.priority:
+                first, second, swapped = second, first, not swapped
+
+            root = self._writable(first)
+            left, equal, right = self._split_out(second, root.key)
+            if equal is not None:
+                if swapped:
+                    root.value = resolve(root.key, equal.value, root.value)
+                else:
+                    root.value = resolve(root.key, root.value, equal.value)
+            return root, (root.left, left, swapped), (root.right, right, swapped)
+
+        def combine(root, left, right):
+            root.left, root.right = left, right
+            self._update(root)
+            return root
+
+        return self._bottom_up((first, second, swapped), expand, combine)
+
+    def _intersection(
+        self,
+        first: Optional[TreapNode],
+        second: Optional[TreapNode],
+        resolve: Callable[[Any, Any, Any], Any],
+        swapped: bool = False,
+    ) -> Optional[TreapNode]:
+        """
+        Intersects two subtrees.
+
+        Args:
+            first: A subtree of the left operand (of the right one if `swapped`).
+            second: A subtree of the other operand.
+            resolve: The resolved conflict policy.
+            swapped: True if `first` comes from the right operand.
+
+        Returns:
+            The root of the intersected subtree.
+        """
+
+        def expand(first, second, swapped):
+            if first is None or second is None:
+                return None, None, None
+            if first.priority < second.priority:
+                first, second, swapped = second, first, not swapped
+
+            left, equal, right = self._split_out(second, first.key)
+            return (
+                (first, equal, swapped),
+                (first.left, left, swapped),
+                (first.right, right, swapped),
+            )
+
+        def combine(context, new_left, new_right):
+            first, equal, swapped = context
+            if equal is None:
+                return self.merge(new_left, new_right)
+
+            root = self._writable(first)
+            if swapped:
+                root.value = resolve(root.key, equal.value, root.value)
+            else:
+                root.value = resolve(root.key, root.value, equal.value)
+            root.left, root.right = new_left, new_right
+            self._update(root)
+            return root
+
+        return self._bottom_up((first, second, swapped), expand, combine)
+
+    def _difference(
+        self, first: Optional[TreapNode], second: Optional[TreapNode]
+    ) -> Optional[TreapNode]:
+        """
+        Removes the keys of `second` from `first`.
+
+        Returns:
+            The root of the remaining subtree.
+        """
+
+        def expand(first, second):
+            if first is None or second is None:
+                return first, None, None
+
+            left, equal, right = self._split_out(second, first.key)
+            return (first, equal), (first.left, left), (first.right, right)
+
+        return self._bottom_up((first, second), expand, self._keep_unmatched)
+
+    def _symmetric_difference(
+        self, first: Optional[TreapNode], second: Optional[TreapNode]
+    ) -> Optional[TreapNode]:
+        """
+        Keeps the keys present in exactly one of the subtrees.
+
+        Returns:
+            The root of the resulting subtree.
+        """
+
+        def expand(first, second):
+            if first is None:
+                return second, None, None
+            if second is None:
+                return first, None, None
+            if first.priority < second.priority:
+                first, second = second, first
+
+            left, equal, right = self._split_out(second, first.key)
+            return (first, equal), (first.left, left), (first.right, right)
+
+        return self._bottom_up((first, second), expand, self._keep_unmatched)
+
+    def _keep_unmatched(
+        self,
+        context: Tuple[TreapNode, Optional[TreapNode]],
+        new_left: Optional[TreapNode],
+        new_right: Optional[TreapNode],
+    ) -> Optional[TreapNode]:
+        """
+        Combines the results of `_difference` and `_symmetric_difference`:
+        drops the root if the other operand also had its key.
+        """
+        first, equal = context
+        if equal is not None:
+            return self.merge(new_left, new_right)
+
+        root = self._writable(first)
+        root.left, root.right = new_left, new_right
+        self._update(root)
+        return root
 
     def _rotate_right(self, node: TreapNode) -> TreapNode:
         """
@@ -282,6 +1681,8 @@ class Treap(MutableMapping):
         left = node.left
         node.left = left.right
         left.right = node
+        self._update(node)
+        self._update(left)
         return left
 
     def _rotate_left(self, node: TreapNode) -> TreapNode:
@@ -299,4 +1700,6 @@ class Treap(MutableMapping):
         right = node.right
         node.right = right.left
         right.left = node
+        self._update(node)
+        self._update(right)
         return right
@@ -1,48 +1,287 @@
-from collections import OrderedDict
+import asyncio
+import inspect
+import threading
+import time
 from functools import wraps
 
+from project.decorators.cache_keys import content_hash, freeze, make_key_builder
+from project.decorators.cache_policies import CachePolicy, TieredCache, make_policy
+from project.decorators.cache_stats import CacheStats, MetricsReporter
+from project.decorators.disk_cache import DiskCache
+from project.decorators.shared_cache import SharedCache
+from project.decorators.striped_cache import StripedCache
 
-def cache_results(max_cache_size=0):
+_MISSING = object()
+
+
+def cache_results(
+    max_cache_size=0,
+    policy="fifo",
+    ttl=None,
+    weigher=None,
+    thread_safe=False,
+    stripes=16,
+    metrics_callback=None,
+    metrics_interval=1.0,
+    latency_histogram=False,
+    hasher=content_hash,
+    disk=None,
+    shared=None,
+):
     """Decorator to cache function results.
 
     Args:
-        max_cache_size (int): The maximum number of results to cache.
-                               Default is 0, which means no caching.
+        max_cache_size (int): The maximum number of results to cache (the maximum
+                               total weight for the "weight" policy).
+                               Default is 0, which means the cache is unbounded.
+        policy (str or callable): The eviction policy: "fifo" (default), "lru",
+                               "lfu", "ttl", "weight" or "arc", or a callable that
+                               takes `max_cache_size` and returns a `CachePolicy`.
+        ttl (float): The lifetime of a result in seconds for the "ttl" policy.
+        weigher (callable): Returns the weight of a result for the "weight" policy.
+                               Default is `len`.
+        thread_safe (bool): If True, the cache is split into `stripes` locked
+                               stripes and concurrent misses on the same key run
+                               the function only once. Default is False.
+        stripes (int): The number of stripes of a thread-safe cache. Default is 16.
+        metrics_callback (callable): Receives the `CacheInfo` of the function at
+                               most once per `metrics_interval` seconds.
+        metrics_interval (float): The seconds between two reports. Default is 1.0.
+        latency_histogram (bool): If True, `wrapper.latencies` keeps a histogram
+                               of the miss latencies of every key. Default is False.
+        hasher (callable): Turns an unhashable argument into a hashable key.
+                               Default is `content_hash`, which hashes lists, sets,
+                               dicts and NumPy arrays by their content.
+        disk (str, PathLike or DiskCache): Adds a persistent second tier. Lookups
+                               check memory first, then the SQLite file, and promote
+                               disk hits into memory; results are written to both.
+                               Pass a `DiskCache` to set its size limits and
+                               serializer. Default is None (memory only).
+        shared (str, PathLike or SharedCache): Adds a bounded cache in shared
+                               memory that all processes opening the same path
+                               read and write, such as `ProcessPoolExecutor`
+                               workers. It sits between memory and `disk`.
+                               Default is None.
+
+    Arguments are normalized through the signature of the function, so `f(1)`,
+    `f(x=1)` and `f(1, y=0)` share one cache entry when `y` defaults to 0.
+
+    Coroutine functions are cached by their awaited results. Concurrent awaiters
+    of a missing key share one task, and cancelling an awaiter does not cancel it.
+
+    The wrapped function has `cache_info()`, which returns a `CacheInfo` with the
+    hits, misses, evictions, size, hit ratio and estimated time saved, and
+    `cache_clear()`, which empties the cache and resets the statistics.
 
     Returns:
         function: The wrapped function with caching behavior.
+
+    Raises:
+        ValueError: If the policy is unknown or "ttl" is used without a ttl.
     """
 
+    if disk is not None and not isinstance(disk, DiskCache):
+        disk = DiskCache(disk)
+    if shared is not None and not isinstance(shared, SharedCache):
+        shared = SharedCache(shared)
+    backend = disk if shared is None else shared
+    if shared is not None and disk is not None:
+        backend = TieredCache(shared, disk)
+
+    def cache_factory(namespace):
+        """Returns a function that creates an empty cache for one decorated function."""
+
+        def new_policy(size):
+            memory = make_policy(policy, size, ttl, weigher)
+            if backend is None:
+                return memory
+            return TieredCache(memory, backend, namespace)
+
+        def new_cache():
+            if thread_safe:
+                return StripedCache(max_cache_size, new_policy, stripes)
+            return new_policy(max_cache_size)
+
+        return new_cache
+
+    # Fail at decoration time on a bad policy
+    cache_factory("")()
+
     def decorator(func):
-        @wraps(func)
-        def wrapper(*args, **kwargs):
-            # Create a cache key based on the function arguments
-            key = (args, frozenset(kwargs.items()))
+        # Functions sharing a backend are told apart by their qualified name
+        new_cache = cache_factory(f"{func.__module__}.{func.__qualname__}")
+        make_key = make_key_builder(func)
+        stats = CacheStats(latency_histogram)
+        report = None
+        if metrics_callback is not None:
+            reporter = MetricsReporter(metrics_callback, metrics_interval)
+
+            def report():
+                reporter.maybe_report(cache_info)
+
+        if inspect.iscoroutinefunction(func):
+            wrapper = _async_wrapper(func, make_key, hasher, new_cache, stats, report)
+        elif thread_safe:
+            wrapper = _thread_safe_wrapper(
+                func, make_key, hasher, new_cache, stats, report
+            )
+        else:
+            wrapper = _wrapper(func, make_key, hasher, new_cache, stats, report)
+
+        def cache_info():
+            """Returns the statistics of the cache as a `CacheInfo`."""
+            if not isinstance(wrapper.cache, CachePolicy):
+                wrapper.cache = new_cache()
+            return stats.info(wrapper.cache)
+
+        def cache_clear():
+            """Empties the cache and resets the statistics."""
+            wrapper.cache = new_cache()
+            wrapper.calls = 0
+            stats.clear()
+
+        wrapper.cache = new_cache()
+        wrapper.calls = 0
+        wrapper.cache_info = cache_info
+        wrapper.cache_clear = cache_clear
+        wrapper.latencies = stats.latencies
+        return wrapper
+
+    return decorator
+
 
-            # Initialize cache if it doesn't exist
-            if not hasattr(wrapper, "cache"):
-                wrapper.cache = (
-                    OrderedDict()
-                )  # Using OrderedDict to maintain insertion order
+def _wrapper(func, make_key, hasher, new_cache, stats, report):
+    """Wraps `func` with a cache that is used by one thread at a time."""
+    known = None
 
-            if not hasattr(wrapper, "calls"):
-                wrapper.calls = 0  # Initialize call counter on the wrapper
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        # Create a cache key based on the function arguments
+        key = make_key(args, kwargs)
 
-            # Check if the result is already in the cache
-            if key in wrapper.cache:
-                return wrapper.cache[key]
+        # Assigning a plain mapping to `cache` resets it; the type check only
+        # runs when the attribute changed
+        nonlocal known
+        cache = wrapper.cache
+        if cache is not known:
+            if not isinstance(cache, CachePolicy):
+                wrapper.cache = cache = new_cache()
+            known = cache
 
-            # Call the function and cache the result
+        # Check if the result is already in the cache; unhashable arguments
+        # are only detected here, when the policy hashes the key
+        try:
+            result = cache.lookup(key, _MISSING)
+        except TypeError:
+            key = freeze(key, hasher)
+            result = cache.lookup(key, _MISSING)
+        if result is not _MISSING:
+            if report is not None:
+                report()
+            return result
+
+        # Call the function and cache the result; the policy evicts if needed
+        start = time.perf_counter()
+        result = func(*args, **kwargs)
+        stats.record_miss(key, time.perf_counter() - start)
+        wrapper.calls += 1  # Increment the call counter on the wrapper
+        cache.store(key, result)
+
+        if report is not None:
+            report()
+        return result
+
+    return wrapper
+
+
+def _thread_safe_wrapper(func, make_key, hasher, new_cache, stats, report):
+    """Wraps `func` with a `StripedCache` that deduplicates concurrent misses."""
+    calls_lock = threading.Lock()
+    known = None
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        nonlocal known
+        key = make_key(args, kwargs)
+        try:
+            hash(key)
+        except TypeError:
+            key = freeze(key, hasher)
+
+        cache = wrapper.cache
+        if cache is not known:
+            if not isinstance(cache, StripedCache):
+                wrapper.cache = cache = new_cache()
+            known = cache
+
+        def compute():
+            start = time.perf_counter()
             result = func(*args, **kwargs)
-            wrapper.cache[key] = result
-            wrapper.calls += 1  # Increment the call counter on the wrapper
+            stats.record_miss(key, time.perf_counter() - start)
+            with calls_lock:
+                wrapper.calls += 1
+            return result
 
-            # Remove the oldest item if the cache exceeds the max size
-            if max_cache_size > 0 and len(wrapper.cache) > max_cache_size:
-                wrapper.cache.popitem(last=False)  # Remove the oldest item
+        # Only one thread computes a missing key; the others wait for it
+        result = cache.get_or_compute(key, compute)
+        if report is not None:
+            report()
+        return result
 
+    return wrapper
+
+
+def _async_wrapper(func, make_key, hasher, new_cache, stats, report):
+    """Wraps the coroutine function `func`, sharing one task per missing key."""
+    in_flight = {}
+    known = None
+
+    def finish(key, cache, task):
+        if in_flight.get(key) is task:
+            del in_flight[key]
+        if task.cancelled() or task.exception() is not None:
+            return  # Failures are not cached
+        wrapper.calls += 1
+        if wrapper.cache is cache:
+            cache.store(key, task.result())
+
+    async def compute(key, args, kwargs):
+        start = time.perf_counter()
+        result = await func(*args, **kwargs)
+        stats.record_miss(key, time.perf_counter() - start)
+        return result
+
+    @wraps(func)
+    async def wrapper(*args, **kwargs):
+        nonlocal known
+        key = make_key(args, kwargs)
+
+        cache = wrapper.cache
+        if cache is not known:
+            if not isinstance(cache, CachePolicy):
+                wrapper.cache = cache = new_cache()
+            known = cache
+
+        try:
+            result = cache.lookup(key, _MISSING)
+        except TypeError:
+            key = freeze(key, hasher)
+            result = cache.lookup(key, _MISSING)
+        if result is not _MISSING:
+            if report is not None:
+                report()
             return result
 
-        return wrapper
+        # A task left over from another event loop cannot be awaited here
+        task = in_flight.get(key)
+        if task is None or task.get_loop() is not asyncio.get_running_loop():
+            task = asyncio.ensure_future(compute(key, args, kwargs))
+            in_flight[key] = task
+            task.add_done_callback(lambda done: finish(key, cache, done))
 
-    return decorator
+        result = await asyncio.shield(task)
+        if report is not None:
+            report()
+        return result
+
+    return wrapper
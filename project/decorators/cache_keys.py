@@ -0,0 +1,268 @@
+import hashlib
+import inspect
+from operator import itemgetter
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+KeyBuilder = Callable[[tuple, dict], Hashable]
+
+_MISSING = object()
+
+# The number of call shapes whose binding plan is remembered per function
+_MAX_PLANS = 256
+
+
+class _Mark:
+    """
+    A separator inside cache keys that cannot be confused with an argument.
+
+    Marks pickle by name, so keys stay equal after a round trip through disk
+    or shared memory.
+    """
+
+    __slots__ = ("name",)
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __repr__(self) -> str:
+        return f"<{self.name}>"
+
+    def __reduce__(self) -> str:
+        return self.name
+
+
+KWARGS_MARK = _Mark("KWARGS_MARK")
+LIST_MARK = _Mark("LIST_MARK")
+SET_MARK = _Mark("SET_MARK")
+DICT_MARK = _Mark("DICT_MARK")
+BYTES_MARK = _Mark("BYTES_MARK")
+ARRAY_MARK = _Mark("ARRAY_MARK")
+
+
+def generic_key(args: tuple, kwargs: dict) -> Hashable:
+    """
+    Builds a key from the arguments as they were passed.
+
+    Used for functions without an inspectable signature and for calls that do
+    not bind to the signature (the function raises on those anyway).
+    """
+    if not kwargs:
+        return args
+    return args + (KWARGS_MARK,) + tuple(sorted(kwargs.items()))
+
+
+def make_key_builder(func: Callable) -> KeyBuilder:
+    """
+    Returns a function that builds normalized cache keys for the calls of `func`.
+
+    Arguments are bound to the signature of `func`: keyword arguments are moved
+    to their positions and omitted defaults are filled in, so `f(1)`, `f(x=1)`
+    and `f(1, y=0)` share one key when `y` defaults to 0. Keyword-only and
+    variadic keyword arguments follow `KWARGS_MARK` as sorted name-value runs.
+
+    A call with positional arguments only takes a fast path that allocates at
+    most one tuple. For keyword calls the binding is planned once per call
+    shape (number of positional arguments and keyword names) and replayed
+    with `operator.itemgetter`.
+
+    Args:
+        func: The function whose calls are cached.
+
+    Returns:
+        A function that takes the `args` tuple and the `kwargs` dict of a call
+        and returns its key.
+    """
+    try:
+        parameters = inspect.signature(func).parameters.values()
+    except (TypeError, ValueError):
+        return generic_key
+
+    positional: List[str] = []
+    defaults: List[Any] = []
+    index: Dict[str, int] = {}
+    keyword_only: Dict[str, Any] = {}
+    var_positional = var_keyword = False
+    for parameter in parameters:
+        default = (
+            _MISSING if parameter.default is parameter.empty else parameter.default
+        )
+        if parameter.kind is parameter.POSITIONAL_ONLY:
+            positional.append(parameter.name)
+            defaults.append(default)
+        elif parameter.kind is parameter.POSITIONAL_OR_KEYWORD:
+            index[parameter.name] = len(positional)
+            positional.append(parameter.name)
+            defaults.append(default)
+        elif parameter.kind is parameter.VAR_POSITIONAL:
+            var_positional = True
+        elif parameter.kind is parameter.KEYWORD_ONLY:
+            keyword_only[parameter.name] = default
+        else:
+            var_keyword = True
+
+    count = len(positional)
+    # tails[n] holds the defaults that complete a call with n positional arguments
+    tails: List[Optional[tuple]] = [
+        None if _MISSING in defaults[n:] else tuple(defaults[n:])
+        for n in range(count + 1)
+    ]
+    keyword_defaults = {
+        name: default
+        for name, default in keyword_only.items()
+        if default is not _MISSING
+    }
+    keyword_suffix: tuple = ()
+    if keyword_defaults:
+        keyword_suffix = (KWARGS_MARK,)
+        for name in sorted(keyword_defaults):
+            keyword_suffix += (name, keyword_defaults[name])
+
+    def plan(passed: int, names: tuple) -> Optional[Tuple[Callable, tuple]]:
+        """
+        Binds a call shape to the signature.
+
+        Returns a getter and a tuple of constants such that the key of a call
+        is `getter(args + tuple(kwargs.values()) + constants)`, or None if
+        calls of this shape do not bind.
+        """
+        if passed > count and not var_positional:
+            return None
+        constants: List[Any] = []
+
+        def constant(value: Any) -> int:
+            constants.append(value)
+            return passed + len(names) + len(constants) - 1
+
+        slots: List[Optional[int]] = list(range(min(passed, count)))
+        slots.extend([None] * (count - len(slots)))
+        extras: Dict[str, int] = {}
+        for offset, name in enumerate(names):
+            position = index.get(name)
+            if position is not None:
+                if slots[position] is not None:
+                    return None
+                slots[position] = passed + offset
+            elif name in keyword_only or var_keyword:
+                extras[name] = passed + offset
+            else:
+                return None
+        for position, slot in enumerate(slots):
+            if slot is None:
+                if defaults[position] is _MISSING:
+                    return None
+                slots[position] = constant(defaults[position])
+        for name, default in keyword_only.items():
+            if name not in extras:
+                if default is _MISSING:
+                    return None
+                extras[name] = constant(default)
+
+        indices = [slot for slot in slots if slot is not None]
+        indices.extend(range(count, passed))
+        if extras:
+            indices.append(constant(KWARGS_MARK))
+            for name in sorted(extras):
+                indices.append(constant(name))
+                indices.append(extras[name])
+        if len(indices) == 1:
+            only = indices[0]
+            return (lambda values: (values[only],)), tuple(constants)
+        return itemgetter(*indices), tuple(constants)
+
+    plans: Dict[tuple, Optional[Tuple[Callable, tuple]]] = {}
+
+    def build_key(args: tuple, kwargs: dict) -> Hashable:
+        if not kwargs:
+            passed = len(args)
+            if passed == count:
+                return args + keyword_suffix if keyword_suffix else args
+            if passed < count:
+                tail = tails[passed]
+                if tail is None:
+                    return generic_key(args, kwargs)
+                return args + tail + keyword_suffix
+            if not var_positional:
+                return generic_key(args, kwargs)
+            return args + keyword_suffix
+
+        shape = (len(args), *kwargs)
+        try:
+            bound = plans[shape]
+        except KeyError:
+            bound = plan(len(args), shape[1:])
+            if len(plans) < _MAX_PLANS:
+                plans[shape] = bound
+        if bound is None:
+            return generic_key(args, kwargs)
+        getter, constants = bound
+        return getter(args + tuple(kwargs.values()) + constants)
+
+    return build_key
+
+
+def content_hash(value: Any) -> Hashable:
+    """
+    Turns an unhashable argument into a hashable key by its content.
+
+    Lists, sets, dicts and bytearrays are converted recursively; NumPy arrays
+    (any object with `dtype`, `shape` and `tobytes`) are reduced to their
+    dtype, shape and a BLAKE2 digest of their data. A marker keeps the result
+    apart from a tuple with the same items.
+
+    Args:
+        value: The unhashable value.
+
+    Returns:
+        A hashable key that is equal for equal contents.
+
+    Raises:
+        TypeError: If the value is of an unsupported unhashable type.
+    """
+    if isinstance(value, list):
+        return (LIST_MARK,) + tuple(freeze(item, content_hash) for item in value)
+    if isinstance(value, (set, frozenset)):
+        return (SET_MARK, frozenset(freeze(item, content_hash) for item in value))
+    if isinstance(value, dict):
+        items = [
+            (freeze(k, content_hash), freeze(v, content_hash)) for k, v in value.items()
+        ]
+        try:
+            return (DICT_MARK,) + tuple(sorted(items))
+        except TypeError:
+            return (DICT_MARK, frozenset(items))
+    if isinstance(value, bytearray):
+        return (BYTES_MARK, bytes(value))
+    if (
+        hasattr(value, "dtype")
+        and hasattr(value, "shape")
+        and hasattr(value, "tobytes")
+    ):
+        if value.dtype == object:
+            return (ARRAY_MARK, "O", value.shape, freeze(value.tolist(), content_hash))
+        digest = hashlib.blake2b(value.tobytes(), digest_size=16).digest()
+        return (ARRAY_MARK, value.dtype.str, value.shape, digest)
+    raise TypeError(f"unhashable type: {type(value).__name__!r}")
+
+
+def freeze(key: Any, hasher: Callable[[Any], Hashable]) -> Hashable:
+    """
+    Replaces the unhashable parts of a key with `hasher(part)`.
+
+    Tuples are walked recursively, so only the offending arguments are hashed
+    by content.
+
+    Args:
+        key: A key built by a key builder, or any part of it.
+        hasher: Turns an unhashable value into a hashable one.
+
+    Returns:
+        A hashable key.
+    """
+    try:
+        hash(key)
+        return key
+    except TypeError:
+        pass
+    if type(key) is tuple:
+        return tuple(freeze(item, hasher) for item in key)
+    return hasher(key)
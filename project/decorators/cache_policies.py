@@ -0,0 +1,521 @@
+import abc
+import time
+from collections import OrderedDict
+from collections.abc import Mapping
+from typing import Any, Callable, Dict, Hashable, Iterator, Optional, Tuple
+
+_MISSING = object()
+
+
+class CachePolicy(Mapping):
+    """
+    Base class of the eviction policies used by `cache_results`.
+
+    A policy owns the cached entries. `lookup` is called on every call of the
+    decorated function and may update the bookkeeping of the policy (recency,
+    frequency, expiry); `store` is called after a miss and evicts entries when
+    the cache is over its limit. Every operation is O(1).
+
+    The Mapping methods give a read-only view of the cached entries that does
+    not count as an access. A subclass must implement `lookup`, `store` and
+    `clear` as well as `__getitem__`, `__iter__` and `__len__`.
+
+    Attributes:
+        max_size (int): The capacity of the cache; 0 means it is unbounded.
+        hits (int): The number of lookups that found their key.
+        misses (int): The number of lookups that did not.
+        evictions (int): The number of entries evicted or expired.
+    """
+
+    def __init__(self, max_size: int = 0):
+        self.max_size: int = max_size
+        self.hits: int = 0
+        self.misses: int = 0
+        self.evictions: int = 0
+
+    def stats(self) -> Tuple[int, int, int]:
+        """
+        Returns the hits, misses and evictions counted so far.
+        """
+        return self.hits, self.misses, self.evictions
+
+    @abc.abstractmethod
+    def lookup(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Returns the cached value of `key`, or `default` on a miss.
+        """
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def store(self, key: Hashable, value: Any) -> None:
+        """
+        Caches `value` under `key`, evicting entries if the cache is full.
+        """
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def clear(self) -> None:
+        """
+        Removes all entries.
+        """
+        raise NotImplementedError
+
+
+class FIFOPolicy(CachePolicy):
+    """
+    Evicts the entry that was stored first; hits do not change the order.
+    """
+
+    def __init__(self, max_size: int = 0):
+        super().__init__(max_size)
+        self._data: "OrderedDict[Hashable, Any]" = OrderedDict()
+
+    def lookup(self, key: Hashable, default: Any = None) -> Any:
+        value = self._data.get(key, _MISSING)
+        if value is _MISSING:
+            self.misses += 1
+            return default
+        self.hits += 1
+        return value
+
+    def store(self, key: Hashable, value: Any) -> None:
+        self._data[key] = value
+        if self.max_size > 0 and len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def __getitem__(self, key: Hashable) -> Any:
+        return self._data[key]
+
+    def __iter__(self) -> Iterator:
+        return iter(self._data)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class LRUPolicy(FIFOPolicy):
+    """
+    Evicts the least recently used entry: every hit moves the key to the end.
+    """
+
+    def lookup(self, key: Hashable, default: Any = None) -> Any:
+        data = self._data
+        if key in data:
+            data.move_to_end(key)
+            self.hits += 1
+            return data[key]
+        self.misses += 1
+        return default
+
+
+class LFUPolicy(CachePolicy):
+    """
+    Evicts the least frequently used entry, the least recent one among equals.
+
+    Keys are grouped into buckets by their hit count and the smallest count
+    is tracked, so both hits and evictions are O(1).
+    """
+
+    def __init__(self, max_size: int = 0):
+        super().__init__(max_size)
+        self._data: Dict[Hashable, Any] = {}
+        self._counts: Dict[Hashable, int] = {}
+        self._buckets: Dict[int, "OrderedDict[Hashable, None]"] = {}
+        self._min_count: int = 0
+
+    def _touch(self, key: Hashable) -> None:
+        """
+        Moves a key to the bucket of the next count.
+        """
+        count = self._counts[key]
+        bucket = self._buckets[count]
+        del bucket[key]
+        if not bucket:
+            del self._buckets[count]
+            if self._min_count == count:
+                self._min_count = count + 1
+        self._counts[key] = count + 1
+        self._buckets.setdefault(count + 1, OrderedDict())[key] = None
+
+    def lookup(self, key: Hashable, default: Any = None) -> Any:
+        if key not in self._data:
+            self.misses += 1
+            return default
+        self.hits += 1
+        self._touch(key)
+        return self._data[key]
+
+    def store(self, key: Hashable, value: Any) -> None:
+        if key in self._data:
+            self._data[key] = value
+            self._touch(key)
+            return
+        if self.max_size > 0 and len(self._data) >= self.max_size:
+            bucket = self._buckets[self._min_count]
+            evicted, _ = bucket.popitem(last=False)
+            if not bucket:
+                del self._buckets[self._min_count]
+            del self._data[evicted]
+            del self._counts[evicted]
+            self.evictions += 1
+        self._data[key] = value
+        self._counts[key] = 1
+        self._buckets.setdefault(1, OrderedDict())[key] = None
+        self._min_count = 1
+
+    def clear(self) -> None:
+        self._data.clear()
+        self._counts.clear()
+        self._buckets.clear()
+        self._min_count = 0
+
+    def __getitem__(self, key: Hashable) -> Any:
+        return self._data[key]
+
+    def __iter__(self) -> Iterator:
+        return iter(self._data)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class TTLPolicy(CachePolicy):
+    """
+    Expires entries `ttl` seconds after they were stored.
+
+    All entries live equally long, so the insertion order is also the expiry
+    order and expired entries are dropped from the front. When the cache is
+    full the oldest entry is evicted.
+
+    Attributes:
+        ttl (float): The lifetime of an entry in seconds.
+        timer (Callable[[], float]): The clock used to measure the lifetime.
+    """
+
+    def __init__(
+        self,
+        max_size: int = 0,
+        ttl: float = 60.0,
+        timer: Callable[[], float] = time.monotonic,
+    ):
+        super().__init__(max_size)
+        self.ttl: float = ttl
+        self.timer: Callable[[], float] = timer
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+
+    def _expire(self, now: float) -> None:
+        """
+        Drops the expired entries from the front of the queue.
+        """
+        data = self._data
+        while data:
+            key, (_, expires) = next(iter(data.items()))
+            if expires > now:
+                break
+            del data[key]
+            self.evictions += 1
+
+    def lookup(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return default
+        if entry[1] <= self.timer():
+            del self._data[key]
+            self.evictions += 1
+            self.misses += 1
+            return default
+        self.hits += 1
+        return entry[0]
+
+    def store(self, key: Hashable, value: Any) -> None:
+        now = self.timer()
+        self._data.pop(key, None)
+        self._data[key] = (value, now + self.ttl)
+        self._expire(now)
+        if self.max_size > 0 and len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def __getitem__(self, key: Hashable) -> Any:
+        value, expires = self._data[key]
+        if expires <= self.timer():
+            raise KeyError(key)
+        return value
+
+    def __iter__(self) -> Iterator:
+        now = self.timer()
+        return (key for key, (_, expires) in self._data.items() if expires > now)
+
+    def __len__(self) -> int:
+        self._expire(self.timer())
+        return len(self._data)
+
+
+class WeightPolicy(CachePolicy):
+    """
+    An LRU cache limited by the total weight of the values instead of their count.
+
+    Attributes:
+        max_size (int): The maximum total weight; 0 means it is unbounded.
+        weigher (Callable[[Any], float]): Returns the weight of a value.
+    """
+
+    def __init__(self, max_size: int = 0, weigher: Callable[[Any], float] = len):
+        super().__init__(max_size)
+        self.weigher: Callable[[Any], float] = weigher
+        self.total_weight: float = 0
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+
+    def lookup(self, key: Hashable, default: Any = None) -> Any:
+        data = self._data
+        if key in data:
+            data.move_to_end(key)
+            self.hits += 1
+            return data[key][0]
+        self.misses += 1
+        return default
+
+    def store(self, key: Hashable, value: Any) -> None:
+        weight = self.weigher(value)
+        if key in self._data:
+            self.total_weight -= self._data.pop(key)[1]
+        if self.max_size > 0 and weight > self.max_size:
+            return  # The value alone does not fit into the cache
+        self._data[key] = (value, weight)
+        self.total_weight += weight
+        while self.max_size > 0 and self.total_weight > self.max_size:
+            _, (_, evicted_weight) = self._data.popitem(last=False)
+            self.total_weight -= evicted_weight
+            self.evictions += 1
+
+    def clear(self) -> None:
+        self._data.clear()
+        self.total_weight = 0
+
+    def __getitem__(self, key: Hashable) -> Any:
+        return self._data[key][0]
+
+    def __iter__(self) -> Iterator:
+        return iter(self._data)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class ARCPolicy(CachePolicy):
+    """
+    Adaptive Replacement Cache.
+
+    Keys seen once live in `T1`, keys seen at least twice in `T2`. The ghost
+    lists `B1` and `B2` remember the keys recently evicted from them, and a
+    hit in a ghost list shifts the target size `p` of `T1`, so the cache
+    adapts between recency and frequency. All operations are O(1).
+    """
+
+    def __init__(self, max_size: int = 0):
+        super().__init__(max_size)
+        self._t1: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._t2: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._b1: "OrderedDict[Hashable, None]" = OrderedDict()
+        self._b2: "OrderedDict[Hashable, None]" = OrderedDict()
+        self._p: int = 0
+
+    def lookup(self, key: Hashable, default: Any = None) -> Any:
+        if key in self._t1:
+            value = self._t1.pop(key)
+            self._t2[key] = value
+            self.hits += 1
+            return value
+        if key in self._t2:
+            self._t2.move_to_end(key)
+            self.hits += 1
+            return self._t2[key]
+        self.misses += 1
+        return default
+
+    def _replace(self, hit_in_b2: bool) -> None:
+        """
+        Evicts one resident entry into the matching ghost list.
+        """
+        if len(self._t1) + len(self._t2) < self.max_size:
+            return
+        if self._t1 and (
+            len(self._t1) > self._p or (hit_in_b2 and len(self._t1) == self._p)
+        ):
+            key, _ = self._t1.popitem(last=False)
+            self._b1[key] = None
+            self.evictions += 1
+        elif self._t2:
+            key, _ = self._t2.popitem(last=False)
+            self._b2[key] = None
+            self.evictions += 1
+
+    def store(self, key: Hashable, value: Any) -> None:
+        capacity = self.max_size
+        if key in self._t1:
+            self._t1[key] = value
+            return
+        if key in self._t2:
+            self._t2[key] = value
+            return
+        if capacity <= 0:
+            self._t1[key] = value
+            return
+
+        if key in self._b1:
+            self._p = min(capacity, self._p + max(len(self._b2) // len(self._b1), 1))
+            self._replace(hit_in_b2=False)
+            del self._b1[key]
+            self._t2[key] = value
+            return
+        if key in self._b2:
+            self._p = max(0, self._p - max(len(self._b1) // len(self._b2), 1))
+            self._replace(hit_in_b2=True)
+            del self._b2[key]
+            self._t2[key] = value
+            return
+
+        if len(self._t1) + len(self._b1) >= capacity:
+            if len(self._t1) < capacity:
+                self._b1.popitem(last=False)
+                self._replace(hit_in_b2=False)
+            else:
+                self._t1.popitem(last=False)
+                self.evictions += 1
+        else:
+            total = len(self._t1) + len(self._t2) + len(self._b1) + len(self._b2)
+            if total >= capacity:
+                if total >= 2 * capacity:
+                    self._b2.popitem(last=False)
+                self._replace(hit_in_b2=False)
+        self._t1[key] = value
+
+    def clear(self) -> None:
+        for part in (self._t1, self._t2, self._b1, self._b2):
+            part.clear()
+        self._p = 0
+
+    def __getitem__(self, key: Hashable) -> Any:
+        if key in self._t1:
+            return self._t1[key]
+        return self._t2[key]
+
+    def __iter__(self) -> Iterator:
+        yield from self._t1
+        yield from self._t2
+
+    def __len__(self) -> int:
+        return len(self._t1) + len(self._t2)
+
+
+class TieredCache(CachePolicy):
+    """
+    An in-memory policy in front of a slower shared backend, such as a
+    `DiskCache` or a `SharedCache`.
+
+    Lookups check memory first and then the backend; a backend hit is promoted
+    into memory. Stores write through to both tiers. Entries are kept in the
+    backend under `(namespace, key)`, so several functions can share it.
+
+    The Mapping methods, `len` and `clear` refer to the memory tier; the
+    backend is cleared with `backend.clear()`.
+
+    Attributes:
+        memory (CachePolicy): The first tier.
+        backend (CachePolicy): The second tier.
+        namespace (str): Separates the entries of this cache in the backend.
+        backend_hits (int): The number of hits answered by the backend.
+    """
+
+    def __init__(self, memory: CachePolicy, backend: CachePolicy, namespace: str = ""):
+        super().__init__(memory.max_size)
+        self.memory: CachePolicy = memory
+        self.backend: CachePolicy = backend
+        self.namespace: str = namespace
+        self.backend_hits: int = 0
+
+    def stats(self) -> Tuple[int, int, int]:
+        return self.hits, self.misses, self.memory.evictions
+
+    def lookup(self, key: Hashable, default: Any = None) -> Any:
+        value = self.memory.lookup(key, _MISSING)
+        if value is not _MISSING:
+            self.hits += 1
+            return value
+        value = self.backend.lookup((self.namespace, key), _MISSING)
+        if value is _MISSING:
+            self.misses += 1
+            return default
+        self.hits += 1
+        self.backend_hits += 1
+        self.memory.store(key, value)
+        return value
+
+    def store(self, key: Hashable, value: Any) -> None:
+        self.memory.store(key, value)
+        self.backend.store((self.namespace, key), value)
+
+    def clear(self) -> None:
+        self.memory.clear()
+
+    def __getitem__(self, key: Hashable) -> Any:
+        return self.memory[key]
+
+    def __iter__(self) -> Iterator:
+        return iter(self.memory)
+
+    def __len__(self) -> int:
+        return len(self.memory)
+
+
+POLICIES: Dict[str, Callable[..., CachePolicy]] = {
+    "fifo": FIFOPolicy,
+    "lru": LRUPolicy,
+    "lfu": LFUPolicy,
+    "ttl": TTLPolicy,
+    "weight": WeightPolicy,
+    "arc": ARCPolicy,
+}
+
+
+def make_policy(
+    policy: Any,
+    max_size: int = 0,
+    ttl: Optional[float] = None,
+    weigher: Optional[Callable[[Any], float]] = None,
+) -> CachePolicy:
+    """
+    Creates a cache policy from its name or from a factory.
+
+    Args:
+        policy: One of the names in `POLICIES`, or a callable that takes
+                `max_size` and returns a `CachePolicy`.
+        max_size: The capacity (the total weight for "weight"); 0 means unbounded.
+        ttl: The lifetime of an entry in seconds, required by "ttl".
+        weigher: The function that weighs values for "weight".
+
+    Returns:
+        A new, empty policy.
+
+    Raises:
+        ValueError: If the policy is unknown or "ttl" has no lifetime.
+    """
+    if callable(policy):
+        return policy(max_size)
+    if policy not in POLICIES:
+        raise ValueError(f"Unknown cache policy: {policy!r}")
+    if policy == "ttl":
+        if ttl is None:
+            raise ValueError("The 'ttl' policy requires a ttl")
+        return TTLPolicy(max_size, ttl)
+    if policy == "weight" and weigher is not None:
+        return WeightPolicy(max_size, weigher)
+    return POLICIES[policy](max_size)
@@ -0,0 +1,169 @@
+import math
+import threading
+import time
+from typing import Callable, Dict, Hashable, Iterator, List, NamedTuple, Optional
+
+from project.decorators.cache_policies import CachePolicy
+
+
+class CacheInfo(NamedTuple):
+    """
+    A snapshot of the statistics of a cached function.
+
+    Attributes:
+        hits (int): The number of calls answered from the cache.
+        misses (int): The number of calls that did not find their result.
+        evictions (int): The number of results evicted or expired.
+        size (int): The number of results cached now.
+        hit_ratio (float): hits / (hits + misses), 0.0 before the first call.
+        time_saved (float): The estimated seconds saved by the hits: the hit
+                            count times the mean measured latency of a miss.
+    """
+
+    hits: int
+    misses: int
+    evictions: int
+    size: int
+    hit_ratio: float
+    time_saved: float
+
+
+class LatencyHistogram:
+    """
+    Per-key histograms of the latencies of cache misses.
+
+    Latencies are counted in power-of-two buckets starting at one microsecond,
+    so a bucket with the upper bound `b` counts the latencies in (b / 2, b].
+    """
+
+    def __init__(self) -> None:
+        self._counts: Dict[Hashable, List[int]] = {}
+
+    def record(self, key: Hashable, seconds: float) -> None:
+        """
+        Counts one miss of `key` that took `seconds`.
+        """
+        micros = seconds * 1e6
+        bucket = max(0, math.ceil(math.log2(micros))) if micros > 1 else 0
+        counts = self._counts.setdefault(key, [])
+        if len(counts) <= bucket:
+            counts.extend([0] * (bucket + 1 - len(counts)))
+        counts[bucket] += 1
+
+    def __getitem__(self, key: Hashable) -> Dict[float, int]:
+        """
+        Returns the non-empty buckets of `key` as {upper bound in seconds: count}.
+        """
+        return {
+            2**bucket / 1e6: count
+            for bucket, count in enumerate(self._counts[key])
+            if count
+        }
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._counts
+
+    def __iter__(self) -> Iterator[Hashable]:
+        return iter(self._counts)
+
+    def __len__(self) -> int:
+        return len(self._counts)
+
+    def clear(self) -> None:
+        self._counts.clear()
+
+
+class CacheStats:
+    """
+    The miss latencies of a cached function.
+
+    The hit, miss and eviction counters live in the cache policy; this object
+    adds the measured time of the misses, which the policies cannot see.
+
+    Attributes:
+        lock (threading.Lock): Guards the fields when misses run in several threads.
+        miss_time (float): The total seconds spent computing missed results.
+        timed_misses (int): The number of misses included in `miss_time`.
+        latencies (Optional[LatencyHistogram]): The per-key histograms, if enabled.
+    """
+
+    def __init__(self, histogram: bool = False) -> None:
+        self.lock: threading.Lock = threading.Lock()
+        self.miss_time: float = 0.0
+        self.timed_misses: int = 0
+        self.latencies: Optional[LatencyHistogram] = (
+            LatencyHistogram() if histogram else None
+        )
+
+    def record_miss(self, key: Hashable, seconds: float) -> None:
+        """
+        Records the latency of a computed result.
+        """
+        with self.lock:
+            self.miss_time += seconds
+            self.timed_misses += 1
+            if self.latencies is not None:
+                self.latencies.record(key, seconds)
+
+    def info(self, cache: CachePolicy) -> CacheInfo:
+        """
+        Combines the counters of `cache` with the measured latencies.
+        """
+        hits, misses, evictions = cache.stats()
+        lookups = hits + misses
+        mean_latency = self.miss_time / self.timed_misses if self.timed_misses else 0.0
+        return CacheInfo(
+            hits,
+            misses,
+            evictions,
+            len(cache),
+            hits / lookups if lookups else 0.0,
+            hits * mean_latency,
+        )
+
+    def clear(self) -> None:
+        with self.lock:
+            self.miss_time = 0.0
+            self.timed_misses = 0
+            if self.latencies is not None:
+                self.latencies.clear()
+
+
+class MetricsReporter:
+    """
+    Sends the `CacheInfo` of a cached function to a callback at most once
+    per `interval` seconds.
+
+    The check runs on every call of the cached function; when several threads
+    find the interval over at once, only one of them reports.
+
+    Attributes:
+        callback (Callable[[CacheInfo], None]): Receives the statistics.
+        interval (float): The minimal number of seconds between two reports.
+        timer (Callable[[], float]): The clock used to measure the interval.
+    """
+
+    def __init__(
+        self,
+        callback: Callable[[CacheInfo], None],
+        interval: float = 1.0,
+        timer: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.callback: Callable[[CacheInfo], None] = callback
+        self.interval: float = interval
+        self.timer: Callable[[], float] = timer
+        self._next_report: float = float("-inf")
+        self._lock: threading.Lock = threading.Lock()
+
+    def maybe_report(self, info: Callable[[], CacheInfo]) -> None:
+        """
+        Calls the callback with `info()` if the interval is over.
+        """
+        now = self.timer()
+        if now < self._next_report or not self._lock.acquire(blocking=False):
+            return
+        try:
+            self._next_report = now + self.interval
+            self.callback(info())
+        finally:
+            self._lock.release()
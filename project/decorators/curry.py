@@ -1,7 +1,68 @@
+import inspect
+from functools import lru_cache
+
+
+class Curried:
+    """
+    A curried function: the target function and the arguments collected so far.
+
+    Calling it with one or more arguments returns a new `Curried` with the
+    arguments appended, or calls the target once all `arity` arguments are
+    collected. Instances are immutable, so a partial application can be
+    reused. No closures are created on the way; `uncurry` reads `function`
+    and `args` to call the target directly.
+
+    Attributes:
+        function (callable): The original function.
+        args (tuple): The arguments collected so far.
+        arity (int): The number of arguments the function takes; it is a
+                     class attribute of the specialization for that arity.
+    """
+
+    __slots__ = ("function", "args")
+
+    arity = 0
+
+    def __init__(self, function, args=()):
+        self.function = function
+        self.args = args
+
+    def __call__(self, *args):
+        collected = self.args + args
+        remaining = self.arity - len(collected)
+        if remaining == 0:
+            return self.function(*collected)
+        if remaining < 0:
+            raise TypeError(
+                f"Curried function takes {self.arity} arguments, "
+                f"but got {len(collected)}"
+            )
+        if not args:
+            raise TypeError("Curried function expects at least one argument")
+        return type(self)(self.function, collected)
+
+    def __repr__(self):
+        return (
+            f"<curried {getattr(self.function, '__name__', self.function)!s} "
+            f"{len(self.args)}/{self.arity}>"
+        )
+
+
+@lru_cache(maxsize=None)
+def curried_type(arity):
+    """
+    Returns the specialization of `Curried` for `arity`, creating it once.
+    """
+    return type(f"Curried{arity}", (Curried,), {"__slots__": (), "arity": arity})
+
+
 def curry_explicit(function, arity):
     """
     Curries the given function to the specified arity.
 
+    Every step takes one or more arguments, so `f(1)(2)(3)` and `f(1)(2, 3)`
+    are the same call; the function is called once all arguments are collected.
+
     Arguments:
     function -- The original function to be curried.
     arity -- The number of arguments the function takes.
@@ -14,15 +75,136 @@ def curry_explicit(function, arity):
     """
     if arity < 0:
         raise ValueError("Arity cannot be negative")
-    if arity == 0:
-        return lambda: function()
-
-    def curried(arg):
-        if curried.remaining_arity == 1:
-            return function(arg)
-        return curry_explicit(
-            lambda *args: function(arg, *args), curried.remaining_arity - 1
+    return curried_type(arity)(function)
+
+
+class ArityPlan:
+    """
+    What a function needs before it can be called, read once from its signature.
+
+    Attributes:
+        required (tuple): The (position, name) pairs of the parameters without
+                          defaults; position is None for keyword-only ones.
+        max_positional (int or None): The number of positional parameters, or
+                          None if the function takes *args.
+    """
+
+    __slots__ = ("required", "max_positional")
+
+    def __init__(self, required, max_positional):
+        self.required = required
+        self.max_positional = max_positional
+
+    def missing(self, positional, kwargs):
+        """
+        Returns how many required parameters are still unbound.
+
+        Raises:
+        TypeError -- If there are more positional arguments than parameters.
+        """
+        if self.max_positional is not None and positional > self.max_positional:
+            raise TypeError(
+                f"Curried function takes at most {self.max_positional} positional "
+                f"arguments, but got {positional}"
+            )
+        return sum(
+            1
+            for position, name in self.required
+            if name not in kwargs and (position is None or position >= positional)
         )
 
-    curried.remaining_arity = arity
-    return curried
+
+@lru_cache(maxsize=1024)
+def arity_plan(function):
+    """
+    Returns the `ArityPlan` of a function, inspecting its signature only once.
+
+    Raises:
+    ValueError -- If the signature of the function cannot be inspected.
+    """
+    try:
+        parameters = inspect.signature(function).parameters.values()
+    except (TypeError, ValueError):
+        raise ValueError(
+            f"Cannot infer the arity of {function!r}; use curry_explicit"
+        ) from None
+    required = []
+    positional = 0
+    var_positional = False
+    for parameter in parameters:
+        if parameter.kind in (
+            parameter.POSITIONAL_ONLY,
+            parameter.POSITIONAL_OR_KEYWORD,
+        ):
+            if parameter.default is parameter.empty:
+                required.append((positional, parameter.name))
+            positional += 1
+        elif parameter.kind is parameter.VAR_POSITIONAL:
+            var_positional = True
+        elif parameter.kind is parameter.KEYWORD_ONLY:
+            if parameter.default is parameter.empty:
+                required.append((None, parameter.name))
+    return ArityPlan(tuple(required), None if var_positional else positional)
+
+
+class KeywordCurried(Curried):
+    """
+    A curried function whose arity comes from its signature.
+
+    Steps take positional and keyword arguments; the function is called as
+    soon as every parameter without a default is bound, and parameters with
+    defaults keep them unless a step passed a value.
+
+    Attributes:
+        kwargs (dict): The keyword arguments collected so far.
+        plan (ArityPlan): The required parameters of the function.
+    """
+
+    __slots__ = ("kwargs", "plan")
+
+    def __init__(self, function, args=(), kwargs=None, plan=None):
+        super().__init__(function, args)
+        self.kwargs = kwargs or {}
+        self.plan = plan if plan is not None else arity_plan(function)
+
+    @property
+    def arity(self):
+        return len(self.plan.required)
+
+    def __call__(self, *args, **kwargs):
+        collected = self.args + args
+        if kwargs:
+            repeated = self.kwargs.keys() & kwargs.keys()
+            if repeated:
+                raise TypeError(f"Curried function got multiple values for {repeated}")
+            merged = {**self.kwargs, **kwargs}
+        else:
+            merged = self.kwargs
+        if self.plan.missing(len(collected), merged) == 0:
+            return self.function(*collected, **merged)
+        if not args and not kwargs:
+            raise TypeError("Curried function expects at least one argument")
+        return KeywordCurried(self.function, collected, merged, self.plan)
+
+
+def curry(function, arity=None):
+    """
+    Curries a function, inferring its arity from its signature.
+
+    The arity is the number of parameters without defaults, so defaults are
+    used unless a step passes a value for them, and keyword arguments may be
+    passed in any step: `curry(f)(1, c=3)(2)` calls `f(1, 2, c=3)`.
+
+    Arguments:
+    function -- The original function to be curried.
+    arity -- An explicit arity; if given, this is `curry_explicit`.
+
+    Returns:
+    A curried version of the function.
+
+    Raises:
+    ValueError -- If arity is negative or cannot be inferred.
+    """
+    if arity is not None:
+        return curry_explicit(function, arity)
+    return KeywordCurried(function, (), {}, arity_plan(function))
@@ -0,0 +1,222 @@
+import hashlib
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from typing import Any, Hashable, Iterator, Optional, Tuple, Union
+
+from project.decorators.cache_policies import CachePolicy
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    digest BLOB PRIMARY KEY,
+    key BLOB NOT NULL,
+    value BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    accessed REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed);
+CREATE TABLE IF NOT EXISTS totals (
+    id INTEGER PRIMARY KEY CHECK (id = 0),
+    count INTEGER NOT NULL,
+    bytes INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO totals VALUES (0, 0, 0);
+CREATE TRIGGER IF NOT EXISTS entries_insert AFTER INSERT ON entries BEGIN
+    UPDATE totals SET count = count + 1, bytes = bytes + NEW.size;
+END;
+CREATE TRIGGER IF NOT EXISTS entries_delete AFTER DELETE ON entries BEGIN
+    UPDATE totals SET count = count - 1, bytes = bytes - OLD.size;
+END;
+CREATE TRIGGER IF NOT EXISTS entries_update AFTER UPDATE OF size ON entries BEGIN
+    UPDATE totals SET bytes = bytes - OLD.size + NEW.size;
+END;
+"""
+
+# What pickling raises for an object that cannot be serialized
+_PICKLE_ERRORS = (pickle.PicklingError, TypeError, AttributeError)
+
+
+class DiskCache(CachePolicy):
+    """
+    A cache stored in a SQLite file that survives restarts and can be shared
+    by several processes.
+
+    Entries are found by a BLAKE2 digest of the pickled key and evicted in
+    least recently used order when the number of entries or their total
+    serialized size exceeds its limit. The totals are kept up to date by
+    triggers, so checking the limits is O(1). Every thread and every process
+    opens its own connection; the database runs in WAL mode so that readers
+    do not block the writer.
+
+    Attributes:
+        path (str): The path of the database file.
+        max_size (int): The maximum number of entries; 0 means unbounded.
+        max_bytes (int): The maximum total size of the serialized values; 0 means unbounded.
+        serializer (Any): An object with `dumps` and `loads`, such as `pickle`.
+        timeout (float): The seconds to wait for a lock held by another process.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, "os.PathLike[str]"],
+        max_size: int = 0,
+        max_bytes: int = 0,
+        serializer: Any = pickle,
+        timeout: float = 30.0,
+    ):
+        super().__init__(max_size)
+        self.path: str = os.fspath(path)
+        self.max_bytes: int = max_bytes
+        self.serializer: Any = serializer
+        self.timeout: float = timeout
+        self._local = threading.local()
+        self._connection().executescript(_SCHEMA)
+
+    def _connection(self) -> sqlite3.Connection:
+        """
+        Returns the connection of the current thread, reopening it after a fork.
+        """
+        local = self._local
+        connection = getattr(local, "connection", None)
+        if connection is None or local.pid != os.getpid():
+            connection = sqlite3.connect(
+                self.path, timeout=self.timeout, isolation_level=None
+            )
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            local.connection, local.pid = connection, os.getpid()
+        return connection
+
+    @staticmethod
+    def _digest(key: Hashable) -> Optional[Tuple[bytes, bytes]]:
+        """
+        Returns the pickled key and its digest, or None if the key cannot be
+        pickled; such keys are never stored, so they always miss.
+        """
+        try:
+            data = pickle.dumps(key, protocol=4)
+        except _PICKLE_ERRORS:
+            return None
+        return data, hashlib.blake2b(data, digest_size=16).digest()
+
+    def lookup(self, key: Hashable, default: Any = None) -> Any:
+        pickled = self._digest(key)
+        if pickled is None:
+            self.misses += 1
+            return default
+        _, digest = pickled
+        connection = self._connection()
+        row = connection.execute(
+            "SELECT value FROM entries WHERE digest = ?", (digest,)
+        ).fetchone()
+        if row is None:
+            self.misses += 1
+            return default
+        connection.execute(
+            "UPDATE entries SET accessed = ? WHERE digest = ?", (time.time(), digest)
+        )
+        self.hits += 1
+        return self.serializer.loads(row[0])
+
+    def store(self, key: Hashable, value: Any) -> None:
+        """
+        Stores an entry; keys that cannot be pickled, values that cannot be
+        serialized and values that exceed `max_bytes` on their own are skipped.
+        """
+        pickled = self._digest(key)
+        if pickled is None:
+            return
+        try:
+            data = self.serializer.dumps(value)
+        except _PICKLE_ERRORS:
+            return
+        if self.max_bytes > 0 and len(data) > self.max_bytes:
+            return
+        key_data, digest = pickled
+        connection = self._connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            connection.execute(
+                "INSERT INTO entries VALUES (?, ?, ?, ?, ?) ON CONFLICT (digest) DO "
+                "UPDATE SET value = excluded.value, size = excluded.size, "
+                "accessed = excluded.accessed",
+                (digest, key_data, data, len(data), time.time()),
+            )
+            self._evict(connection)
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        connection.execute("COMMIT")
+
+    def _evict(self, connection: sqlite3.Connection) -> None:
+        """
+        Deletes the least recently used entries until both limits hold.
+        """
+        while True:
+            count, size = connection.execute(
+                "SELECT count, bytes FROM totals"
+            ).fetchone()
+            excess = count - self.max_size if self.max_size > 0 else 0
+            if self.max_bytes > 0 and size > self.max_bytes:
+                excess = max(excess, 1)
+            if excess <= 0:
+                return
+            connection.execute(
+                "DELETE FROM entries WHERE digest IN "
+                "(SELECT digest FROM entries ORDER BY accessed LIMIT ?)",
+                (excess,),
+            )
+            self.evictions += excess
+
+    def total_bytes(self) -> int:
+        """
+        Returns the total size of the serialized values.
+        """
+        return self._connection().execute("SELECT bytes FROM totals").fetchone()[0]
+
+    def clear(self) -> None:
+        self._connection().execute("DELETE FROM entries")
+
+    def close(self) -> None:
+        """
+        Closes the connection of the current thread.
+        """
+        connection = getattr(self._local, "connection", None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+
+    def __getitem__(self, key: Hashable) -> Any:
+        pickled = self._digest(key)
+        if pickled is None:
+            raise KeyError(key)
+        _, digest = pickled
+        row = (
+            self._connection()
+            .execute("SELECT value FROM entries WHERE digest = ?", (digest,))
+            .fetchone()
+        )
+        if row is None:
+            raise KeyError(key)
+        return self.serializer.loads(row[0])
+
+    def __contains__(self, key: object) -> bool:
+        pickled = self._digest(key)
+        if pickled is None:
+            return False
+        _, digest = pickled
+        return (
+            self._connection()
+            .execute("SELECT 1 FROM entries WHERE digest = ?", (digest,))
+            .fetchone()
+            is not None
+        )
+
+    def __iter__(self) -> Iterator:
+        rows = self._connection().execute("SELECT key FROM entries").fetchall()
+        return (pickle.loads(row[0]) for row in rows)
+
+    def __len__(self) -> int:
+        return self._connection().execute("SELECT count FROM totals").fetchone()[0]
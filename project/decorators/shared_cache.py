@@ -0,0 +1,348 @@
+import fcntl
+import hashlib
+import mmap
+import os
+import pickle
+import struct
+import tempfile
+import threading
+import time
+import uuid
+import weakref
+from typing import Any, Hashable, Iterator, List, Optional, Tuple, Union
+
+from project.decorators.cache_policies import CachePolicy
+
+_MAGIC = b"SHMCACHE"
+_VERSION = 1
+# magic, version, buckets, ways, slot size; padded to 64 bytes
+_HEADER = struct.Struct("=8sIIII")
+_HEADER_SIZE = 64
+# key digest, write stamp (0 for an empty slot), key length, value length
+_SLOT = struct.Struct("=QQII")
+# The number of in-process locks that guard the buckets against other threads
+_THREAD_LOCKS = 16
+# What pickling raises for an object that cannot be serialized
+_PICKLE_ERRORS = (pickle.PicklingError, TypeError, AttributeError)
+
+
+def _default_directory() -> str:
+    """
+    Returns /dev/shm where it exists, so that the table lives in memory.
+    """
+    return "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+
+
+def _detach(mapped: mmap.mmap, fd: int, path: Optional[str]) -> None:
+    """
+    Unmaps a table and closes its file, removing the file if `path` is given.
+    """
+    mapped.close()
+    os.close(fd)
+    if path is not None:
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+
+
+class SharedCache(CachePolicy):
+    """
+    A fixed-size hash table in a memory-mapped file that several processes
+    read and write at the same time, without a manager process.
+
+    The table is set-associative: a key hashes to a bucket of `ways` slots of
+    `slot_size` bytes each, and a full bucket overwrites its oldest entry, so
+    the memory is bounded by the size given at creation. Entries that do not
+    fit into a slot are not stored. Keys are found by a BLAKE2 digest of their
+    pickle, which is the same in every process.
+
+    Each bucket is guarded by a POSIX record lock on its own byte of the file:
+    lookups take it shared and stores exclusive, so readers in different
+    processes do not block each other. Record locks belong to a process, so
+    the threads of one process are serialized by an extra striped lock.
+
+    Opening an existing file attaches to it with the geometry stored in its
+    header, and a `SharedCache` pickles as its path, so it can be passed to
+    `ProcessPoolExecutor` workers under any start method. Every instance
+    unmaps and closes the file when it is garbage collected. A table created
+    without a path is also removed then, so the instance that created it must
+    outlive the processes that attach to it; a table at a given path stays
+    until `unlink()` is called.
+
+    Attributes:
+        path (str): The path of the mapped file.
+        max_size (int): The number of slots.
+        buckets (int): The number of buckets.
+        ways (int): The number of slots per bucket.
+        slot_size (int): The bytes available for the pickled key and value of an entry.
+    """
+
+    def __init__(
+        self,
+        path: Union[None, str, "os.PathLike[str]"] = None,
+        slots: int = 4096,
+        slot_size: int = 512,
+        ways: int = 8,
+    ):
+        """
+        Args:
+            path: The file to create or attach to. Default is a new file in
+                  /dev/shm (or the temporary directory), removed together
+                  with this instance.
+            slots: The total number of slots of a new table.
+            slot_size: The payload size of a slot of a new table.
+            ways: The number of slots per bucket of a new table.
+
+        Raises:
+            ValueError: If the geometry is invalid or the file is not a cache table.
+        """
+        if slots < 1 or ways < 1 or slot_size < 1:
+            raise ValueError("slots, slot_size and ways must be positive")
+        owned = path is None
+        if path is None:
+            path = os.path.join(_default_directory(), f"cache-{uuid.uuid4().hex}")
+        self.path: str = os.fspath(path)
+        self._fd: int = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.lockf(self._fd, fcntl.LOCK_EX)
+            try:
+                if os.fstat(self._fd).st_size == 0:
+                    buckets = max(1, slots // ways)
+                    header = _HEADER.pack(_MAGIC, _VERSION, buckets, ways, slot_size)
+                    os.ftruncate(self._fd, self._file_size(buckets, ways, slot_size))
+                    os.pwrite(self._fd, header, 0)
+                magic, version, buckets, ways, slot_size = _HEADER.unpack(
+                    os.pread(self._fd, _HEADER.size, 0)
+                )
+            finally:
+                fcntl.lockf(self._fd, fcntl.LOCK_UN)
+            if magic != _MAGIC or version != _VERSION:
+                raise ValueError(f"{self.path} is not a shared cache table")
+            mapped = mmap.mmap(self._fd, self._file_size(buckets, ways, slot_size))
+        except BaseException:
+            os.close(self._fd)
+            raise
+
+        super().__init__(buckets * ways)
+        self.buckets: int = buckets
+        self.ways: int = ways
+        self.slot_size: int = slot_size
+        self._slot_bytes: int = _SLOT.size + slot_size
+        self._map: mmap.mmap = mapped
+        self._finalizer = weakref.finalize(
+            self, _detach, mapped, self._fd, self.path if owned else None
+        )
+        self._pid: int = os.getpid()
+        self._thread_locks: List[threading.Lock] = [
+            threading.Lock() for _ in range(_THREAD_LOCKS)
+        ]
+
+    @staticmethod
+    def _file_size(buckets: int, ways: int, slot_size: int) -> int:
+        return _HEADER_SIZE + buckets * ways * (_SLOT.size + slot_size)
+
+    def __reduce__(self) -> Tuple[type, Tuple[str]]:
+        return type(self), (self.path,)
+
+    def _acquire(self, bucket: int, exclusive: bool) -> None:
+        """
+        Locks a bucket against the other threads and the other processes.
+        """
+        if self._pid != os.getpid():
+            # A lock held by another thread at fork time would never be released
+            self._pid = os.getpid()
+            self._thread_locks = [threading.Lock() for _ in range(_THREAD_LOCKS)]
+        self._thread_locks[bucket % _THREAD_LOCKS].acquire()
+        try:
+            command = fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH
+            fcntl.lockf(self._fd, command, 1, bucket)
+        except BaseException:
+            self._thread_locks[bucket % _THREAD_LOCKS].release()
+            raise
+
+    def _release(self, bucket: int) -> None:
+        fcntl.lockf(self._fd, fcntl.LOCK_UN, 1, bucket)
+        self._thread_locks[bucket % _THREAD_LOCKS].release()
+
+    def _locate(self, key: Hashable) -> Optional[Tuple[bytes, int, int]]:
+        """
+        Returns the pickled key, its digest and its bucket, or None if the key
+        cannot be pickled; such keys are never stored, so they always miss.
+        """
+        try:
+            key_data = pickle.dumps(key, protocol=4)
+        except _PICKLE_ERRORS:
+            return None
+        digest = int.from_bytes(
+            hashlib.blake2b(key_data, digest_size=8).digest(), "little"
+        )
+        return key_data, digest, digest % self.buckets
+
+    def _find(self, bucket: int, digest: int, key_data: bytes) -> Optional[int]:
+        """
+        Returns the offset of the slot holding the key, or None; the bucket must be locked.
+        """
+        mapped = self._map
+        offset = _HEADER_SIZE + bucket * self.ways * self._slot_bytes
+        for slot in range(
+            offset, offset + self.ways * self._slot_bytes, self._slot_bytes
+        ):
+            slot_digest, stamp, key_length, _ = _SLOT.unpack_from(mapped, slot)
+            if stamp and slot_digest == digest:
+                start = slot + _SLOT.size
+                if mapped[start : start + key_length] == key_data:
+                    return slot
+        return None
+
+    def _read(self, key: Hashable) -> Optional[bytes]:
+        """
+        Returns the pickled value of a key, or None if it is absent.
+        """
+        located = self._locate(key)
+        if located is None:
+            return None
+        key_data, digest, bucket = located
+        self._acquire(bucket, exclusive=False)
+        try:
+            slot = self._find(bucket, digest, key_data)
+            if slot is None:
+                return None
+            _, _, key_length, value_length = _SLOT.unpack_from(self._map, slot)
+            start = slot + _SLOT.size + key_length
+            return self._map[start : start + value_length]
+        finally:
+            self._release(bucket)
+
+    def lookup(self, key: Hashable, default: Any = None) -> Any:
+        data = self._read(key)
+        if data is None:
+            self.misses += 1
+            return default
+        self.hits += 1
+        return pickle.loads(data)
+
+    def store(self, key: Hashable, value: Any) -> None:
+        """
+        Stores an entry; keys or values that cannot be pickled and entries
+        that do not fit into a slot are skipped.
+        """
+        located = self._locate(key)
+        if located is None:
+            return
+        try:
+            value_data = pickle.dumps(value, protocol=4)
+        except _PICKLE_ERRORS:
+            return
+        key_data, digest, bucket = located
+        if len(key_data) + len(value_data) > self.slot_size:
+            return
+
+        mapped = self._map
+        self._acquire(bucket, exclusive=True)
+        try:
+            target = self._find(bucket, digest, key_data)
+            if target is None:
+                offset = _HEADER_SIZE + bucket * self.ways * self._slot_bytes
+                oldest = None
+                for slot in range(
+                    offset, offset + self.ways * self._slot_bytes, self._slot_bytes
+                ):
+                    stamp = _SLOT.unpack_from(mapped, slot)[1]
+                    if stamp == 0:
+                        target = slot
+                        break
+                    if oldest is None or stamp < oldest:
+                        oldest, target = stamp, slot
+                else:
+                    self.evictions += 1
+            assert target is not None
+            start = target + _SLOT.size
+            mapped[start : start + len(key_data) + len(value_data)] = (
+                key_data + value_data
+            )
+            _SLOT.pack_into(
+                mapped,
+                target,
+                digest,
+                time.monotonic_ns(),
+                len(key_data),
+                len(value_data),
+            )
+        finally:
+            self._release(bucket)
+
+    def _entries(self) -> Iterator[Tuple[bytes, bytes]]:
+        """
+        Yields the pickled keys and values of all entries, one bucket at a time.
+        """
+        for bucket in range(self.buckets):
+            self._acquire(bucket, exclusive=False)
+            try:
+                offset = _HEADER_SIZE + bucket * self.ways * self._slot_bytes
+                entries = []
+                for slot in range(
+                    offset, offset + self.ways * self._slot_bytes, self._slot_bytes
+                ):
+                    _, stamp, key_length, value_length = _SLOT.unpack_from(
+                        self._map, slot
+                    )
+                    if stamp:
+                        start = slot + _SLOT.size
+                        entries.append(
+                            (
+                                self._map[start : start + key_length],
+                                self._map[
+                                    start
+                                    + key_length : start
+                                    + key_length
+                                    + value_length
+                                ],
+                            )
+                        )
+            finally:
+                self._release(bucket)
+            yield from entries
+
+    def clear(self) -> None:
+        """
+        Empties the table for all processes.
+        """
+        for bucket in range(self.buckets):
+            self._acquire(bucket, exclusive=True)
+            try:
+                offset = _HEADER_SIZE + bucket * self.ways * self._slot_bytes
+                for slot in range(
+                    offset, offset + self.ways * self._slot_bytes, self._slot_bytes
+                ):
+                    _SLOT.pack_into(self._map, slot, 0, 0, 0, 0)
+            finally:
+                self._release(bucket)
+
+    def close(self) -> None:
+        """
+        Unmaps the table in this process. A table created without a path is
+        removed as well; otherwise the file stays for the other processes.
+        """
+        self._finalizer()
+
+    def unlink(self) -> None:
+        """
+        Removes the file; processes that still have it mapped keep working.
+        """
+        os.unlink(self.path)
+
+    def __getitem__(self, key: Hashable) -> Any:
+        data = self._read(key)
+        if data is None:
+            raise KeyError(key)
+        return pickle.loads(data)
+
+    def __contains__(self, key: object) -> bool:
+        return self._read(key) is not None
+
+    def __iter__(self) -> Iterator:
+        return (pickle.loads(key_data) for key_data, _ in self._entries())
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self._entries())
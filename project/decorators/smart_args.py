@@ -1,5 +1,6 @@
 import copy
 import inspect
+from functools import wraps
 
 
 class Evaluated:
@@ -33,21 +34,59 @@ def smart_args(allow_positional=False):
         Decorator function that wraps the original function to handle
         'Evaluated' and 'Isolated' argument defaults.
 
+        The signature is inspected once: the wrapper only knows the names of
+        the positional parameters and the parameters whose default is
+        `Evaluated` or `Isolated`. Plain defaults are left to `func` itself,
+        and a function without special defaults gets a wrapper that only
+        checks the positional arguments.
+
         Args:
             func (callable): The function to be wrapped.
 
         Returns:
             callable: A wrapper function that processes the arguments before
                     calling the original function.
+
+        Raises:
+            ValueError: If a default is both Evaluated and Isolated.
         """
 
         # Fetch full argument specification
         full_argspec = inspect.getfullargspec(func)
-        defaults = full_argspec.defaults or []
+        defaults = full_argspec.defaults or ()
         kwonly_defaults = full_argspec.kwonlydefaults or {}
-        positional_args = full_argspec.args or []
+        positional_args = tuple(full_argspec.args or ())
         pos_defaults_offset = len(positional_args) - len(defaults)
 
+        # Build the binding plan: which parameters are evaluated or isolated
+        all_defaults = dict(zip(positional_args[pos_defaults_offset:], defaults))
+        all_defaults.update(kwonly_defaults)
+        evaluated = []
+        isolated = []
+        for name, default in all_defaults.items():
+            if isinstance(default, Evaluated) and isinstance(default, Isolated):
+                raise ValueError(
+                    f"Cannot combine Evaluated and Isolated for argument '{name}'"
+                )
+            if isinstance(default, Evaluated):
+                evaluated.append((name, default.func))
+            elif isinstance(default, Isolated):
+                isolated.append(name)
+        evaluated = tuple(evaluated)
+        isolated = tuple(isolated)
+
+        if not evaluated and not isolated:
+
+            @wraps(func)
+            def plain_wrapper(*args, **kwargs):
+                """Calls the function directly: it has no special defaults."""
+                if not allow_positional:
+                    assert len(args) == 0, "Only keyword arguments are allowed"
+                return func(*args, **kwargs)
+
+            return plain_wrapper
+
+        @wraps(func)
         def wrapper(*args, **kwargs):
             """
             Wrapper function that processes arguments for the decorated function,
@@ -61,51 +100,30 @@ def smart_args(allow_positional=False):
                 The result of the original function after processing the arguments.
             """
 
-            # Check if positional arguments are allowed
-            if not allow_positional:
-                assert len(args) == 0, "Only keyword arguments are allowed"
-
-            # Process named arguments
-            bound_args = kwargs.copy()
-
-            # Apply positional arguments (if allowed)
-            for i, arg_value in enumerate(args):
-                arg_name = positional_args[i]
-                bound_args[arg_name] = arg_value
-
-            # Handle default values for positional arguments
-            for i, arg_name in enumerate(positional_args[pos_defaults_offset:]):
-                if arg_name not in bound_args:
-                    bound_args[arg_name] = defaults[i] if i < len(defaults) else None
-
-            # Handle keyword-only arguments and apply defaults if necessary
-            for kwarg_name, default_value in kwonly_defaults.items():
-                if kwarg_name not in bound_args:
-                    bound_args[kwarg_name] = default_value
-
-            # Process Evaluated and Isolated
-            for name, value in bound_args.items():
-                if isinstance(value, Evaluated):
-                    bound_args[name] = value.func()  # Evaluate function
-                elif isinstance(value, Isolated):
-                    # Ensure the value is provided in kwargs (not in bound_args)
-                    if name not in kwargs:
-                        raise ValueError(
-                            f"Argument '{name}' requires a value for Isolated"
-                        )
-                    # Deep copy the value if it was provided
-                    bound_args[name] = copy.deepcopy(kwargs[name])
-
-            # Check for incorrect combination of Evaluated and Isolated
-            for name in bound_args:
-                if isinstance(bound_args[name], Evaluated) and isinstance(
-                    bound_args[name], Isolated
-                ):
-                    raise ValueError(
-                        f"Cannot combine Evaluated and Isolated for argument '{name}'"
+            # `kwargs` is a new dict on every call, so it can be filled in place
+            if args:
+                # Check if positional arguments are allowed
+                assert allow_positional, "Only keyword arguments are allowed"
+                if len(args) > len(positional_args):
+                    raise TypeError(
+                        f"{func.__name__}() takes {len(positional_args)} positional "
+                        f"arguments but {len(args)} were given"
                     )
+                for arg_name, arg_value in zip(positional_args, args):
+                    kwargs[arg_name] = arg_value
+
+            # Evaluate the defaults that were not passed
+            for name, factory in evaluated:
+                if name not in kwargs:
+                    kwargs[name] = factory()
+
+            # Isolated arguments must be passed and are deeply copied
+            for name in isolated:
+                if name not in kwargs:
+                    raise ValueError(f"Argument '{name}' requires a value for Isolated")
+                kwargs[name] = copy.deepcopy(kwargs[name])
 
-            return func(**bound_args)
+            return func(**kwargs)
 
         return wrapper
 
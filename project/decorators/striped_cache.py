@@ -0,0 +1,178 @@
+import threading
+from typing import Any, Callable, Dict, Hashable, Iterator, List, Optional, Tuple
+
+from project.decorators.cache_policies import CachePolicy
+
+_MISSING = object()
+
+
+class InFlight:
+    """
+    A result that one thread is computing while others wait for it.
+
+    Attributes:
+        done (threading.Event): Set once the computation has finished.
+        result (Any): The computed value.
+        error (Optional[BaseException]): The exception raised by the computation, if any.
+    """
+
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self) -> None:
+        self.done: threading.Event = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class Stripe:
+    """
+    One independently locked part of a `StripedCache`.
+
+    Attributes:
+        lock (threading.Lock): Guards the policy and the in-flight table.
+        policy (CachePolicy): The entries of this stripe.
+        in_flight (Dict[Hashable, InFlight]): The keys being computed right now.
+    """
+
+    __slots__ = ("lock", "policy", "in_flight")
+
+    def __init__(self, policy: CachePolicy) -> None:
+        self.lock: threading.Lock = threading.Lock()
+        self.policy: CachePolicy = policy
+        self.in_flight: Dict[Hashable, InFlight] = {}
+
+
+class StripedCache(CachePolicy):
+    """
+    A thread-safe cache split into stripes by the hash of the key.
+
+    Each stripe has its own lock and its own policy, so hits on keys of
+    different stripes do not wait for each other. The capacity is divided
+    between the stripes, so the whole cache never holds more than `max_size`
+    entries; eviction is decided per stripe.
+
+    `get_or_compute` deduplicates concurrent misses (single flight): the first
+    thread that misses a key computes it, and the others wait for its result
+    or its exception instead of computing the key again.
+    """
+
+    def __init__(
+        self,
+        max_size: int,
+        new_policy: Callable[[int], CachePolicy],
+        stripes: int = 16,
+    ):
+        """
+        Args:
+            max_size: The capacity of the whole cache; 0 means it is unbounded.
+            new_policy: Creates the policy of a stripe from its capacity.
+            stripes: The number of stripes; it is capped at `max_size`.
+
+        Raises:
+            ValueError: If `stripes` is less than 1.
+        """
+        if stripes < 1:
+            raise ValueError("stripes must be at least 1")
+        super().__init__(max_size)
+        if max_size > 0:
+            stripes = min(stripes, max_size)
+            sizes = [
+                max_size // stripes + (i < max_size % stripes) for i in range(stripes)
+            ]
+        else:
+            sizes = [0] * stripes
+        self._stripes: List[Stripe] = [Stripe(new_policy(size)) for size in sizes]
+
+    def _stripe(self, key: Hashable) -> Stripe:
+        return self._stripes[hash(key) % len(self._stripes)]
+
+    def stats(self) -> Tuple[int, int, int]:
+        """
+        Returns the hits, misses and evictions summed over the stripes.
+        """
+        hits = misses = evictions = 0
+        for stripe in self._stripes:
+            stripe_hits, stripe_misses, stripe_evictions = stripe.policy.stats()
+            hits += stripe_hits
+            misses += stripe_misses
+            evictions += stripe_evictions
+        return hits, misses, evictions
+
+    def lookup(self, key: Hashable, default: Any = None) -> Any:
+        stripe = self._stripe(key)
+        with stripe.lock:
+            return stripe.policy.lookup(key, default)
+
+    def store(self, key: Hashable, value: Any) -> None:
+        stripe = self._stripe(key)
+        with stripe.lock:
+            stripe.policy.store(key, value)
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """
+        Returns the cached value of `key`, computing it at most once at a time.
+
+        Args:
+            key: The cache key.
+            compute: Computes the value on a miss; it runs without any lock held.
+
+        Returns:
+            The cached or computed value.
+
+        Raises:
+            Exception: Whatever `compute` raised, in the computing thread and
+                       in every thread that waited for it. Failures are not cached.
+        """
+        stripe = self._stripe(key)
+        with stripe.lock:
+            value = stripe.policy.lookup(key, _MISSING)
+            if value is not _MISSING:
+                return value
+            flight = stripe.in_flight.get(key)
+            leader = flight is None
+            if flight is None:
+                flight = stripe.in_flight[key] = InFlight()
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            flight.result = compute()
+        except BaseException as error:
+            flight.error = error
+            with stripe.lock:
+                del stripe.in_flight[key]
+            raise
+        else:
+            with stripe.lock:
+                stripe.policy.store(key, flight.result)
+                del stripe.in_flight[key]
+            return flight.result
+        finally:
+            flight.done.set()
+
+    def clear(self) -> None:
+        for stripe in self._stripes:
+            with stripe.lock:
+                stripe.policy.clear()
+
+    def __getitem__(self, key: Hashable) -> Any:
+        stripe = self._stripe(key)
+        with stripe.lock:
+            return stripe.policy[key]
+
+    def __iter__(self) -> Iterator:
+        for stripe in self._stripes:
+            with stripe.lock:
+                keys = list(stripe.policy)
+            yield from keys
+
+    def __len__(self) -> int:
+        size = 0
+        for stripe in self._stripes:
+            with stripe.lock:
+                size += len(stripe.policy)
+        return size
@@ -1,7 +1,53 @@
+from functools import update_wrapper
+
+from project.decorators.curry import Curried, KeywordCurried
+
+
+def _remaining_arity(curried):
+    """
+    Returns the number of positional arguments a curried function still needs.
+    """
+    if isinstance(curried, KeywordCurried):
+        return curried.plan.missing(len(curried.args), curried.kwargs)
+    return curried.arity - len(curried.args)
+
+
+def _uncurry_curried(curried, keywords=True):
+    """
+    Uncurries a function curried by this library by calling its original
+    function directly with the collected and the new arguments.
+    """
+    function = curried.function
+    collected = curried.args
+    collected_kwargs = getattr(curried, "kwargs", {})
+
+    def keyword_uncurried(*args, **kwargs):
+        return function(*collected, *args, **collected_kwargs, **kwargs)
+
+    expected = _remaining_arity(curried)
+
+    def uncurried(*args):
+        if len(args) != expected:
+            raise TypeError(f"Expected {expected} arguments, but got {len(args)}")
+        return function(*collected, *args, **collected_kwargs)
+
+    if keywords and isinstance(curried, KeywordCurried):
+        uncurried = keyword_uncurried
+
+    if not collected and not collected_kwargs:
+        update_wrapper(uncurried, function)
+    return uncurried
+
+
 def uncurry_explicit(function, arity):
     """
     Uncurries a curried function to accept multiple arguments at once.
 
+    A function curried by this library that needs exactly `arity` more
+    arguments is called directly with all of them instead of one call per
+    argument. A smaller arity gives the partial application, as the step by
+    step calls do.
+
     Arguments:
     function -- The curried function to be uncurried.
     arity -- The number of arguments the function expects.
@@ -15,6 +61,8 @@ def uncurry_explicit(function, arity):
     """
     if arity < 0:
         raise ValueError("Arity cannot be negative")
+    if isinstance(function, Curried) and arity == _remaining_arity(function):
+        return _uncurry_curried(function, keywords=False)
 
     def uncurried(*args):
         if len(args) != arity:
@@ -25,3 +73,30 @@ def uncurry_explicit(function, arity):
         return result
 
     return uncurried
+
+
+def uncurry(function, arity=None):
+    """
+    Uncurries a curried function, taking the arity from the function itself.
+
+    For functions curried by this library (`curry` or `curry_explicit`) the
+    result calls the original function directly and keeps its name and
+    signature; functions produced by `curry` also accept keyword arguments.
+    Other curried functions need an explicit arity.
+
+    Arguments:
+    function -- The curried function to be uncurried.
+    arity -- The number of arguments, required only for foreign curried functions.
+
+    Returns:
+    A function that accepts all arguments at once.
+
+    Raises:
+    ValueError -- If arity is negative.
+    TypeError -- If the arity is unknown or the wrong number of arguments is provided.
+    """
+    if arity is not None:
+        return uncurry_explicit(function, arity)
+    if isinstance(function, Curried):
+        return _uncurry_curried(function)
+    raise TypeError("The arity of a function not curried by curry is unknown")
@@ -0,0 +1,141 @@
+from pathlib import Path
+import sys
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+
+from project.cartesian_tree.compact_treap import CompactTreap, NIL
+from project.cartesian_tree.treap import Treap
+import pytest
+import random
+import tracemalloc
+
+
+def check_invariants(treap, index):
+    """Checks the BST, heap and subtree-size invariants of a subtree."""
+    if index == NIL:
+        return 0
+    left, right = treap._left[index], treap._right[index]
+    if left != NIL:
+        assert treap._keys[left] < treap._keys[index]
+        assert treap._priorities[left] <= treap._priorities[index]
+    if right != NIL:
+        assert treap._keys[right] > treap._keys[index]
+        assert treap._priorities[right] <= treap._priorities[index]
+    size = 1 + check_invariants(treap, left) + check_invariants(treap, right)
+    assert treap._sizes[index] == size
+    return size
+
+
+def test_mapping_operations():
+    treap = CompactTreap()
+
+    treap[3] = "c"
+    treap[1] = "a"
+    treap[2] = "b"
+    treap[2] = "B"
+
+    assert len(treap) == 3
+    assert treap[2] == "B"
+    assert 1 in treap
+    assert 4 not in treap
+    assert list(treap) == [1, 2, 3]
+    assert list(reversed(treap)) == [3, 2, 1]
+
+    del treap[1]
+    assert list(treap.items()) == [(2, "B"), (3, "c")]
+    with pytest.raises(KeyError):
+        del treap[1]
+    with pytest.raises(KeyError):
+        _ = treap[1]
+
+
+def test_random_operations_against_dict():
+    rng = random.Random(0)
+    treap = CompactTreap()
+    reference = {}
+    for _ in range(3000):
+        key = rng.randrange(500)
+        if rng.random() < 0.6:
+            treap[key] = key * 3
+            reference[key] = key * 3
+        elif key in reference:
+            del treap[key]
+            del reference[key]
+    check_invariants(treap, treap._root)
+    assert list(treap.items()) == sorted(reference.items())
+
+
+def test_free_slots_are_reused():
+    treap = CompactTreap()
+    for i in range(100):
+        treap[i] = i
+    for i in range(50):
+        del treap[i]
+    for i in range(100, 150):
+        treap[i] = i
+
+    assert len(treap._keys) == 100
+    assert len(treap) == 100
+    check_invariants(treap, treap._root)
+
+
+def test_rejected_insert_leaves_treap_usable():
+    treap = CompactTreap(value_typecode="q")
+    treap[1] = 10
+    with pytest.raises(TypeError):
+        treap[2] = "x"
+    with pytest.raises(OverflowError):
+        treap[2**70] = 1
+    treap[3] = 30
+
+    del treap[1]  # Puts a slot on the free list
+    with pytest.raises(TypeError):
+        treap[4] = "x"
+    treap[5] = 50
+    assert len(treap._keys) == len(treap._values) == 2
+    assert dict(treap.items()) == {3: 30, 5: 50}
+    check_invariants(treap, treap._root)
+
+
+def test_typed_values_and_order_statistics():
+    treap = CompactTreap(value_typecode="d")
+    for key in [5, 1, 9, 3, 7]:
+        treap[key] = key / 2
+
+    assert treap[9] == 4.5
+    assert [treap.select(i) for i in range(5)] == [1, 3, 5, 7, 9]
+    assert treap.select(-1) == 9
+    assert treap.rank(6) == 3
+    with pytest.raises(IndexError):
+        treap.select(5)
+
+
+def test_clear():
+    treap = CompactTreap()
+    for i in range(10):
+        treap[i] = i
+    treap.clear()
+
+    assert len(treap) == 0
+    assert list(treap) == []
+    treap[1] = 1
+    assert list(treap.items()) == [(1, 1)]
+
+
+def allocated_bytes(factory, count):
+    """Measures the memory held by a map filled with `count` integer items."""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    treap = factory()
+    for key in range(10**6, 10**6 + count):
+        treap[key] = key
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return used
+
+
+def test_memory_is_smaller_than_object_mode():
+    count = 5000
+    object_bytes = allocated_bytes(Treap, count)
+    compact_bytes = allocated_bytes(lambda: CompactTreap(value_typecode="q"), count)
+    assert object_bytes / compact_bytes >= 4
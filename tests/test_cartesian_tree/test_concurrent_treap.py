@@ -0,0 +1,219 @@
+from pathlib import Path
+import sys
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+
+from project.cartesian_tree.concurrent_treap import ConcurrentTreap, ReadWriteLock
+from project.thread_pool.thread_pool import ThreadPool
+import pytest
+import sys
+import threading
+
+
+def test_mapping_operations():
+    treap = ConcurrentTreap()
+    treap[2] = "b"
+    treap[1] = "a"
+    treap.update({3: "c"})
+    treap.update([(4, "d")])
+
+    assert len(treap) == 4
+    assert treap[1] == "a"
+    assert 4 in treap
+    assert list(treap) == [1, 2, 3, 4]
+    assert treap.select(0) == 1
+    assert treap.rank(3) == 2
+    assert treap.count_range(1, 3) == 2
+    assert list(treap.items_range(2, 4)) == [(2, "b"), (3, "c")]
+
+    named = ConcurrentTreap()
+    named.update(x=1, y=2)
+    assert dict(named.items()) == {"x": 1, "y": 2}
+
+
+def test_delete_and_missing_keys():
+    treap = ConcurrentTreap()
+    treap[1] = 1
+    del treap[1]
+
+    with pytest.raises(KeyError):
+        del treap[1]
+    with pytest.raises(KeyError):
+        _ = treap[1]
+    # A failed operation must release the lock
+    treap[2] = 2
+    assert list(reversed(treap)) == [2]
+
+
+def test_compound_operations():
+    treap = ConcurrentTreap()
+    assert treap.setdefault(2, "b") == "b"
+    assert treap.setdefault(2, "other") == "b"
+    treap[1] = "a"
+
+    assert treap.pop(3, None) is None
+    with pytest.raises(KeyError):
+        treap.pop(3)
+    assert treap.popitem() == (1, "a")
+    assert treap.pop(2) == "b"
+    with pytest.raises(KeyError):
+        treap.popitem()
+
+    treap.update({1: 1, 2: 2})
+    treap.clear()
+    assert len(treap) == 0 and list(treap) == []
+
+
+def test_concurrent_pop_of_one_key():
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        for _ in range(50):
+            treap = ConcurrentTreap()
+            treap[1] = "one"
+            treap.update((key, key) for key in range(2, 10))
+            results = []
+            errors = []
+            start = threading.Barrier(8)
+
+            def work():
+                start.wait()
+                try:
+                    results.append(treap.pop(1, None))
+                    treap.setdefault(0, []).append(None)
+                except Exception as error:
+                    errors.append(error)
+
+            threads = [threading.Thread(target=work) for _ in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+            assert errors == []
+            assert sorted(results, key=str) == [None] * 7 + ["one"]
+            assert len(treap[0]) == 8
+    finally:
+        sys.setswitchinterval(interval)
+
+
+def test_write_batch():
+    treap = ConcurrentTreap()
+    with treap.write_batch() as inner:
+        for i in range(10):
+            inner[i] = i * i
+        del inner[0]
+
+    assert list(treap.items()) == [(i, i * i) for i in range(1, 10)]
+
+
+def test_iteration_does_not_block_writers():
+    treap = ConcurrentTreap()
+    for i in range(10):
+        treap[i] = i
+
+    seen = []
+    for key in treap:
+        seen.append(key)
+        treap[key + 100] = key
+
+    assert seen == list(range(10))
+    assert len(treap) == 20
+
+
+def test_readers_share_the_lock_and_writers_wait():
+    lock = ReadWriteLock()
+    both_reading = threading.Barrier(2, timeout=5)
+    written = threading.Event()
+
+    def reader():
+        with lock.read():
+            both_reading.wait()
+
+    def writer():
+        with lock.write():
+            written.set()
+
+    lock.acquire_read()
+    writer_thread = threading.Thread(target=writer)
+    writer_thread.start()
+    assert not written.wait(0.2)
+    lock.release_read()
+    writer_thread.join(5)
+    assert written.is_set()
+
+    readers = [threading.Thread(target=reader) for _ in range(2)]
+    for thread in readers:
+        thread.start()
+    for thread in readers:
+        thread.join(5)
+    assert not both_reading.broken
+
+
+def test_concurrent_writes_from_thread_pool():
+    treap = ConcurrentTreap()
+    pool = ThreadPool(4)
+    errors = []
+
+    def work(offset):
+        try:
+            for i in range(offset, 2000, 4):
+                treap[i] = i
+                assert treap[i] == i
+                assert treap.get(i) == i
+                len(treap)
+                if i % 100 == offset:
+                    items = list(treap.items())
+                    assert all(key == value for key, value in items)
+        except Exception as error:
+            errors.append(error)
+
+    for offset in range(4):
+        pool.enqueue(work, offset)
+    pool.dispose()
+
+    assert errors == []
+    assert list(treap) == list(range(2000))
+
+
+def test_snapshot_reads_during_deletes():
+    treap = ConcurrentTreap()
+    treap.update((key, key) for key in range(50))
+    stop = threading.Event()
+    errors = []
+
+    def writer():
+        while not stop.is_set():
+            for key in range(50):
+                del treap[key]
+                treap[key] = key
+
+    def reader():
+        try:
+            for _ in range(200):
+                items = list(treap.items())
+                assert len(items) >= 49
+                assert all(key == value for key, value in items)
+                assert len(treap.values()) >= 49
+                assert treap.get(7, 7) == 7
+                assert treap != {}
+        except Exception as error:
+            errors.append(error)
+
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    threads = [threading.Thread(target=writer)]
+    threads.extend(threading.Thread(target=reader) for _ in range(2))
+    try:
+        for thread in threads:
+            thread.start()
+        for thread in threads[1:]:
+            thread.join()
+    finally:
+        stop.set()
+        threads[0].join()
+        sys.setswitchinterval(interval)
+
+    assert errors == []
+    assert treap == {key: key for key in range(50)}
+    assert treap.items() == {key: key for key in range(50)}.items()
@@ -0,0 +1,153 @@
+from pathlib import Path
+import sys
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+
+from project.cartesian_tree.implicit_treap import ImplicitTreap
+import pytest
+import random
+
+
+def check_invariants(node):
+    """Checks the heap and subtree-size invariants of a subtree."""
+    if node is None:
+        return 0
+    for child in (node.left, node.right):
+        if child is not None:
+            assert child.priority <= node.priority
+    size = 1 + check_invariants(node.left) + check_invariants(node.right)
+    assert node.size == size
+    return size
+
+
+def test_basic_sequence_operations():
+    seq = ImplicitTreap("abcde")
+
+    assert len(seq) == 5
+    assert list(seq) == list("abcde")
+    assert seq[0] == "a"
+    assert seq[-1] == "e"
+
+    seq.insert(2, "X")
+    seq.append("f")
+    seq.insert(-100, "start")
+    assert list(seq) == ["start", "a", "b", "X", "c", "d", "e", "f"]
+
+    seq[1] = "A"
+    del seq[0]
+    assert list(seq) == ["A", "b", "X", "c", "d", "e", "f"]
+    assert seq.pop() == "f"
+    assert seq.index("X") == 2
+
+    with pytest.raises(IndexError):
+        _ = seq[6]
+    with pytest.raises(IndexError):
+        del seq[-7]
+
+
+def test_slicing():
+    seq = ImplicitTreap(range(10))
+
+    part = seq[2:6]
+    assert isinstance(part, ImplicitTreap)
+    assert list(part) == [2, 3, 4, 5]
+    assert list(seq[::3]) == [0, 3, 6, 9]
+    assert list(seq[8:2]) == []
+    assert list(seq) == list(range(10))
+
+    del seq[2:5]
+    assert list(seq) == [0, 1, 5, 6, 7, 8, 9]
+    del seq[::2]
+    assert list(seq) == [1, 6, 8]
+
+    seq[1:2] = ["a", "b", "c"]
+    assert list(seq) == [1, "a", "b", "c", 8]
+    seq[::2] = [0, 0, 0]
+    assert list(seq) == [0, "a", 0, "c", 0]
+    with pytest.raises(ValueError):
+        seq[::2] = [1]
+
+
+def test_slice_assignment_builds_before_cutting():
+    seq = ImplicitTreap(range(5))
+    with pytest.raises(TypeError):
+        seq[2:4] = 5
+    assert list(seq) == [0, 1, 2, 3, 4]
+
+    reference = list(range(5))
+    seq[0:1] = seq
+    reference[0:1] = reference
+    assert list(seq) == reference == [0, 1, 2, 3, 4, 1, 2, 3, 4]
+
+    seq[2:3] = (value * 10 for value in seq)
+    reference[2:3] = (value * 10 for value in reference)
+    assert list(seq) == reference
+
+
+def test_concatenation():
+    first = ImplicitTreap([1, 2])
+    second = ImplicitTreap([3, 4])
+
+    assert list(first + second) == [1, 2, 3, 4]
+    assert list(first) == [1, 2]
+
+    first += [5]
+    assert list(first) == [1, 2, 5]
+
+    first.concat(second)
+    assert list(first) == [1, 2, 5, 3, 4]
+    assert len(second) == 0
+
+    first.extend(first)
+    assert list(first) == [1, 2, 5, 3, 4] * 2
+    with pytest.raises(ValueError):
+        first.concat(first)
+
+
+def test_reverse():
+    seq = ImplicitTreap(range(10))
+
+    seq.reverse(2, 7)
+    assert list(seq) == [0, 1, 6, 5, 4, 3, 2, 7, 8, 9]
+    seq.reverse()
+    assert list(seq) == [9, 8, 7, 2, 3, 4, 5, 6, 1, 0]
+    seq.reverse(-3)
+    assert list(seq) == [9, 8, 7, 2, 3, 4, 5, 0, 1, 6]
+    assert seq[3] == 2
+    assert list(seq[1:4]) == [8, 7, 2]
+
+
+def test_random_operations_against_list():
+    rng = random.Random(0)
+    seq = ImplicitTreap()
+    reference = []
+    for step in range(2000):
+        operation = rng.randrange(5)
+        position = rng.randint(0, len(reference))
+        end = rng.randint(position, len(reference))
+        if operation == 0 or not reference:
+            seq.insert(position, step)
+            reference.insert(position, step)
+        elif operation == 1:
+            del seq[position:end]
+            del reference[position:end]
+        elif operation == 2:
+            seq.reverse(position, end)
+            reference[position:end] = reference[position:end][::-1]
+        elif operation == 3:
+            index = rng.randrange(len(reference))
+            assert seq[index] == reference[index]
+        else:
+            assert list(seq[position:end]) == reference[position:end]
+
+    check_invariants(seq.root)
+    assert list(seq) == reference
+
+
+def test_large_sequence_does_not_recurse():
+    seq = ImplicitTreap(range(100000))
+    seq.reverse(10, 99990)
+
+    assert seq[10] == 99989
+    assert seq[99989] == 10
+    assert len(seq) == 100000
@@ -0,0 +1,95 @@
+from pathlib import Path
+import sys
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+
+from project.cartesian_tree.mmap_treap import MmapTreap
+from project.cartesian_tree.treap import Treap, Monoid
+import pytest
+import random
+
+
+@pytest.fixture
+def dumped(tmp_path):
+    treap = Treap()
+    for key in random.Random(7).sample(range(-500, 500), 200):
+        treap[key] = {"key": key, "square": key * key}
+    path = str(tmp_path / "index.treap")
+    treap.dump(path)
+    return treap, path
+
+
+def test_lookups(dumped):
+    treap, path = dumped
+    with Treap.open_mmap(path) as stored:
+        assert isinstance(stored, MmapTreap)
+        assert len(stored) == len(treap)
+        assert list(stored) == list(treap)
+        assert list(reversed(stored)) == list(reversed(treap))
+        for key in treap:
+            assert key in stored
+            assert stored[key] == treap[key]
+        assert 10**6 not in stored
+        with pytest.raises(KeyError):
+            _ = stored[10**6]
+
+
+def test_order_statistics_and_ranges(dumped):
+    treap, path = dumped
+    with Treap.open_mmap(path) as stored:
+        for k in (0, 17, len(treap) - 1, -1):
+            assert stored.select(k) == treap.select(k)
+        with pytest.raises(IndexError):
+            stored.select(len(treap))
+        for key in (-501, -3, 0, 250, 1000):
+            assert stored.rank(key) == treap.rank(key)
+            assert stored.bisect_right(key) == treap.bisect_right(key)
+        assert list(stored.irange(-100, 100)) == list(treap.irange(-100, 100))
+        assert list(stored.irange(-100, 100, reverse=True)) == list(
+            treap.irange(-100, 100, reverse=True)
+        )
+        assert list(stored.items_range(0, 50)) == list(treap.items_range(0, 50))
+        assert stored.count_range(hi=0) == treap.count_range(hi=0)
+        assert stored.count_range(50, -50) == 0
+
+
+def test_load_restores_the_same_tree(dumped):
+    treap, path = dumped
+    loaded = Treap.load(path)
+
+    def shape(node):
+        if node is None:
+            return None
+        return (node.key, node.priority, shape(node.left), shape(node.right))
+
+    assert shape(loaded.root) == shape(treap.root)
+    assert dict(loaded.items()) == dict(treap.items())
+
+    squares = Monoid(lambda a, b: a + b, 0, measure=lambda key, value: value["square"])
+    with_sum = Treap.load(path, monoid=squares)
+    assert with_sum.aggregate(0, 10) == sum(k * k for k in treap.irange(0, 10))
+
+
+def test_empty_treap(tmp_path):
+    path = str(tmp_path / "empty.treap")
+    Treap().dump(path)
+    with Treap.open_mmap(path) as stored:
+        assert len(stored) == 0
+        assert list(stored) == []
+    assert len(Treap.load(path)) == 0
+
+
+def test_invalid_files(tmp_path):
+    treap = Treap()
+    treap["a"] = 1
+    with pytest.raises(TypeError):
+        treap.dump(str(tmp_path / "strings.treap"))
+
+    path = tmp_path / "garbage.treap"
+    path.write_bytes(b"not a treap at all, just some bytes")
+    with pytest.raises(ValueError):
+        Treap.open_mmap(str(path))
+
+    path.write_bytes(b"")
+    with pytest.raises(ValueError):
+        Treap.open_mmap(str(path))
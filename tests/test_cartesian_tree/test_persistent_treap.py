@@ -0,0 +1,219 @@
+from pathlib import Path
+import sys
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+
+from project.cartesian_tree.persistent_treap import PersistentTreap, TreapSnapshot
+from project.cartesian_tree.treap import SUM, Treap
+import pytest
+import random
+
+
+def collect_nodes(node):
+    """Returns the set of ids of all nodes in a subtree."""
+    ids = set()
+    stack = [node] if node is not None else []
+    while stack:
+        current = stack.pop()
+        ids.add(id(current))
+        stack.extend(child for child in (current.left, current.right) if child)
+    return ids
+
+
+def test_snapshot_is_frozen():
+    treap = PersistentTreap()
+    for i in range(10):
+        treap[i] = i
+
+    snapshot = treap.snapshot()
+    treap[3] = "changed"
+    treap[100] = 100
+    del treap[0]
+
+    assert isinstance(snapshot, TreapSnapshot)
+    assert dict(snapshot.items()) == {i: i for i in range(10)}
+    assert len(snapshot) == 10
+    assert treap[3] == "changed"
+    assert 0 not in treap
+    assert 0 in snapshot
+    assert not hasattr(snapshot, "__setitem__")
+
+
+def test_snapshots_of_every_version():
+    rng = random.Random(0)
+    treap = PersistentTreap()
+    reference = {}
+    versions = []
+    for _ in range(500):
+        key = rng.randrange(100)
+        if rng.random() < 0.6:
+            treap[key] = rng.random()
+            reference[key] = treap[key]
+        elif key in reference:
+            del treap[key]
+            del reference[key]
+        versions.append((treap.snapshot(), dict(reference)))
+
+    for snapshot, expected in versions:
+        assert dict(snapshot.items()) == expected
+        assert list(snapshot) == sorted(expected)
+
+
+def test_writes_share_structure():
+    treap = PersistentTreap.from_sorted((i, i) for i in range(4096))
+    before = collect_nodes(treap.root)
+
+    treap[5000] = 5000
+    treap[17] = "updated"
+    del treap[2048]
+
+    new_nodes = collect_nodes(treap.root) - before
+    assert len(new_nodes) < 200
+    assert len(treap) == 4096
+
+
+def test_iteration_during_writes():
+    treap = PersistentTreap()
+    for i in range(100):
+        treap[i] = i
+
+    snapshot = treap.snapshot()
+    seen = []
+    for key in snapshot:
+        seen.append(key)
+        treap[key + 1000] = key
+        if key in treap:
+            del treap[key]
+
+    assert seen == list(range(100))
+    assert list(treap) == list(range(1000, 1100))
+
+
+def test_snapshot_range_queries_and_pop_range():
+    treap = PersistentTreap.from_sorted((i, str(i)) for i in range(20))
+    snapshot = treap.snapshot()
+
+    assert treap.pop_range(5, 10) == [(i, str(i)) for i in range(5, 10)]
+    assert list(snapshot.irange(4, 11)) == list(range(4, 11))
+    assert list(snapshot.items_range(8, 10)) == [(8, "8"), (9, "9")]
+    assert snapshot.count_range(5, 10) == 5
+    assert snapshot.select(5) == 5
+    assert snapshot.rank(10) == 10
+    assert list(reversed(snapshot))[:2] == [19, 18]
+    assert list(treap.irange(4, 11)) == [4, 10]
+
+
+def test_delete_missing_key():
+    treap = PersistentTreap()
+    treap[1] = 1
+    with pytest.raises(KeyError):
+        del treap[2]
+    assert list(treap) == [1]
+
+
+def test_set_operations_keep_operands_and_share_nodes():
+    first = PersistentTreap.from_sorted((i, "first") for i in range(0, 2000, 2))
+    second = PersistentTreap.from_sorted((i, "second") for i in range(0, 2000, 3))
+    first_snapshot = first.snapshot()
+    small = PersistentTreap.from_sorted([(1, "x"), (1001, "y")])
+
+    union = first.union(second)
+    assert set(union) == set(range(0, 2000, 2)) | set(range(0, 2000, 3))
+    assert union[6] == "second"
+    assert dict(first.items()) == dict(first_snapshot.items())
+    assert len(second) == 667
+
+    assert set(first.intersection(second)) == set(range(0, 2000, 6))
+    assert set(first.difference(second)) == set(range(0, 2000, 2)) - set(
+        range(0, 2000, 3)
+    )
+    assert set(first.symmetric_difference(small)) == set(range(0, 2000, 2)) | {
+        1,
+        1001,
+    }
+
+    shared = collect_nodes(first.root) & collect_nodes(first.union(small).root)
+    assert len(shared) > 900
+
+
+@pytest.mark.parametrize(
+    "operation",
+    [
+        "union",
+        "intersection",
+        "difference",
+        "symmetric_difference",
+        "union_update",
+        "intersection_update",
+        "difference_update",
+        "symmetric_difference_update",
+    ],
+)
+def test_plain_treap_set_operations_keep_persistent_operand(operation):
+    persistent = PersistentTreap.from_sorted((i, i) for i in range(0, 200, 2))
+    old = persistent.snapshot()
+    persistent[1] = 1
+    current = persistent.snapshot()
+    plain = Treap.from_sorted((i, -i) for i in range(0, 300, 3))
+
+    result = getattr(plain, operation)(persistent)
+    if result is None:
+        result = plain  # The in-place variants return None
+    plain_keys, persistent_keys = set(range(0, 300, 3)), {1} | set(range(0, 200, 2))
+    name = operation.replace("_update", "")
+    expected = {
+        "union": plain_keys | persistent_keys,
+        "intersection": plain_keys & persistent_keys,
+        "difference": plain_keys - persistent_keys,
+        "symmetric_difference": plain_keys ^ persistent_keys,
+    }[name]
+    assert set(result) == expected
+
+    assert dict(old.items()) == {i: i for i in range(0, 200, 2)}
+    assert dict(current.items()) == {1: 1, **{i: i for i in range(0, 200, 2)}}
+    if operation.endswith("_update"):
+        assert len(persistent) == 0
+    else:
+        assert dict(persistent.items()) == dict(current.items())
+
+
+def test_aggregates_in_versions():
+    treap = PersistentTreap(monoid=SUM)
+    for i in range(100):
+        treap[i] = i
+    snapshot = treap.snapshot()
+
+    treap[10] = 1000
+    del treap[20]
+    treap[500] = 1
+
+    assert snapshot.aggregate() == sum(range(100))
+    assert snapshot.aggregate(10, 11) == 10
+    assert treap.aggregate() == sum(range(100)) - 10 + 1000 - 20 + 1
+    assert treap.copy().aggregate(10, 21) == sum(range(11, 20)) + 1000
+
+
+def test_batch_operations_keep_snapshots():
+    treap = PersistentTreap.from_sorted((i, i) for i in range(100))
+    snapshot = treap.snapshot()
+
+    treap.set_many([(5, "five"), (200, 200), (5, "last")])
+    assert treap.delete_many([1, 2, 3, 300], missing_ok=True) == 3
+
+    assert treap.get_many([5, 200, 4]) == ["last", 200, 4]
+    assert 1 not in treap
+    assert dict(snapshot.items()) == {i: i for i in range(100)}
+
+
+def test_priority_queue_keeps_snapshots():
+    treap = PersistentTreap()
+    for key in range(10):
+        treap.set_with_priority(key, key, key)
+    snapshot = treap.snapshot()
+
+    assert treap.pop_max_priority() == (9, 9, 9)
+    treap.update_priority(0, 100)
+    assert treap.peek_max_priority() == (0, 0, 100)
+
+    assert list(snapshot) == list(range(10))
+    assert snapshot.peek_max_priority() == (9, 9, 9)
@@ -3,8 +3,9 @@ import sys
 
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
 
-from project.cartesian_tree.treap import Treap
+from project.cartesian_tree.treap import Treap, TreapNode, Monoid, SUM, MIN, MAX
 import pytest
+import random
 
 
 def test_insert_and_get():
@@ -142,3 +143,568 @@ def test_invalid_key_access():
 
     with pytest.raises(KeyError):
         _ = treap["nonexistent"]
+
+
+def check_invariants(treap, node):
+    """Checks the BST, heap and subtree-size invariants of a subtree."""
+    if node is None:
+        return 0
+    if node.left is not None:
+        assert node.left.key < node.key
+        assert node.left.priority <= node.priority
+    if node.right is not None:
+        assert node.right.key > node.key
+        assert node.right.priority <= node.priority
+    size = 1 + check_invariants(treap, node.left) + check_invariants(treap, node.right)
+    assert node.size == size
+    return size
+
+
+def test_len_is_maintained():
+    treap = Treap()
+    for i in range(100):
+        treap[i] = i
+        assert len(treap) == i + 1
+    treap[50] = "updated"
+    assert len(treap) == 100
+    for i in range(0, 100, 2):
+        del treap[i]
+    assert len(treap) == 50
+    check_invariants(treap, treap.root)
+
+
+def test_failed_delete_keeps_sizes():
+    treap = Treap()
+    for i in range(10):
+        treap[i] = i
+    with pytest.raises(KeyError):
+        del treap[42]
+    assert len(treap) == 10
+    check_invariants(treap, treap.root)
+
+
+def test_random_operations_against_dict():
+    rng = random.Random(0)
+    treap = Treap()
+    reference = {}
+    for _ in range(3000):
+        key = rng.randrange(500)
+        if rng.random() < 0.6:
+            treap[key] = key * 3
+            reference[key] = key * 3
+        elif key in reference:
+            del treap[key]
+            del reference[key]
+    check_invariants(treap, treap.root)
+    assert list(treap) == sorted(reference)
+    assert len(treap) == len(reference)
+
+
+def test_split_and_merge_keep_sizes():
+    treap = Treap()
+    for i in range(200):
+        treap[i] = i
+    left, right = treap.split(treap.root, 99)
+    assert check_invariants(treap, left) == 100
+    assert check_invariants(treap, right) == 100
+    merged = treap.merge(left, right)
+    assert check_invariants(treap, merged) == 200
+
+
+def test_degenerate_chain_does_not_recurse():
+    treap = Treap()
+    root = None
+    count = 2000
+    for i in range(count):
+        # Decreasing priorities turn the tree into a right-leaning chain
+        root = treap.merge(root, TreapNode(i, i, priority=count - i))
+    treap.root = root
+
+    assert len(treap) == count
+    assert list(treap) == list(range(count))
+    assert next(reversed(treap)) == count - 1
+    assert treap[count - 1] == count - 1
+    treap[count] = count
+    del treap[0]
+    assert len(treap) == count
+    assert treap.select(-1) == count
+
+
+def test_select_and_rank():
+    treap = Treap()
+    keys = random.Random(1).sample(range(10000), 1000)
+    for key in keys:
+        treap[key] = str(key)
+    ordered = sorted(keys)
+
+    for i, key in enumerate(ordered):
+        assert treap.select(i) == key
+        assert treap.rank(key) == i
+    assert treap.select(-1) == ordered[-1]
+    assert treap.rank(-1) == 0
+    assert treap.rank(10**6) == len(ordered)
+
+    with pytest.raises(IndexError):
+        treap.select(len(ordered))
+    with pytest.raises(IndexError):
+        Treap().select(0)
+
+
+def test_kth_smallest_and_largest():
+    treap = Treap()
+    for key in [5, 1, 9, 3, 7]:
+        treap[key] = key
+
+    assert [treap.kth_smallest(k) for k in range(1, 6)] == [1, 3, 5, 7, 9]
+    assert [treap.kth_largest(k) for k in range(1, 6)] == [9, 7, 5, 3, 1]
+
+    with pytest.raises(IndexError):
+        treap.kth_smallest(0)
+    with pytest.raises(IndexError):
+        treap.kth_largest(6)
+
+
+def test_none_value_is_retrievable():
+    treap = Treap()
+    treap[1] = None
+    assert 1 in treap
+    assert treap[1] is None
+
+
+def test_from_sorted():
+    items = [(i, i * i) for i in range(1000)]
+    treap = Treap.from_sorted(items)
+
+    check_invariants(treap, treap.root)
+    assert len(treap) == 1000
+    assert list(treap) == list(range(1000))
+    assert treap[31] == 961
+
+
+def test_from_sorted_duplicates_and_errors():
+    treap = Treap.from_sorted([(1, "a"), (2, "b"), (2, "c"), (3, "d")])
+    assert list(treap.items()) == [(1, "a"), (2, "c"), (3, "d")]
+    check_invariants(treap, treap.root)
+
+    assert len(Treap.from_sorted([])) == 0
+    with pytest.raises(ValueError):
+        Treap.from_sorted([(2, "b"), (1, "a")])
+
+
+def test_update_bulk():
+    treap = Treap()
+    for i in range(0, 100, 2):
+        treap[i] = "old"
+
+    treap.update_bulk([(i, "new") for i in reversed(range(0, 100, 3))])
+    check_invariants(treap, treap.root)
+    expected = {i: "old" for i in range(0, 100, 2)}
+    expected.update({i: "new" for i in range(0, 100, 3)})
+    assert dict(treap.items()) == expected
+    assert list(treap) == sorted(expected)
+
+    treap.update_bulk({5: "mapping"})
+    assert treap[5] == "mapping"
+    treap.update_bulk([(7, "first"), (7, "last")])
+    assert treap[7] == "last"
+
+
+def build_range_treap():
+    treap = Treap()
+    for key in random.Random(2).sample(range(0, 200, 2), 100):
+        treap[key] = key // 2
+    return treap
+
+
+def test_irange():
+    treap = build_range_treap()
+
+    assert list(treap.irange(10, 20)) == [10, 12, 14, 16, 18]
+    assert list(treap.irange(11, 19)) == [12, 14, 16, 18]
+    assert list(treap.irange(10, 20, reverse=True)) == [18, 16, 14, 12, 10]
+    assert list(treap.irange(hi=5)) == [0, 2, 4]
+    assert list(treap.irange(lo=195)) == [196, 198]
+    assert list(treap.irange(lo=190, reverse=True)) == [198, 196, 194, 192, 190]
+    assert list(treap.irange()) == list(treap)
+    assert list(treap.irange(20, 10)) == []
+    assert list(treap.irange(500, 600)) == []
+
+
+def test_items_range():
+    treap = build_range_treap()
+
+    assert list(treap.items_range(4, 9)) == [(4, 2), (6, 3), (8, 4)]
+    assert list(treap.items_range(4, 9, reverse=True)) == [(8, 4), (6, 3), (4, 2)]
+
+
+def test_count_range_and_bisect():
+    treap = build_range_treap()
+
+    assert treap.count_range(10, 20) == 5
+    assert treap.count_range(11, 12) == 0
+    assert treap.count_range() == 100
+    assert treap.count_range(20, 10) == 0
+    assert treap.bisect_left(10) == 5
+    assert treap.bisect_right(10) == 6
+    assert treap.bisect_left(11) == treap.bisect_right(11) == 6
+
+
+def test_pop_range():
+    treap = build_range_treap()
+
+    assert treap.pop_range(10, 20) == [(10, 5), (12, 6), (14, 7), (16, 8), (18, 9)]
+    assert len(treap) == 95
+    assert list(treap.irange(8, 22)) == [8, 20]
+    check_invariants(treap, treap.root)
+
+    assert treap.pop_range(150, 150) == []
+    assert [key for key, _ in treap.pop_range(lo=190)] == [190, 192, 194, 196, 198]
+    assert [key for key, _ in treap.pop_range(hi=4)] == [0, 2]
+    assert len(treap) == 88
+    check_invariants(treap, treap.root)
+
+
+def test_split_strict():
+    treap = Treap.from_sorted([(key, key) for key in "abcdef"])
+
+    left, right = treap.split(treap.root, "c", strict=True)
+    assert list(treap._inorder_iter(left)) == ["a", "b"]
+    assert list(treap._inorder_iter(right)) == ["c", "d", "e", "f"]
+
+
+def build_pair():
+    rng = random.Random(3)
+    first = {key: ("first", key) for key in rng.sample(range(300), 150)}
+    second = {key: ("second", key) for key in rng.sample(range(300), 150)}
+    first_treap = Treap.from_sorted(sorted(first.items()))
+    second_treap = Treap.from_sorted(sorted(second.items()))
+    return first, second, first_treap, second_treap
+
+
+def test_union():
+    first, second, first_treap, second_treap = build_pair()
+
+    result = first_treap.union(second_treap)
+    check_invariants(result, result.root)
+    assert dict(result.items()) == {**first, **second}
+    # The operands are not changed
+    assert dict(first_treap.items()) == first
+    assert dict(second_treap.items()) == second
+
+    result = first_treap.union(second_treap, conflict="left")
+    assert dict(result.items()) == {**second, **first}
+
+
+def test_union_with_custom_conflict():
+    left = Treap.from_sorted([(1, 10), (2, 20)])
+    right = Treap.from_sorted([(2, 2), (3, 3)])
+
+    result = left.union(right, conflict=lambda key, a, b: (key, a, b))
+    assert dict(result.items()) == {1: 10, 2: (2, 20, 2), 3: 3}
+    result = right.union(left, conflict=lambda key, a, b: (key, a, b))
+    assert result[2] == (2, 2, 20)
+
+    with pytest.raises(ValueError):
+        left.union(right, conflict="middle")
+
+
+def test_intersection():
+    first, second, first_treap, second_treap = build_pair()
+
+    result = first_treap.intersection(second_treap)
+    check_invariants(result, result.root)
+    assert dict(result.items()) == {key: second[key] for key in first if key in second}
+
+    result = first_treap.intersection(second_treap, conflict="left")
+    assert dict(result.items()) == {key: first[key] for key in first if key in second}
+
+
+def test_difference_and_symmetric_difference():
+    first, second, first_treap, second_treap = build_pair()
+
+    result = first_treap.difference(second_treap)
+    check_invariants(result, result.root)
+    assert dict(result.items()) == {k: v for k, v in first.items() if k not in second}
+
+    result = first_treap.symmetric_difference(second_treap)
+    check_invariants(result, result.root)
+    expected = {k: v for k, v in first.items() if k not in second}
+    expected.update({k: v for k, v in second.items() if k not in first})
+    assert dict(result.items()) == expected
+
+
+def test_in_place_set_operations_reuse_nodes():
+    first, second, first_treap, second_treap = build_pair()
+    nodes = {id(node) for node in first_treap._inorder_nodes(first_treap.root)}
+    nodes |= {id(node) for node in second_treap._inorder_nodes(second_treap.root)}
+
+    first_treap.union_update(second_treap)
+    check_invariants(first_treap, first_treap.root)
+    assert dict(first_treap.items()) == {**first, **second}
+    assert len(second_treap) == 0
+    assert {id(node) for node in first_treap._inorder_nodes(first_treap.root)} <= nodes
+
+    _, second, _, second_treap = build_pair()
+    first_treap.difference_update(second_treap)
+    assert set(first_treap) == set(first) - set(second)
+
+    first, second, first_treap, second_treap = build_pair()
+    first_treap.intersection_update(second_treap, conflict="left")
+    assert set(first_treap) == set(first) & set(second)
+
+    first, second, first_treap, second_treap = build_pair()
+    first_treap.symmetric_difference_update(second_treap)
+    assert set(first_treap) == set(first) ^ set(second)
+    check_invariants(first_treap, first_treap.root)
+
+
+def test_set_operations_with_empty_treap():
+    treap = Treap.from_sorted([(1, 1), (2, 2)])
+
+    assert list(treap.union(Treap())) == [1, 2]
+    assert list(Treap().union(treap)) == [1, 2]
+    assert list(treap.intersection(Treap())) == []
+    assert list(treap.difference(Treap())) == [1, 2]
+    assert list(Treap().symmetric_difference(treap)) == [1, 2]
+
+
+def test_copy():
+    treap = Treap.from_sorted((i, i) for i in range(50))
+    clone = treap.copy()
+    clone[100] = 100
+    del clone[0]
+
+    assert list(treap) == list(range(50))
+    assert list(clone) == list(range(1, 50)) + [100]
+
+
+def brute_aggregate(monoid, items, lo, hi):
+    result = monoid.identity
+    for key, value in sorted(items.items()):
+        if (lo is None or key >= lo) and (hi is None or key < hi):
+            result = monoid.combine(result, monoid.measure(key, value))
+    return result
+
+
+def test_aggregate_matches_brute_force():
+    rng = random.Random(4)
+    for monoid in (SUM, MIN, MAX):
+        treap = Treap(monoid=monoid)
+        reference = {}
+        for _ in range(600):
+            key = rng.randrange(200)
+            if rng.random() < 0.7:
+                treap[key] = rng.randrange(-1000, 1000)
+                reference[key] = treap[key]
+            elif key in reference:
+                del treap[key]
+                del reference[key]
+        for _ in range(200):
+            lo = rng.choice([None, rng.randrange(-10, 210)])
+            hi = rng.choice([None, rng.randrange(-10, 210)])
+            assert treap.aggregate(lo, hi) == brute_aggregate(monoid, reference, lo, hi)
+
+
+def test_aggregate_keeps_order_for_non_commutative_monoid():
+    concat = Monoid(lambda a, b: a + b, "", measure=lambda key, value: str(key))
+    treap = Treap(monoid=concat)
+    for key in random.Random(5).sample(range(10), 10):
+        treap[key] = None
+
+    assert treap.aggregate() == "0123456789"
+    assert treap.aggregate(3, 7) == "3456"
+    assert treap.aggregate(hi=4) == "0123"
+    assert treap.aggregate(lo=8) == "89"
+    assert treap.aggregate(7, 3) == ""
+
+
+def test_aggregate_after_structural_operations():
+    treap = Treap.from_sorted(((i, i) for i in range(100)), monoid=SUM)
+    assert treap.aggregate() == sum(range(100))
+
+    treap.pop_range(10, 20)
+    treap.update_bulk([(5, 1000), (200, 1)])
+    expected = sum(range(100)) - sum(range(10, 20)) - 5 + 1000 + 1
+    assert treap.aggregate() == expected
+    assert treap.aggregate(0, 10) == sum(range(10)) - 5 + 1000
+
+    other = Treap.from_sorted(((i, 1) for i in range(90, 110)), monoid=SUM)
+    union = treap.union(other)
+    assert union.aggregate(90, 110) == 20
+    assert treap.copy().aggregate() == expected
+
+
+def test_aggregate_without_monoid():
+    with pytest.raises(ValueError):
+        Treap().aggregate()
+
+
+def test_get_many():
+    treap = Treap.from_sorted((i, i * 10) for i in range(0, 100, 2))
+
+    assert treap.get_many([8, 2, 8, 0]) == [80, 20, 80, 0]
+    assert treap.get_many([3, 4], default=None) == [None, 40]
+    assert treap.get_many([]) == []
+    with pytest.raises(KeyError):
+        treap.get_many([4, 5])
+
+
+def test_set_many_and_delete_many():
+    rng = random.Random(6)
+    treap = Treap(monoid=SUM)
+    reference = {}
+    for _ in range(20):
+        pairs = [(rng.randrange(300), rng.randrange(100)) for _ in range(40)]
+        treap.set_many(pairs)
+        reference.update(pairs)
+        removed = rng.sample(range(300), 30)
+        assert treap.delete_many(removed, missing_ok=True) == len(
+            set(removed) & set(reference)
+        )
+        for key in removed:
+            reference.pop(key, None)
+
+    check_invariants(treap, treap.root)
+    assert dict(treap.items()) == reference
+    assert treap.aggregate() == sum(reference.values())
+
+
+def test_delete_many_missing_key_changes_nothing():
+    treap = Treap.from_sorted((i, i) for i in range(10))
+
+    with pytest.raises(KeyError):
+        treap.delete_many([1, 2, 42])
+    assert len(treap) == 10
+    assert treap.delete_many([1, 2, 2]) == 2
+    assert list(treap) == [0] + list(range(3, 10))
+
+
+def test_batch_operations_with_numpy_arrays():
+    np = pytest.importorskip("numpy")
+    treap = Treap()
+
+    keys = np.array([5, 1, 3])
+    treap.set_many(np.column_stack([keys, keys * 2]))
+    assert dict(treap.items()) == {1: 2, 3: 6, 5: 10}
+    assert all(type(key) is int for key in treap)
+    assert treap.get_many(np.array([3, 5])) == [6, 10]
+    assert treap.delete_many(np.array([1, 5])) == 2
+    assert list(treap) == [3]
+
+
+def test_priority_queue_operations():
+    treap = Treap()
+    for key, priority in [("a", 5), ("b", 9), ("c", 1), ("d", 7)]:
+        treap.set_with_priority(key, key.upper(), priority)
+    check_invariants(treap, treap.root)
+
+    assert treap.peek_max_priority() == ("b", "B", 9)
+    assert treap.priority_of("d") == 7
+
+    treap.increase_priority("c", 10)
+    assert treap.peek_max_priority() == ("c", "C", 10)
+    treap.decrease_priority("c", 0)
+    treap.update_priority("a", 8)
+    check_invariants(treap, treap.root)
+
+    popped = [treap.pop_max_priority() for _ in range(4)]
+    assert popped == [("b", "B", 9), ("a", "A", 8), ("d", "D", 7), ("c", "C", 0)]
+    with pytest.raises(IndexError):
+        treap.pop_max_priority()
+    with pytest.raises(IndexError):
+        treap.peek_max_priority()
+
+
+def test_priority_updates_validate_arguments():
+    treap = Treap()
+    treap.set_with_priority(1, "one", 5)
+    treap.set_with_priority(1, "uno", 6)
+
+    assert len(treap) == 1
+    assert treap.peek_max_priority() == (1, "uno", 6)
+    with pytest.raises(ValueError):
+        treap.increase_priority(1, 2)
+    with pytest.raises(ValueError):
+        treap.decrease_priority(1, 7)
+    with pytest.raises(KeyError):
+        treap.update_priority(2, 1)
+    with pytest.raises(KeyError):
+        treap.priority_of(2)
+
+
+def test_heap_order_matches_sorting():
+    rng = random.Random(8)
+    treap = Treap()
+    priorities = {}
+    for key in range(500):
+        priorities[key] = rng.randrange(10**6)
+        treap.set_with_priority(key, None, priorities[key])
+    for key in rng.sample(range(500), 100):
+        priorities[key] = rng.randrange(10**6)
+        treap.update_priority(key, priorities[key])
+    check_invariants(treap, treap.root)
+
+    order = [treap.pop_max_priority()[2] for _ in range(len(treap))]
+    assert order == sorted(priorities.values(), reverse=True)
+
+
+def test_merge_heaps():
+    first, second = Treap(), Treap()
+    for key in range(0, 20, 2):
+        first.set_with_priority(key, "first", key)
+    for key in range(1, 20, 2):
+        second.set_with_priority(key, "second", key)
+
+    first.merge_heaps(second)
+    check_invariants(first, first.root)
+    assert len(second) == 0
+    assert [first.pop_max_priority()[0] for _ in range(20)] == list(range(19, -1, -1))
+
+
+def chain_heap(keys):
+    """A heap whose priorities grow with the keys: a left-leaning chain."""
+    treap = Treap()
+    for key in keys:
+        treap.set_with_priority(key, key, key)
+    return treap
+
+
+def test_set_operations_on_chain_heaps_do_not_recurse():
+    count = 3000
+    treap = chain_heap(range(count))
+    treap.merge_heaps(chain_heap(range(count, 2 * count)))
+    assert len(treap) == 2 * count
+    assert treap.peek_max_priority() == (2 * count - 1, 2 * count - 1, 2 * count - 1)
+
+    assert treap.delete_many(range(0, 2 * count, 2)) == count
+    assert list(treap) == list(range(1, 2 * count, 2))
+
+    other = chain_heap(range(0, 2 * count, 3))
+    odd = set(range(1, 2 * count, 2))
+    multiples = set(range(0, 2 * count, 3))
+    assert list(treap.union(other)) == sorted(odd | multiples)
+    assert list(treap.intersection(other)) == sorted(odd & multiples)
+    assert list(treap.difference(other)) == sorted(odd - multiples)
+    assert list(treap.symmetric_difference(other)) == sorted(odd ^ multiples)
+    order = [treap.pop_max_priority()[0] for _ in range(len(treap))]
+    assert order == sorted(odd, reverse=True)
+
+
+def test_update_bulk_keeps_priorities():
+    treap = Treap()
+    treap.set_with_priority("job-a", 1, 10)
+    treap.set_with_priority("job-b", 2, 5)
+    treap.increase_priority("job-b", 12)
+    treap.update_bulk([("job-c", 3), ("job-a", 4)])
+    check_invariants(treap, treap.root)
+
+    assert treap.priority_of("job-a") == 10
+    assert treap.priority_of("job-b") == 12
+    assert treap["job-a"] == 4
+    treap.decrease_priority("job-b", 0)
+    treap.update_bulk({"job-d": 5})
+    assert treap.priority_of("job-b") == 0
+    popped = [treap.pop_max_priority() for _ in range(len(treap))]
+    priorities = [priority for _, _, priority in popped]
+    assert priorities == sorted(priorities, reverse=True)
+    assert ("job-a", 4, 10) in popped and ("job-b", 2, 0) in popped
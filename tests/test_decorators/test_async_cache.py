@@ -0,0 +1,99 @@
+from pathlib import Path
+import sys
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+
+import asyncio
+
+import pytest
+
+from project.decorators.cache_decorator import cache_results
+
+
+def test_caches_awaited_results():
+    @cache_results(max_cache_size=2)
+    async def double(x):
+        await asyncio.sleep(0)
+        return 2 * x
+
+    async def main():
+        assert await double(1) == 2
+        assert await double(1) == 2
+        assert await double(2) == 4
+        assert await double(3) == 6  # Evicts (1,)
+        assert await double(1) == 2
+
+    asyncio.run(main())
+    assert double.calls == 4
+    assert len(double.cache) == 2
+
+
+def test_concurrent_awaiters_share_one_call():
+    started = []
+
+    @cache_results()
+    async def fetch(x):
+        started.append(x)
+        await asyncio.sleep(0.01)
+        return x * 10
+
+    async def main():
+        return await asyncio.gather(*(fetch(i % 2) for i in range(10)))
+
+    assert asyncio.run(main()) == [0, 10] * 5
+    assert sorted(started) == [0, 1]
+    assert fetch.calls == 2
+
+
+def test_errors_are_shared_and_not_cached():
+    started = []
+
+    @cache_results()
+    async def failing(x):
+        started.append(x)
+        await asyncio.sleep(0.01)
+        raise ValueError("boom")
+
+    async def main():
+        return await asyncio.gather(
+            *(failing(1) for _ in range(3)), return_exceptions=True
+        )
+
+    errors = asyncio.run(main())
+    assert [str(error) for error in errors] == ["boom"] * 3
+    assert len(started) == 1
+    with pytest.raises(ValueError):
+        asyncio.run(failing(1))
+    assert len(started) == 2
+    assert failing.calls == 0
+
+
+def test_cancelled_awaiter_does_not_cancel_others():
+    @cache_results()
+    async def slow(x):
+        await asyncio.sleep(0.02)
+        return x
+
+    async def main():
+        first = asyncio.ensure_future(slow(5))
+        second = asyncio.ensure_future(slow(5))
+        await asyncio.sleep(0)
+        first.cancel()
+        assert await second == 5
+        with pytest.raises(asyncio.CancelledError):
+            await first
+
+    asyncio.run(main())
+    assert slow.calls == 1
+    assert asyncio.run(slow(5)) == 5
+    assert slow.calls == 1
+
+
+def test_works_across_event_loops_with_policies():
+    @cache_results(max_cache_size=4, policy="lru", thread_safe=True)
+    async def identity(x):
+        return x
+
+    assert asyncio.run(identity(1)) == 1
+    assert asyncio.run(identity(1)) == 1
+    assert identity.calls == 1
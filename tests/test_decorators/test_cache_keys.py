@@ -0,0 +1,120 @@
+from pathlib import Path
+import sys
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+
+import pickle
+
+import numpy as np
+import pytest
+
+from project.decorators.cache_decorator import cache_results
+from project.decorators.cache_keys import (
+    KWARGS_MARK,
+    content_hash,
+    freeze,
+    make_key_builder,
+)
+
+
+def test_positional_fast_path_returns_args():
+    def f(x, y):
+        return x + y
+
+    build_key = make_key_builder(f)
+    args = (1, 2)
+    assert build_key(args, {}) is args
+
+
+def test_keywords_and_defaults_are_normalized():
+    def f(x, y=0, *, z=1):
+        return x + y + z
+
+    build_key = make_key_builder(f)
+    expected = build_key((1,), {})
+    assert build_key((1, 0), {}) == expected
+    assert build_key((), {"x": 1}) == expected
+    assert build_key((), {"y": 0, "x": 1, "z": 1}) == expected
+    assert build_key((1,), {"z": 2}) != expected
+    assert expected == (1, 0, KWARGS_MARK, "z", 1)
+
+
+def test_var_arguments():
+    def f(a, *args, **kwargs):
+        return a
+
+    build_key = make_key_builder(f)
+    assert build_key((1, 2, 3), {}) == (1, 2, 3)
+    assert build_key((1,), {"b": 2, "c": 3}) == build_key((), {"c": 3, "a": 1, "b": 2})
+    assert build_key((1, 2), {"k": 3}) == (1, 2, KWARGS_MARK, "k", 3)
+
+
+def test_bad_calls_and_builtins_fall_back():
+    def f(x):
+        return x
+
+    build_key = make_key_builder(f)
+    assert build_key((1, 2), {}) == (1, 2)
+    assert build_key((1,), {"x": 2}) == (1, KWARGS_MARK, ("x", 2))
+    assert make_key_builder(max)((1, 2), {}) == (1, 2)
+
+
+def test_decorated_calls_share_entries():
+    @cache_results()
+    def add(x, y=0):
+        return x + y
+
+    assert add(1) == add(x=1) == add(1, 0) == add(y=0, x=1) == 1
+    assert add.calls == 1
+    with pytest.raises(TypeError):
+        add(1, x=1)
+
+
+def test_content_hash():
+    assert content_hash([1, [2, 3]]) == content_hash([1, [2, 3]])
+    assert content_hash([1, 2]) != (1, 2)
+    assert content_hash({"b": [1], "a": 2}) == content_hash({"a": 2, "b": [1]})
+    assert content_hash({1, 2}) == content_hash({2, 1})
+    assert content_hash(bytearray(b"ab")) != content_hash(bytearray(b"ba"))
+    with pytest.raises(TypeError):
+        content_hash(object.__new__(type("Unhashable", (), {"__hash__": None})))
+
+
+def test_content_hash_of_arrays():
+    array = np.arange(6)
+    assert content_hash(array) == content_hash(np.arange(6))
+    assert content_hash(array) != content_hash(array.reshape(2, 3))
+    assert content_hash(array) != content_hash(array.astype(np.float64))
+    objects = np.array([[1], "a"], dtype=object)
+    assert content_hash(objects) == content_hash(np.array([[1], "a"], dtype=object))
+
+
+def test_freeze_keeps_hashable_parts():
+    key = (1, [2], "a")
+    frozen = freeze(key, content_hash)
+    assert frozen[0] == 1 and frozen[2] == "a"
+    assert hash(frozen) == hash(freeze((1, [2], "a"), content_hash))
+    assert pickle.loads(pickle.dumps(frozen)) == frozen
+
+
+@pytest.mark.parametrize("thread_safe", [False, True])
+def test_unhashable_arguments(thread_safe):
+    @cache_results(thread_safe=thread_safe)
+    def total(values):
+        return sum(values)
+
+    assert total([1, 2, 3]) == 6
+    assert total([1, 2, 3]) == 6
+    assert total(np.array([1, 2, 3])) == 6
+    assert total(np.array([1, 2, 3])) == 6
+    assert total.calls == 2
+
+
+def test_custom_hasher():
+    @cache_results(hasher=lambda value: len(value))
+    def first(values):
+        return values[0]
+
+    assert first([1, 2]) == 1
+    assert first([3, 4]) == 1  # Same length, same key
+    assert first.calls == 1
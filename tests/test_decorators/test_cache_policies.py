@@ -0,0 +1,180 @@
+from pathlib import Path
+import sys
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+
+import pytest
+
+from project.decorators.cache_decorator import cache_results
+from project.decorators.cache_policies import (
+    ARCPolicy,
+    CachePolicy,
+    LFUPolicy,
+    LRUPolicy,
+    TTLPolicy,
+    WeightPolicy,
+)
+
+
+class FakeClock:
+    """A manually advanced clock for the TTL tests."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_lru_hit_refreshes_recency():
+    @cache_results(max_cache_size=2, policy="lru")
+    def square(x):
+        return x * x
+
+    square(1)
+    square(2)
+    square(1)  # (1,) is now the most recently used
+    square(3)  # Evicts (2,)
+    assert square.calls == 3
+    square(1)
+    assert square.calls == 3
+    square(2)
+    assert square.calls == 4
+
+
+def test_lfu_evicts_least_frequent():
+    cache = LFUPolicy(2)
+    cache.store("a", 1)
+    cache.store("b", 2)
+    assert cache.lookup("a") == 1
+    assert cache.lookup("a") == 1
+    assert cache.lookup("b") == 2
+    cache.store("c", 3)  # "b" was used less often than "a"
+    assert "b" not in cache
+    assert cache.lookup("a") == 1 and cache.lookup("c") == 3
+
+
+def test_lfu_ties_evict_least_recent():
+    cache = LFUPolicy(2)
+    cache.store("a", 1)
+    cache.store("b", 2)
+    cache.store("c", 3)
+    assert list(cache) == ["b", "c"]
+
+
+def test_ttl_expires_entries():
+    clock = FakeClock()
+    cache = TTLPolicy(0, ttl=10, timer=clock)
+    cache.store("a", 1)
+    clock.now = 5
+    cache.store("b", 2)
+    assert cache.lookup("a") == 1
+    clock.now = 10
+    assert cache.lookup("a", "missing") == "missing"
+    assert len(cache) == 1
+    clock.now = 15
+    assert len(cache) == 0
+
+
+def test_ttl_policy_requires_ttl():
+    with pytest.raises(ValueError):
+        cache_results(policy="ttl")
+
+
+def test_unknown_policy():
+    with pytest.raises(ValueError):
+        cache_results(policy="random")
+
+
+def test_weight_policy_limits_total_weight():
+    @cache_results(max_cache_size=10, policy="weight")
+    def word(n):
+        return "x" * n
+
+    word(4)
+    word(4)
+    word(3)
+    assert len(word.cache) == 2 and word.cache.total_weight == 7
+    word(5)  # Evicts (4,) to fit
+    assert len(word.cache) == 2 and word.cache.total_weight == 8
+    word(11)  # Too heavy to be cached at all
+    assert (11,) not in word.cache
+    assert word.calls == 4
+
+
+def test_weight_policy_custom_weigher():
+    cache = WeightPolicy(5, weigher=lambda value: value)
+    cache.store("a", 3)
+    cache.store("b", 2)
+    cache.store("a", 1)  # Replacing a value updates the weight
+    assert cache.total_weight == 3
+    cache.store("c", 4)  # Evicts "b" (least recently used)
+    assert list(cache) == ["a", "c"]
+
+
+def test_arc_keeps_frequent_keys_through_a_scan():
+    cache = ARCPolicy(4)
+    for key in ("a", "b"):
+        cache.store(key, key)
+        cache.lookup(key)
+    for key in range(100):  # A one-pass scan must not flush the hot keys
+        if cache.lookup(key) is None:
+            cache.store(key, key)
+    assert "a" in cache and "b" in cache
+    assert len(cache) == 4
+
+
+def test_arc_ghost_hit_adapts():
+    cache = ARCPolicy(2)
+    cache.store("a", 1)
+    cache.store("b", 2)
+    cache.store("c", 3)  # "a" goes to the ghost list
+    assert "a" not in cache
+    cache.store("a", 1)  # A ghost hit is promoted to the frequent list
+    assert cache["a"] == 1
+    assert len(cache) == 2
+
+
+def test_policy_factory():
+    @cache_results(max_cache_size=1, policy=LRUPolicy)
+    def identity(x):
+        return x
+
+    identity(1)
+    identity(1)
+    assert isinstance(identity.cache, LRUPolicy)
+    assert identity.calls == 1
+
+
+def test_incomplete_policy_fails_on_creation():
+    class NoStore(CachePolicy):
+        def lookup(self, key, default=None):
+            return default
+
+        def clear(self):
+            pass
+
+        def __getitem__(self, key):
+            raise KeyError(key)
+
+        def __iter__(self):
+            return iter(())
+
+        def __len__(self):
+            return 0
+
+    with pytest.raises(TypeError, match="store"):
+        NoStore()
+    with pytest.raises(TypeError, match="store"):
+        cache_results(policy=NoStore)
+
+
+@pytest.mark.parametrize("policy", ["fifo", "lru", "lfu", "arc"])
+def test_policies_respect_max_size(policy):
+    @cache_results(max_cache_size=8, policy=policy)
+    def double(x):
+        return 2 * x
+
+    for i in range(200):
+        assert double(i % 13) == 2 * (i % 13)
+        assert len(double.cache) <= 8
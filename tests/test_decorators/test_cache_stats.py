@@ -0,0 +1,134 @@
+from pathlib import Path
+import sys
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+
+import asyncio
+import time
+from collections import OrderedDict
+
+import pytest
+
+from project.decorators.cache_decorator import cache_results
+from project.decorators.cache_stats import CacheInfo, LatencyHistogram
+
+
+@pytest.mark.parametrize("thread_safe", [False, True])
+def test_cache_info_counts(thread_safe):
+    @cache_results(max_cache_size=2, policy="lru", thread_safe=thread_safe, stripes=1)
+    def square(x):
+        return x * x
+
+    assert square.cache_info() == CacheInfo(0, 0, 0, 0, 0.0, 0.0)
+    for x in (1, 2, 1, 3, 1, 2):
+        square(x)
+    info = square.cache_info()
+    assert (info.hits, info.misses, info.evictions, info.size) == (2, 4, 2, 2)
+    assert info.hit_ratio == pytest.approx(1 / 3)
+
+
+def test_time_saved_uses_miss_latency():
+    @cache_results()
+    def slow(x):
+        time.sleep(0.02)
+        return x
+
+    slow(1)
+    for _ in range(5):
+        slow(1)
+    info = slow.cache_info()
+    assert info.hits == 5
+    assert 5 * 0.02 <= info.time_saved < 5 * 0.2
+
+
+def test_cache_clear():
+    @cache_results(max_cache_size=4)
+    def identity(x):
+        return x
+
+    identity(1)
+    identity(1)
+    identity.cache_clear()
+    assert identity.calls == 0
+    assert identity.cache_info() == CacheInfo(0, 0, 0, 0, 0.0, 0.0)
+    identity(1)
+    assert identity.calls == 1
+
+
+def test_plain_reset_starts_new_statistics():
+    @cache_results()
+    def identity(x):
+        return x
+
+    identity(1)
+    identity(1)
+    identity.cache = OrderedDict()
+    assert identity.cache_info().hits == 0
+
+
+def test_metrics_callback():
+    reports = []
+
+    @cache_results(metrics_callback=reports.append, metrics_interval=0)
+    def identity(x):
+        return x
+
+    identity(1)
+    identity(1)
+    assert [(info.hits, info.misses) for info in reports] == [(0, 1), (1, 1)]
+
+
+def test_metrics_callback_is_rate_limited():
+    reports = []
+
+    @cache_results(metrics_callback=reports.append, metrics_interval=3600)
+    def identity(x):
+        return x
+
+    for x in range(10):
+        identity(x)
+    assert len(reports) == 1
+
+
+def test_async_statistics():
+    @cache_results()
+    async def identity(x):
+        await asyncio.sleep(0)
+        return x
+
+    async def main():
+        await asyncio.gather(identity(1), identity(1), identity(2))
+        await identity(1)
+
+    asyncio.run(main())
+    info = identity.cache_info()
+    assert info.hits == 1 and info.size == 2
+    assert identity.calls == 2
+
+
+def test_latency_histogram():
+    @cache_results(latency_histogram=True)
+    def slow(x):
+        time.sleep(0.003 * x)
+        return x
+
+    assert cache_results()(lambda x: x).latencies is None
+    slow(1)
+    slow(1)
+    slow(2)
+    assert set(slow.latencies) == {(1,), (2,)}
+    buckets = slow.latencies[(1,)]
+    assert sum(buckets.values()) == 1
+    (bound,) = buckets
+    assert 0.003 <= bound < 0.1
+
+
+def test_histogram_buckets():
+    histogram = LatencyHistogram()
+    histogram.record("a", 0.0)
+    histogram.record("a", 1e-6)
+    histogram.record("a", 3e-6)
+    histogram.record("a", 4e-6)
+    assert histogram["a"] == {1e-6: 2, 4e-6: 2}
+    histogram.clear()
+    assert len(histogram) == 0
@@ -4,7 +4,7 @@ import sys
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
 
 import pytest
-from project.decorators.curry import curry_explicit
+from project.decorators.curry import arity_plan, curry, curry_explicit
 
 # curry tests
 def test_curry_basic():
@@ -72,3 +72,75 @@ def test_curry_with_builtin_functions():
     curried_sum = curry_explicit(sum, 2)
     assert curried_sum([1, 2])(3) == 6
     assert curried_sum([10, 20])(30) == 60
+
+
+def test_curry_several_arguments_per_step():
+    f = curry_explicit(lambda a, b, c, d: (a, b, c, d), 4)
+    assert f(1)(2, 3)(4) == (1, 2, 3, 4)
+    assert f(1, 2, 3, 4) == (1, 2, 3, 4)
+    assert f(1, 2)(3, 4) == (1, 2, 3, 4)
+    with pytest.raises(TypeError):
+        f(1)(2, 3, 4, 5)  # One argument too many in a single step
+    with pytest.raises(TypeError):
+        f(1)()  # Empty step
+
+
+def test_curry_partial_is_reusable():
+    f = curry_explicit(lambda *args: args, 3)
+    partial = f(1)
+    assert partial(2)(3) == (1, 2, 3)
+    assert partial(4, 5) == (1, 4, 5)
+    assert partial.args == (1,)
+
+
+def test_curry_deep_arity():
+    f = curry_explicit(lambda *args: sum(args), 30)
+    step = f
+    for i in range(29):
+        step = step(i)
+    assert step(29) == sum(range(30))
+
+
+def test_curry_specialization_is_cached():
+    f = curry_explicit(max, 3)
+    g = curry_explicit(min, 3)
+    assert type(f) is type(g)
+    assert type(f(1)) is type(f)
+    assert type(curry_explicit(max, 2)) is not type(f)
+    assert type(f).arity == 3
+
+
+def test_curry_infers_arity():
+    f = curry(lambda x, y, z: x * 100 + y * 10 + z)
+    assert f.arity == 3
+    assert f(1)(2)(3) == 123
+    assert f(1, 2)(3) == 123
+
+
+def test_curry_keywords_and_defaults():
+    def f(a, b, c=3, *, d):
+        return a, b, c, d
+
+    g = curry(f)
+    assert g.arity == 3  # a, b and d have no defaults
+    assert g(1)(2)(d=4) == (1, 2, 3, 4)
+    assert g(1, d=4)(2, 5) == (1, 2, 5, 4)
+    assert g(d=0)(b=2)(1) == (1, 2, 3, 0)
+    with pytest.raises(TypeError):
+        g(d=1)(d=2)
+    with pytest.raises(TypeError):
+        g(1, 2, 3, 4)  # Too many positional arguments
+
+
+def test_curry_arity_zero_and_explicit():
+    assert curry(lambda: "done")() == "done"
+    assert curry(max, 2)(1)(2) == 2
+    with pytest.raises(ValueError):
+        curry(max)  # Builtins without a signature need an explicit arity
+
+
+def test_arity_plan_is_cached():
+    def f(a, b):
+        return a + b
+
+    assert arity_plan(f) is arity_plan(f)
@@ -0,0 +1,138 @@
+from pathlib import Path
+import sys
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+
+import json
+import threading
+
+import numpy as np
+import pytest
+
+from project.decorators.cache_decorator import cache_results
+from project.decorators.cache_policies import LRUPolicy, TieredCache
+from project.decorators.disk_cache import DiskCache
+
+
+def test_disk_cache_roundtrip(tmp_path):
+    cache = DiskCache(tmp_path / "cache.db")
+    cache.store(("f", (1, 2)), {"value": [1, 2]})
+    assert cache.lookup(("f", (1, 2))) == {"value": [1, 2]}
+    assert cache.lookup(("f", (2, 1)), "missing") == "missing"
+    assert ("f", (1, 2)) in cache
+    assert list(cache) == [("f", (1, 2))]
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    reopened = DiskCache(tmp_path / "cache.db")
+    assert reopened[("f", (1, 2))] == {"value": [1, 2]}
+    assert len(reopened) == 1
+    reopened.clear()
+    assert len(cache) == 0
+
+
+def test_disk_cache_evicts_least_recently_used(tmp_path):
+    cache = DiskCache(tmp_path / "cache.db", max_size=3)
+    for key in range(3):
+        cache.store(key, key)
+    cache.lookup(0)
+    cache.store(3, 3)
+    assert sorted(cache) == [0, 2, 3]
+    assert cache.evictions == 1
+
+
+def test_disk_cache_byte_limit(tmp_path):
+    cache = DiskCache(tmp_path / "cache.db", max_bytes=100, serializer=json)
+    cache.store("a", "x" * 40)
+    cache.store("b", "y" * 40)
+    assert cache.total_bytes() == 84
+    cache.store("c", "z" * 40)
+    assert sorted(cache) == ["b", "c"]
+    cache.store("d", "w" * 200)  # Larger than the whole limit: not stored
+    assert "d" not in cache
+    cache.store("b", "")  # Replacing a value updates the total
+    assert cache.total_bytes() == 44
+
+
+def test_unpicklable_values_are_skipped(tmp_path):
+    cache = DiskCache(tmp_path / "cache.db")
+    cache.store("lock", threading.Lock())
+    assert len(cache) == 0
+
+
+def test_unpicklable_keys_miss(tmp_path):
+    cache = DiskCache(tmp_path / "cache.db")
+    lock = threading.Lock()
+    cache.store(lock, "value")
+    assert len(cache) == 0
+    assert lock not in cache
+    assert cache.lookup(lock, "default") == "default"
+    with pytest.raises(KeyError):
+        cache[lock]
+    assert cache.stats() == (0, 1, 0)
+
+    calls = []
+
+    @cache_results(disk=tmp_path / "decorated.db")
+    def apply(function, x):
+        calls.append(x)
+        return function(x)
+
+    square = lambda x: x * x
+    assert apply(square, 3) == 9
+    assert apply(square, 3) == 9
+    assert calls == [3]
+
+
+def test_tiered_cache_promotes_disk_hits(tmp_path):
+    disk = DiskCache(tmp_path / "cache.db")
+    first = TieredCache(LRUPolicy(2), disk, "f")
+    first.store(1, "one")
+    assert disk.lookup(("f", 1)) == "one"
+
+    second = TieredCache(LRUPolicy(2), disk, "f")
+    assert 1 not in second
+    assert second.lookup(1) == "one"
+    assert 1 in second  # Promoted into memory
+    assert second.lookup(1) == "one"
+    assert second.backend_hits == 1
+    assert second.stats() == (2, 0, 0)
+    assert TieredCache(LRUPolicy(2), disk, "g").lookup(1) is None
+
+
+def test_warm_restart(tmp_path):
+    path = tmp_path / "cache.db"
+    computed = []
+
+    def square(x):
+        computed.append(x)
+        return x * x
+
+    cached = cache_results(max_cache_size=2, policy="lru", disk=path)(square)
+    assert [cached(x) for x in (1, 2, 3)] == [1, 4, 9]
+
+    # A new decorator on the same file is what a restarted process would see
+    restarted = cache_results(max_cache_size=2, policy="lru", disk=path)(square)
+    assert [restarted(x) for x in (1, 2, 3)] == [1, 4, 9]
+    assert computed == [1, 2, 3]
+    info = restarted.cache_info()
+    assert (info.hits, info.misses) == (3, 0)
+
+
+def test_thread_safe_tiers_with_unhashable_keys(tmp_path):
+    disk = DiskCache(tmp_path / "cache.db", max_size=100)
+
+    @cache_results(max_cache_size=8, thread_safe=True, disk=disk)
+    def total(values):
+        return int(np.sum(values))
+
+    def work():
+        for n in range(20):
+            assert total(np.arange(n)) == n * (n - 1) // 2
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert total.calls == 20
+    assert len(disk) == 20
@@ -0,0 +1,150 @@
+from pathlib import Path
+import sys
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+
+import gc
+import multiprocessing
+import os
+import pickle
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from project.decorators.cache_decorator import cache_results
+from project.decorators.shared_cache import SharedCache
+
+
+@pytest.fixture
+def shared(tmp_path):
+    cache = SharedCache(tmp_path / "table", slots=64, slot_size=128, ways=4)
+    yield cache
+    cache.close()
+
+
+def test_store_and_lookup(shared):
+    shared.store(("f", 1), [1, 2, 3])
+    assert shared.lookup(("f", 1)) == [1, 2, 3]
+    assert shared.lookup(("f", 2), "missing") == "missing"
+    shared.store(("f", 1), "replaced")
+    assert shared[("f", 1)] == "replaced"
+    assert len(shared) == 1
+    assert list(shared) == [("f", 1)]
+    assert (shared.hits, shared.misses) == (1, 1)
+
+
+def test_attach_uses_stored_geometry(shared):
+    shared.store("key", "value")
+    attached = SharedCache(shared.path, slots=1, slot_size=1, ways=1)
+    assert (attached.buckets, attached.ways, attached.slot_size) == (16, 4, 128)
+    assert attached["key"] == "value"
+    attached.clear()
+    assert "key" not in shared
+    attached.close()
+
+
+def test_memory_is_bounded(shared):
+    for key in range(1000):
+        shared.store(key, key)
+    assert len(shared) <= 64
+    assert shared.evictions == 1000 - len(shared)
+    shared.store("big", "x" * 200)  # Does not fit into a slot
+    assert "big" not in shared
+
+
+def test_rejects_foreign_files(tmp_path):
+    path = tmp_path / "foreign"
+    path.write_bytes(b"not a table" * 10)
+    with pytest.raises(ValueError):
+        SharedCache(path)
+
+
+def test_pickles_as_path(shared):
+    shared.store(1, "one")
+    copy = pickle.loads(pickle.dumps(shared))
+    assert copy.path == shared.path and copy[1] == "one"
+    copy.close()
+
+
+def test_unpicklable_keys_miss(shared):
+    lock = threading.Lock()
+    shared.store(lock, "value")
+    assert len(shared) == 0
+    assert lock not in shared
+    assert shared.lookup(lock, "default") == "default"
+    with pytest.raises(KeyError):
+        shared[lock]
+
+
+def open_files():
+    return len(os.listdir("/proc/self/fd"))
+
+
+@pytest.mark.skipif(not os.path.isdir("/proc/self/fd"), reason="needs /proc")
+def test_unpickled_copies_are_released(shared):
+    gc.collect()  # Release what earlier tests left behind
+    before = open_files()
+    for _ in range(200):
+        pickle.loads(pickle.dumps(shared))
+    gc.collect()
+    assert open_files() == before
+
+
+def test_default_table_is_removed_with_its_creator():
+    table = SharedCache(slots=8, slot_size=64, ways=2)
+    path = table.path
+    attached = SharedCache(path)
+    table.store(1, "one")
+    assert attached.lookup(1) == "one"
+    attached.close()
+    assert os.path.exists(path)
+    del table
+    gc.collect()
+    assert not os.path.exists(path)
+
+
+def store_square(cache, x):
+    """Runs in a worker: stores x * x and returns what the table holds for -x."""
+    cache.store(x, x * x)
+    return cache.lookup(-x)
+
+
+def test_workers_share_the_table(shared):
+    for x in range(1, 9):
+        shared.store(-x, f"from parent {x}")
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=2, mp_context=context) as executor:
+        seen = list(executor.map(store_square, [shared] * 8, range(1, 9)))
+    assert seen == [f"from parent {x}" for x in range(1, 9)]
+    assert [shared[x] for x in range(1, 9)] == [x * x for x in range(1, 9)]
+
+
+def test_decorated_functions_share_results(shared):
+    computed = []
+
+    def square(x):
+        computed.append(x)
+        return x * x
+
+    first = cache_results(max_cache_size=4, shared=shared)(square)
+    # Another decorator over the same table stands for another process
+    second = cache_results(max_cache_size=4, shared=shared.path)(square)
+    assert [first(x) for x in range(3)] == [0, 1, 4]
+    assert [second(x) for x in range(3)] == [0, 1, 4]
+    assert computed == [0, 1, 2]
+    assert second.cache.backend_hits == 3
+
+
+def test_shared_in_front_of_disk(shared, tmp_path):
+    computed = []
+
+    def double(x):
+        computed.append(x)
+        return 2 * x
+
+    disk = tmp_path / "cache.db"
+    cache_results(shared=shared, disk=disk)(double)(1)
+    shared.clear()
+    assert cache_results(shared=shared, disk=disk)(double)(1) == 2
+    assert computed == [1]
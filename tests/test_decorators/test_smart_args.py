@@ -136,3 +136,53 @@ def test_isolated_without_value():
 
     with pytest.raises(ValueError, match="Argument 'd' requires a value for Isolated"):
         test_func()  # Не передаем значение для 'd', должно быть исключение
+
+
+def test_isolated_copies_passed_value():
+    """Test that a value passed for an Isolated argument is deeply copied."""
+
+    @smart_args(allow_positional=True)
+    def test_func(d=Isolated()):
+        d["inner"].append(1)
+        return d
+
+    original = {"inner": []}
+    assert test_func(original) == {"inner": [1]}
+    assert test_func(d=original) == {"inner": [1]}
+    assert original == {"inner": []}
+
+
+def test_plain_function_keeps_positional_check():
+    """Test that a function without special defaults still rejects positional arguments."""
+
+    @smart_args()
+    def test_func(*, x=1, y=2):
+        return x + y
+
+    assert test_func(y=5) == 6
+    with pytest.raises(AssertionError, match="Only keyword arguments are allowed"):
+        test_func(1)
+
+
+def test_too_many_positional_arguments():
+    """Test that extra positional arguments are rejected."""
+
+    @smart_args(allow_positional=True)
+    def test_func(x=Evaluated(lambda: 0)):
+        return x
+
+    with pytest.raises(TypeError):
+        test_func(1, 2)
+
+
+def test_evaluated_and_isolated_are_checked_once():
+    """Test that the special defaults are found at decoration time."""
+
+    class Both(Evaluated, Isolated):
+        pass
+
+    with pytest.raises(ValueError, match="Cannot combine Evaluated and Isolated"):
+
+        @smart_args()
+        def test_func(*, x=Both(lambda: 0)):
+            return x
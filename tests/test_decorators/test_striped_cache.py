@@ -0,0 +1,103 @@
+from pathlib import Path
+import sys
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+
+import threading
+import time
+from collections import OrderedDict
+
+import pytest
+
+from project.decorators.cache_decorator import cache_results
+from project.decorators.cache_policies import LRUPolicy
+from project.decorators.striped_cache import StripedCache
+
+
+def run_threads(target, count):
+    """Starts `count` threads running `target` at the same moment and joins them."""
+    barrier = threading.Barrier(count)
+    results = [None] * count
+
+    def run(index):
+        barrier.wait()
+        results[index] = target(index)
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def test_single_flight():
+    @cache_results(thread_safe=True)
+    def slow_square(x):
+        time.sleep(0.05)
+        return x * x
+
+    results = run_threads(lambda i: slow_square(3), 8)
+    assert results == [9] * 8
+    assert slow_square.calls == 1
+
+
+def test_different_keys_computed_once_each():
+    @cache_results(max_cache_size=64, thread_safe=True, stripes=4)
+    def slow_double(x):
+        time.sleep(0.01)
+        return 2 * x
+
+    results = run_threads(lambda i: [slow_double(k) for k in range(16)], 8)
+    assert all(result == [2 * k for k in range(16)] for result in results)
+    assert slow_double.calls == 16
+    assert len(slow_double.cache) == 16
+
+
+def test_errors_are_shared_and_not_cached():
+    attempts = []
+
+    @cache_results(thread_safe=True)
+    def failing(x):
+        attempts.append(x)
+        time.sleep(0.05)
+        raise RuntimeError("boom")
+
+    def call(index):
+        try:
+            failing(1)
+        except RuntimeError as error:
+            return str(error)
+
+    assert run_threads(call, 4) == ["boom"] * 4
+    assert len(attempts) == 1
+    with pytest.raises(RuntimeError):
+        failing(1)
+    assert len(attempts) == 2
+
+
+def test_capacity_is_split_between_stripes():
+    cache = StripedCache(10, LRUPolicy, stripes=4)
+    for key in range(100):
+        cache.store(key, key)
+    assert len(cache) <= 10
+    assert len(StripedCache(3, LRUPolicy, stripes=16)._stripes) == 3
+    with pytest.raises(ValueError):
+        StripedCache(10, LRUPolicy, stripes=0)
+
+
+def test_thread_safe_reset_and_mapping_view():
+    @cache_results(max_cache_size=64, policy="lru", thread_safe=True)
+    def identity(x):
+        return x
+
+    identity(1)
+    identity(2)
+    assert sorted(key[0] for key in identity.cache) == [1, 2]
+    assert identity.cache[(1,)] == 1
+
+    identity.cache = OrderedDict()
+    identity.calls = 0
+    identity(1)
+    assert identity.calls == 1
+    assert isinstance(identity.cache, StripedCache)
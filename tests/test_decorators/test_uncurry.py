@@ -3,9 +3,11 @@ import sys
 
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
 
+import inspect
+
 import pytest
-from project.decorators.curry import curry_explicit
-from project.decorators.uncurry import uncurry_explicit
+from project.decorators.curry import curry, curry_explicit
+from project.decorators.uncurry import uncurry, uncurry_explicit
 
 # uncurry tests
 def test_uncurry_basic():
@@ -61,3 +63,64 @@ def test_uncurry_large_number_of_arguments():
     f = curry_explicit(lambda *args: sum(args), 5)
     g = uncurry_explicit(f, 5)
     assert g(1, 2, 3, 4, 5) == 15  # 1 + 2 + 3 + 4 + 5 = 15
+
+
+def test_uncurry_explicit_calls_original_directly():
+    calls = []
+
+    def original(a, b, c):
+        calls.append((a, b, c))
+        return a + b + c
+
+    g = uncurry_explicit(curry_explicit(original, 3), 3)
+    assert g(1, 2, 3) == 6
+    assert g.__wrapped__ is original
+    with pytest.raises(TypeError):
+        g(1, 2)
+
+
+def test_uncurry_smaller_arity_gives_partial_application():
+    def add(a, b, c):
+        return a + b + c
+
+    partial = uncurry_explicit(curry_explicit(add, 3), 2)(1, 2)
+    assert partial(3) == 6
+    assert uncurry(curry_explicit(add, 3), 2)(1, 2)(3) == 6
+    assert uncurry_explicit(curry(add)(1), 1)(2)(3) == 6
+    assert uncurry(curry(add)(1), 2)(2, 3) == 6
+
+
+def test_uncurry_infers_arity():
+    def add(a, b, c):
+        return a + b + c
+
+    g = uncurry(curry_explicit(add, 3))
+    assert g(1, 2, 3) == 6
+    assert g.__name__ == "add"
+    with pytest.raises(TypeError):
+        g(1, 2, 3, 4)
+
+    partial = uncurry(curry_explicit(add, 3)(1))
+    assert partial(2, 3) == 6
+    with pytest.raises(TypeError):
+        partial(2)
+
+
+def test_uncurry_keyword_curried():
+    def f(a, b, c=3, *, d=4):
+        return a, b, c, d
+
+    g = uncurry(curry(f))
+    assert g(1, 2) == (1, 2, 3, 4)
+    assert g(1, 2, d=0) == (1, 2, 3, 0)
+    assert inspect.signature(g) == inspect.signature(f)
+    assert uncurry(curry(f)(1, d=5))(2) == (1, 2, 3, 5)
+
+
+def test_uncurry_foreign_curried_function():
+    foreign = lambda x: lambda y: x - y
+    assert uncurry(foreign, 2)(5, 3) == 2
+    with pytest.raises(TypeError):
+        uncurry(foreign)
+    with pytest.raises(ValueError):
+        uncurry(curry_explicit(max, 2), -1)
@@ -3,8 +3,25 @@ import sys
 
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
 
+import itertools
+import math
+import threading
+
+import numpy as np
 import pytest
-from project.generators.primes import get_kth_prime, prime_generator
+from project.generators.primes import (
+    SEGMENT_BYTES,
+    base_primes,
+    count_primes,
+    PrimeTable,
+    get_kth_prime,
+    nth_prime_bound,
+    prime_decorator,
+    prime_generator,
+    primes_below,
+    primes_in_range,
+    sieve_segment,
+)
 
 # Prime Number Test
 @pytest.mark.parametrize(
@@ -37,3 +54,112 @@ def test_prime_generator_first_primes():
     assert next(prime_gen) == 7
     assert next(prime_gen) == 11
     assert next(prime_gen) == 13
+
+
+def trial_division_primes(n):
+    """Reference: the primes below n by trial division."""
+    return [p for p in range(2, n) if all(p % d for d in range(2, math.isqrt(p) + 1))]
+
+
+@pytest.mark.parametrize("n", [0, 1, 2, 3, 4, 5, 100, 1000, 7919, 7920])
+def test_primes_below(n):
+    primes = primes_below(n)
+    assert primes.dtype == np.int64
+    assert primes.tolist() == trial_division_primes(n)
+
+
+def test_primes_below_spans_several_segments():
+    n = 5 * SEGMENT_BYTES + 17
+    # The unsegmented sieve of the base primes is the reference
+    assert primes_below(n).tolist() == [2] + base_primes(n - 1)
+
+
+def test_sieve_segment_bounds():
+    primes = base_primes(100)
+    assert sieve_segment(90, 98, primes).tolist() == [97]
+    assert sieve_segment(97, 98, primes).tolist() == [97]
+    assert sieve_segment(0, 10, primes).tolist() == [3, 5, 7]
+    assert sieve_segment(24, 29, primes).tolist() == []
+
+
+def test_prime_generator_matches_reference():
+    expected = trial_division_primes(20_000)
+    assert list(itertools.islice(prime_generator(), len(expected))) == expected
+
+
+def test_prime_generator_crosses_segments():
+    primes = list(itertools.islice(prime_generator(), 200_000))
+    assert primes[-1] == 2_750_159  # The 200000-th prime
+    assert primes == primes_below(2_750_160).tolist()
+
+
+def test_get_kth_prime_out_of_order():
+    assert get_kth_prime(1000) == 7919
+    assert get_kth_prime(10) == 29
+    assert get_kth_prime(1) == 2
+    assert get_kth_prime(1000) == 7919
+
+
+def test_decorated_functions_are_independent():
+    first = prime_decorator(lambda prime: prime)
+    second = prime_decorator(lambda prime: -prime)
+    assert first(100) == 541
+    assert len(second.table) == 0
+    assert second(3) == -5
+    assert first(3) == 5
+
+
+@pytest.mark.parametrize("k", [1, 5, 6, 100, 10_000, 1_000_000])
+def test_nth_prime_bound(k):
+    kth_prime = PrimeTable().kth(k)
+    assert kth_prime <= nth_prime_bound(k)
+
+
+def test_prime_table_grows_with_one_pass():
+    table = PrimeTable()
+    assert table.kth(5) == 11
+    assert table.kth(200_000) == 2_750_159
+    primes = primes_below(2_750_160).tolist()
+    assert table._primes[: len(primes)].tolist() == primes
+    assert table.kth(6) == 13
+
+
+def test_prime_table_threads():
+    table = PrimeTable()
+    expected = primes_below(2_000_000).tolist()
+    ks = list(range(1, len(expected), 997))
+    errors = []
+
+    def lookup(offset):
+        for k in ks[offset:] + ks[:offset]:
+            if table.kth(k) != expected[k - 1]:
+                errors.append(k)
+
+    threads = [threading.Thread(target=lookup, args=(i * 7,)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+@pytest.mark.parametrize(
+    "lo, hi", [(0, 2), (0, 3), (2, 30), (24, 29), (30, 20), (1_000, 2_500_000)]
+)
+def test_primes_in_range(lo, hi, workers):
+    expected = [p for p in primes_below(max(hi, 0)).tolist() if p >= lo]
+    assert primes_in_range(lo, hi, workers=workers).tolist() == expected
+    assert count_primes(lo, hi, workers=workers) == len(expected)
+
+
+def test_count_primes_does_not_leak_threads():
+    before = threading.active_count()
+    assert count_primes(0, 3_000_000, workers=2) == 216_816
+    assert threading.active_count() == before
+
+
+@pytest.mark.parametrize("workers", [0, -1])
+def test_count_primes_invalid_workers(workers):
+    with pytest.raises(ValueError, match="workers must be greater than or equal to 1"):
+        count_primes(0, 100, workers=workers)